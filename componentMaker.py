@@ -2,7 +2,12 @@
 
 # You'll need the sh library for this script to function properly.
 # pip3 install sh
-import os, sh, argparse
+import os, re, sh, json, argparse
+from tableSpec import TableSpec
+from seedData import writeSeedFile
+from schemaMigration import SchemaMigration
+from phpPreload import writePreloadFiles
+from phpClassIndex import indexPhpClasses, componentInstallPaths, renderPhpClassMap
 
 class ComponentMaker:
   def __init__(self):
@@ -48,6 +53,41 @@ Usage Example in Bash/sh/zsh:
     parser.add_argument('--initial-view-name',required=False, help="""OPTIONAL: Set the name of the initial view. Defaults to Main""")
     parser.add_argument('--api-controller-names',required=False, help="""OPTIONAL: Creates a set of API controllers and JSON API views taken in comma separated form from the user. If None given, Defaults to creating a Main controller.""")
     parser.add_argument('--api-controller-design',required=False, help="""OPTIONAL: Selects the controller design philosophy. Defaults to J! 4's default i.e. joomla-bloat (MVC code-bloat for REST methods...). You have the option to choose: unjoomla-fast if you'd like to work in an express-style with all work happenning in the controller methods.""")
+    parser.add_argument('--api-list-pagination',required=False, help="""OPTIONAL: unjoomla-fast only. Pass "keyset" to generate a get<Controller>Page() list method in every API controller which pages through the component's table by keyset (seek) pagination with an opaque cursor, rather than OFFSET paging or loading the full result set.""")
+    parser.add_argument('--api-sparse-fieldsets',required=False, default=False, action='store_true', help="""OPTIONAL: The API list endpoints honour JSON:API sparse fieldsets, fields[<controller>]=col1,col2 narrows the SELECT (and the serialized attributes) to those columns, within the table spec's "apiFields" whitelist. joomla-bloat controllers list through the --list-models ListModel, unjoomla-fast ones narrow their --api-list-pagination="keyset" page method.""")
+    parser.add_argument('--api-batch-controller',required=False, default=False, action='store_true', help="""OPTIONAL: unjoomla-fast only. Generates a BatchController whose dispatchBatch() method runs an array of sub requests (controller, method, params) in-process against the generated controllers and answers them all in one response, with a status per sub request. Pair it with pluginMaker.py --plugin-webservices-batch-route.""")
+    parser.add_argument('--api-batch-max-requests',required=False, type=int, default=20, help="""OPTIONAL: The most sub requests a single batch may carry, larger batches are refused with 413. Defaults to 20.""")
+    parser.add_argument('--site-view-cache',required=False, default=False, action='store_true', help="""OPTIONAL: Generates a cache-enabled site DisplayController. Guest GET requests are rendered through Joomla's view cache (used once caching is on in the Global Configuration), keyed on the --site-cache-safe-urlparams only. The site views declare their cache groups, which an Administrator\\Helper\\ViewCache purges after every save of the generated API controllers.""")
+    parser.add_argument('--site-cache-safe-urlparams',required=False, help="""OPTIONAL: Used with --site-view-cache. The URL params that select distinct cached output, as name:FILTER pairs e.g. "id:INT,Itemid:INT,limitstart:UINT,lang:CMD" (which is the default). Any other URL param is ignored by the cache, so never leave out one that changes the output.""")
+    parser.add_argument('--list-models',required=False, default=False, action='store_true', help="""OPTIONAL: Generates an admin <Table>ListModel (a Joomla ListModel) per table spec table, filtering and sorting only on columns an index leads with, with a capped page size and a configurable total count strategy.""")
+    parser.add_argument('--list-model-max-limit',required=False, type=int, default=100, help="""OPTIONAL: Used with --list-models. The largest page size (list.limit) the list models accept, "all" (0) is capped to it too. Defaults to 100.""")
+    parser.add_argument('--list-model-count',required=False, choices=[ "exact", "cached", "approximate" ], default="exact", help="""OPTIONAL: Used with --list-models. How getTotal() counts: "exact" runs COUNT(*) on every page load (Joomla's default), "cached" keeps each filter combination's COUNT(*) for --list-model-count-ttl minutes, "approximate" reads InnoDB's row estimate from information_schema for unfiltered lists (filtered lists use the cached count).""")
+    parser.add_argument('--list-model-count-ttl',required=False, type=int, default=5, help="""OPTIONAL: Used with --list-models. Minutes a cached (or approximate) total count is reused before it is refreshed. Defaults to 5.""")
+    parser.add_argument('--api-write-behind-queue',required=False, default=False, action='store_true', help="""OPTIONAL: unjoomla-fast only. Adds a #__<component>_queue table to the install SQL and an enqueue() method to ApiTools, so controllers hand slow work (emails, third party syncs) to the scheduler task plugin generated by pluginMaker.py --plugin-type="task" --task-queue-component="com_<component>" instead of doing it inside the request.""")
+    parser.add_argument('--api-bulk-write',required=False, default=False, action='store_true', help="""OPTIONAL: unjoomla-fast only. Generates bulkCreate() and bulkUpdate() methods in every API controller which take a JSON array of records, validate each against the table spec columns and write the valid ones to the controller's table in one transaction with multi-row statements, reporting a status per record.""")
+    parser.add_argument('--api-bulk-max-items',required=False, type=int, default=1000, help="""OPTIONAL: The most records a single bulk write may carry, larger arrays are refused with 413. Defaults to 1000.""")
+    parser.add_argument('--api-bulk-max-bytes',required=False, type=int, default=1048576, help="""OPTIONAL: The largest bulk write request body in bytes, larger bodies are refused with 413 before being read. Defaults to 1048576 (1MB).""")
+    parser.add_argument('--api-server-timing',required=False, default=False, action='store_true', help="""OPTIONAL: unjoomla-fast only. Times every database query (through a query monitor attached in getDbo()) and the JSON encoding, and sends the results in a Server-Timing header. With the site in debug mode emitJson also adds a "_meta" block holding the query count and database time. Nothing is generated without it.""")
+    parser.add_argument('--api-metrics',required=False, default=False, action='store_true', help="""OPTIONAL: Generates an ApiMetrics collector counting the requests, errors and latency histogram buckets of every API route (controller.task and HTTP method) in APCu shared memory, updated by the generated controllers (and emitJson for unjoomla-fast), and a MetricsController serving them in the Prometheus text format. Pair it with pluginMaker.py --plugin-webservices-metrics-route. Nothing is counted on servers without APCu.""")
+    parser.add_argument('--api-metrics-buckets',required=False, default="0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10", help="""OPTIONAL: The upper bounds in seconds of the --api-metrics latency histogram buckets, comma separated and ascending. Defaults to the Prometheus client defaults "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10".""")
+    parser.add_argument('--debug-query-repeat-threshold',required=False, type=int, help="""OPTIONAL: Generates a debug-only N+1 query detector, attached in getDbo() of the generated models (and of the unjoomla-fast API controllers). With the site in debug mode it fingerprints every query with its literals and bound values normalised away, and logs a warning with the call sites of any query shape run more than this many times in one request e.g. 10. Nothing is generated without it.""")
+    parser.add_argument('--api-json-etag',required=False, default=False, action='store_true', help="""OPTIONAL: unjoomla-fast only. emitJson sends a strong ETag (and Last-Modified when the caller passes a timestamp) on successful GET responses and answers a matching If-None-Match / If-Modified-Since with 304 Not Modified and no body.""")
+    parser.add_argument('--api-json-cache-control',required=False, help="""OPTIONAL: unjoomla-fast only. The Cache-Control header emitJson (and emitJsonStream) sends on successful GET responses so a reverse proxy or client may cache them e.g. "public, max-age=60". Other methods and error responses are sent with "no-store".""")
+    parser.add_argument('--api-json-stream-no-store',required=False, default=False, action='store_true', help="""OPTIONAL: With --api-json-emitter="streamed" and --api-json-cache-control. Streamed responses are sent with "no-store" instead of the --api-json-cache-control value. Their status and headers go out before the rows, so a database error mid-stream leaves a truncated body behind a 200 that a cache would keep.""")
+    parser.add_argument('--api-json-compress-min-bytes',required=False, type=int, help="""OPTIONAL: unjoomla-fast only. emitJson gzip (or deflate) compresses JSON bodies of at least this many bytes when the client's Accept-Encoding allows it e.g. 1024. Compression is off when omitted.""")
+    parser.add_argument('--api-json-emitter',required=False, help="""OPTIONAL: unjoomla-fast only. Selects how generated list methods write their JSON. Defaults to buffered (the whole payload goes through one json_encode). Pass "streamed" to write rows out one at a time from a row iterator, keeping memory flat and sending the first bytes early.""")
+    parser.add_argument('--table-spec',required=False, help="""OPTIONAL: Path to a JSON table schema spec (see tableSpec.py) declaring the component's tables, their columns and the lookups (equality, range, ordering) the generated code performs. The install SQL then gets matching composite/covering indexes and query builders are generated for every declared lookup. Defaults to the illustrative storage_table_1.""")
+    parser.add_argument('--table-spec-previous',required=False, help="""OPTIONAL: Path to the table spec the previous component version was generated from. The admin update SQL is then generated from the diff of the two specs as online-safe ALTERs (explicit ALGORITHM/LOCK, changes which copy the table or block writes are marked with a WARNING) instead of the illustrative ALTER.""")
+    parser.add_argument('--emit-load-test',required=False, default=False, action='store_true', help="""OPTIONAL: Writes loadTest.py (an asyncio load test harness reporting latency percentiles & throughput), its offline stub server and a loadTestConfig.json holding a route for every generated API controller method into <component folder>_loadtest/ next to the package. The paths assume v1/<component>/<controller>/<method> webservices routes, edit them to match your plugin.""")
+    parser.add_argument('--emit-classmap',required=False, default=False, action='store_true', help="""OPTIONAL: Writes admin/services/classmap.php, a static class name => installed path map of every class the generator produced (rebuilt from the generated tree on every run, so it follows the controller list).""")
+    parser.add_argument('--classmap-autoloader',required=False, default=False, action='store_true', help="""OPTIONAL: Used with --emit-classmap. Also writes admin/services/classmap_autoload.php and requires it from services/provider.php, registering the classmap ahead of Joomla's PSR-4 namespace loader so the component's classes load without filesystem lookups.""")
+    parser.add_argument('--emit-preload',required=False, default=False, action='store_true', help="""OPTIONAL: Writes an OPcache preload.php compiling every class of the generated component (api, admin & site controllers, views, models and helpers) at their installed paths, with its preload.json manifest and phpPreload.py (which merges the manifests of several extensions into one preload script) into <component folder>_preload/ next to the package. The Joomla root is read from the JOOMLA_ROOT environment variable.""")
+    parser.add_argument('--seed-rows',required=False, type=int, help="""OPTIONAL: Writes a bulk seed SQL file of this many synthetic rows (following the "seed" distributions of the table spec columns) into <component folder>_seed/ next to the package, for load testing. Mutually exclusive with --seed-csv.""")
+    parser.add_argument('--seed-csv',required=False, help="""OPTIONAL: Like --seed-rows but streams the rows from a CSV file whose header row names the columns.""")
+    parser.add_argument('--seed-table',required=False, help="""OPTIONAL: The table spec table to seed. Defaults to the first table.""")
+    parser.add_argument('--seed-max-allowed-packet',required=False, type=int, default=4194304, help="""OPTIONAL: The target server's max_allowed_packet in bytes, no seed INSERT will exceed it. Defaults to 4194304 (4MB).""")
+    parser.add_argument('--seed-defer-indexes',required=False, default=False, action='store_true', help="""OPTIONAL: Drop the seeded table's secondary indexes before loading and rebuild them once afterwards.""")
+    parser.add_argument('--seed-db-prefix',required=False, default="#__", help="""OPTIONAL: The database table prefix written into the seed file. Defaults to #__, pass your site's real prefix (e.g. jos_) when loading the file with the mysql client.""")
     # The following commented out declarations are for illustration purposes.
     # parser.add_argument('-a', '--author-name',      required=True, help="""The code author's name""")
     # positional arg declaration parser.add_argument('foo', metavar='N', type=int, nargs='+', help='an integer for the accumulator')
@@ -83,6 +123,116 @@ Usage Example in Bash/sh/zsh:
     else:
       self.apiControllerDesign = "joomla-bloat"
 
+    # Keyset list pagination & the JSON emission mode used by the generated list methods (unjoomla-fast only)
+    self.apiListPagination = "keyset" if self.args.api_list_pagination == "keyset" else None
+    self.apiJsonEmitter = "streamed" if self.args.api_json_emitter == "streamed" else "buffered"
+
+    # Server-Timing / query count instrumentation of the API controllers (unjoomla-fast only)
+    self.apiServerTiming = self.args.api_server_timing
+    if (self.apiServerTiming and self.apiControllerDesign != "unjoomla-fast"):
+      raise Exception("""--api-server-timing instruments the unjoomla-fast controllers, please also pass --api-controller-design="unjoomla-fast".""")
+
+    # Static classmap of the generated classes, optionally autoloaded ahead of the PSR-4 loader
+    if (self.args.classmap_autoloader and not self.args.emit_classmap):
+      raise Exception("""--classmap-autoloader registers the generated classmap, please also pass --emit-classmap.""")
+
+    # Debug-only repeated query (N+1) detection in the generated models and unjoomla-fast controllers
+    self.debugQueryRepeatThreshold = self.args.debug_query_repeat_threshold
+    if (self.debugQueryRepeatThreshold is not None and self.debugQueryRepeatThreshold < 1):
+      raise Exception("""--debug-query-repeat-threshold must be 1 or more.""")
+
+    # HTTP conditional request, caching & compression support in the generated emitJson (unjoomla-fast only)
+    self.apiJsonEtag = self.args.api_json_etag
+    self.apiJsonCacheControl = self.args.api_json_cache_control
+    self.apiJsonCompressMinBytes = self.args.api_json_compress_min_bytes
+    # Comma separated directives, each a token optionally "=" a token or quoted-string (RFC 9111 5.2)
+    cacheDirective = r"""[!#$%&'*+.^_`|~0-9A-Za-z-]+(=([!#$%&'*+.^_`|~0-9A-Za-z-]+|"([^"\\\r\n]|\\[^\r\n])*"))?"""
+    if (self.apiJsonCacheControl is not None and not re.fullmatch(rf"\s*{cacheDirective}(\s*,\s*{cacheDirective})*\s*", self.apiJsonCacheControl)):
+      raise Exception(f"""--api-json-cache-control takes Cache-Control directives e.g. "public, max-age=60", "{self.apiJsonCacheControl}" is not a valid Cache-Control value.""")
+    self.apiJsonStreamNoStore = self.args.api_json_stream_no_store
+    if (self.apiJsonStreamNoStore and (self.args.api_json_emitter != "streamed" or self.apiJsonCacheControl is None)):
+      raise Exception("""--api-json-stream-no-store keeps streamed responses out of caches, please also pass --api-json-emitter="streamed" and --api-json-cache-control.""")
+    if (self.apiJsonCompressMinBytes is not None and self.apiJsonCompressMinBytes < 0):
+      raise Exception(f"""--api-json-compress-min-bytes must be 0 or more, {self.apiJsonCompressMinBytes} was given.""")
+    if (self.apiControllerDesign != "unjoomla-fast"):
+      for flagName, flagValue in ( ( "--api-json-etag", self.apiJsonEtag ), ( "--api-json-cache-control", self.apiJsonCacheControl ),
+                                   ( "--api-json-compress-min-bytes", self.apiJsonCompressMinBytes ), ( "--api-list-pagination", self.args.api_list_pagination ),
+                                   ( "--api-json-emitter", self.args.api_json_emitter ) ):
+        if (flagValue not in ( None, False )):
+          raise Exception(f"""{flagName} changes the unjoomla-fast emitJson / list methods, please also pass --api-controller-design="unjoomla-fast".""")
+
+    # If the user did not choose api controller names, default to Main.
+    # A single (non comma separated) name simply yields a list holding one controller name.
+    if ( self.args.api_controller_names is None or type(self.args.api_controller_names) is not str):
+      self.apiControllerNamesStr = "Main"
+    else:
+      self.apiControllerNamesStr = self.args.api_controller_names
+    self.apiControllerNames = [ name.strip() for name in self.apiControllerNamesStr.split(',') if name.strip() != "" ]
+
+    # In-process batch dispatch controller (unjoomla-fast only)
+    self.apiBatchController = self.args.api_batch_controller
+    self.apiBatchMaxRequests = self.args.api_batch_max_requests
+    if (self.apiBatchController):
+      if (self.apiControllerDesign != "unjoomla-fast"):
+        raise Exception("""--api-batch-controller dispatches to the methods of unjoomla-fast controllers, please also pass --api-controller-design="unjoomla-fast".""")
+      if ("batch" in [ name.lower() for name in self.apiControllerNames ]):
+        raise Exception("""--api-batch-controller generates a controller named Batch, please rename the Batch controller given in --api-controller-names.""")
+      if (self.apiBatchMaxRequests < 1):
+        raise Exception(f"""--api-batch-max-requests must be at least 1, {self.apiBatchMaxRequests} was given.""")
+
+    # APCu backed per route request / error / latency counters and their Prometheus endpoint
+    self.apiMetrics = self.args.api_metrics
+    if (self.apiMetrics):
+      if ("metrics" in [ name.lower() for name in self.apiControllerNames ]):
+        raise Exception("""--api-metrics generates a controller named Metrics, please rename the Metrics controller given in --api-controller-names.""")
+      try:
+        self.apiMetricsBuckets = [ float(bound) for bound in self.args.api_metrics_buckets.split(",") if bound.strip() != "" ]
+      except ValueError:
+        raise Exception(f"""--api-metrics-buckets takes comma separated seconds e.g. "0.05,0.1,0.5,1", "{self.args.api_metrics_buckets}" is not that.""")
+      if (len(self.apiMetricsBuckets) == 0 or self.apiMetricsBuckets[0] <= 0 or self.apiMetricsBuckets != sorted(set(self.apiMetricsBuckets))):
+        raise Exception(f"""--api-metrics-buckets must be positive and strictly ascending, "{self.args.api_metrics_buckets}" is not.""")
+
+    # Write-behind queue table & ApiTools::enqueue() (unjoomla-fast only)
+    self.apiWriteBehindQueue = self.args.api_write_behind_queue
+    if (self.apiWriteBehindQueue and self.apiControllerDesign != "unjoomla-fast"):
+      raise Exception("""--api-write-behind-queue adds enqueue() to the unjoomla-fast ApiTools, please also pass --api-controller-design="unjoomla-fast".""")
+
+    # Transactional bulk create / update methods (unjoomla-fast only)
+    self.apiBulkWrite = self.args.api_bulk_write
+    self.apiBulkMaxItems = self.args.api_bulk_max_items
+    self.apiBulkMaxBytes = self.args.api_bulk_max_bytes
+    if (self.apiBulkWrite):
+      if (self.apiControllerDesign != "unjoomla-fast"):
+        raise Exception("""--api-bulk-write generates unjoomla-fast controller methods, please also pass --api-controller-design="unjoomla-fast".""")
+      if (self.apiBulkMaxItems < 1 or self.apiBulkMaxBytes < 1):
+        raise Exception("""--api-bulk-max-items and --api-bulk-max-bytes must be at least 1.""")
+
+    # ListModels per spec table with index backed filters / sorting and a configurable total count
+    self.listModels = self.args.list_models
+    self.listModelMaxLimit = self.args.list_model_max_limit
+    self.listModelCount = self.args.list_model_count
+    self.listModelCountTtl = self.args.list_model_count_ttl
+    if (self.listModelMaxLimit < 1 or self.listModelCountTtl < 1):
+      raise Exception("""--list-model-max-limit and --list-model-count-ttl must be at least 1.""")
+
+    # JSON:API sparse fieldsets pushed down to the SELECT of the API list endpoints
+    self.apiSparseFieldsets = self.args.api_sparse_fieldsets
+    if (self.apiSparseFieldsets and self.apiControllerDesign == "joomla-bloat" and not self.listModels):
+      raise Exception("""--api-sparse-fieldsets narrows the ListModel queries the joomla-bloat controllers list through, please also pass --list-models.""")
+    if (self.apiSparseFieldsets and self.apiControllerDesign == "unjoomla-fast" and self.apiListPagination != "keyset"):
+      raise Exception("""--api-sparse-fieldsets narrows the unjoomla-fast list method, please also pass --api-list-pagination="keyset".""")
+
+    # Joomla view cache for the site views, keyed on an explicit whitelist of URL params
+    self.siteViewCache = self.args.site_view_cache
+    if (self.args.site_cache_safe_urlparams is not None and not self.siteViewCache):
+      raise Exception("""--site-cache-safe-urlparams lists the URL params of the site view cache, please also pass --site-view-cache.""")
+    self.siteCacheSafeUrlParams = []
+    for safeUrlParam in (self.args.site_cache_safe_urlparams or "id:INT,Itemid:INT,limitstart:UINT,lang:CMD").split(","):
+      paramName, _, paramFilter = safeUrlParam.strip().partition(":")
+      if (not paramName.isidentifier() or not paramFilter.isalpha()):
+        raise Exception(f"""--site-cache-safe-urlparams takes name:FILTER pairs e.g. "id:INT,lang:CMD", "{safeUrlParam}" is not one.""")
+      self.siteCacheSafeUrlParams.append((paramName, paramFilter.upper()))
+
     self.comVersion = self.args.component_version
 
     # Initial language locale to setup
@@ -94,6 +244,16 @@ Usage Example in Bash/sh/zsh:
     self.sqlUpdateFilename = f"{self.comVersion}.sql"
     # This is simply the first table's name for illustrative purposes
     self.initialTableName = f"storage_table_1"
+    # Every table is prefixed with the component name, a table spec (if given) replaces the illustrative table
+    self.tablePrefix = f"#__{self.comNameJoomla}_"
+    self.tableSpec = TableSpec.fromFile(self.args.table_spec) if self.args.table_spec is not None else TableSpec.default(self.initialTableName)
+    self.tableSpec.printLintWarnings()
+    self.schemaMigration = None
+    if (self.args.table_spec_previous is not None):
+      self.schemaMigration = SchemaMigration(TableSpec.fromFile(self.args.table_spec_previous), self.tableSpec, self.tablePrefix)
+      self.schemaMigration.printWarnings()
+    if (self.apiWriteBehindQueue and "queue" in [ table["name"] for table in self.tableSpec.tables ]):
+      raise Exception("""--api-write-behind-queue creates a table named queue, please rename the queue table of the table spec.""")
 
     # If a custom initial view name is specified, use it, else use "Main"
     self.initialViewName = self.args.initial_view_name if self.args.initial_view_name != None else "Main"
@@ -164,6 +324,7 @@ Usage Example in Bash/sh/zsh:
     self.apiFolder   = f"{self.comPackageBaseFolder}/api/src"
     self.apiViewFolder = f"{self.apiFolder}/View"
     self.apiControllerFolder = f"{self.apiFolder}/Controller"
+    self.apiHelperFolder = f"{self.apiFolder}/Helper"
 
     self.createFile(assetType = "d", targetPath = self.siteFolder)
     self.createFile(assetType = "d", targetPath = self.adminFolder)
@@ -283,29 +444,109 @@ Usage Example in Bash/sh/zsh:
     self.createFile(assetType = "f", targetPath = componentManifestFile, fileContents = componentManifestContents)
 
   def setupApiControllerAndViewPhpFiles(self):
-  # Check for any optional folders the user may have specified
-  # If there is a comma in the string, split into an array and create a folder named after each element of the array
-  # In the event there is no comma, just create one folder from the string
-    #self.optFolderNameManifestPartial = ""
-    # If the user did not choose api controller names, default to Main.
-    if ( self.args.api_controller_names is None or type(self.args.api_controller_names) is not str):
-      self.apiControllerNamesStr = "Main"
-
-    if ( self.args.api_controller_names is not None and type(self.args.api_controller_names) is str ):
-      self.apiControllerNamesStr = self.args.api_controller_names
-      if ( ',' in self.apiControllerNamesStr ):
-        for idx, controllerName in enumerate(self.apiControllerNamesStr.split(',')):
+    # Create a controller and a matching JSON API view for every name in self.apiControllerNames
+    for controllerName in self.apiControllerNames:
+      self.apiControllerPhpFileContents = self.prepareApiControllerPhpFileContents(controllerName)
+      # then create the controller file and write contents to it in the controller folder
+      self.createFile(assetType = "f", targetPath = f"{self.apiControllerFolder}/{controllerName.capitalize()}Controller.php", fileContents = self.apiControllerPhpFileContents )
+      # Now go make the folders under the view directory matching these controller names
+      self.createFile( assetType = "d", targetPath = f"{self.apiViewFolder}/{controllerName.capitalize()}" )
+      self.apiViewPhpFileContents = self.prepareApiViewPhpFileContents(controllerName)
+      # then create the view file and write contents to it in the view folder
+      self.createFile(assetType = "f", targetPath = f"{self.apiViewFolder}/{controllerName.capitalize()}/JsonapiView.php", fileContents = self.apiViewPhpFileContents )
+
+  # The controller execute() override counting every task in the --api-metrics ApiMetrics, indent is the controller's method indent
+  def prepareApiMetricsExecutePartial(self, indent):
+    if (not self.apiMetrics):
+      return ""
+    emitJsonNote = ""
+    if (self.apiControllerDesign == "unjoomla-fast"):
+      emitJsonNote = f"""
+{indent} * Tasks answered through emitJson are counted there before the connection closes, ApiMetrics counts a request once."""
+    return f"""
+
+{indent}/**
+{indent} * Runs the task and counts it in ApiMetrics, thrown errors included.{emitJsonNote}
+{indent} */
+{indent}public function execute($task)
+{indent}{{
+{indent}  try
+{indent}  {{
+{indent}    $result = parent::execute($task);
+{indent}  }}
+{indent}  catch (\\Throwable $e)
+{indent}  {{
+{indent}    ApiMetrics::record(true);
+{indent}    throw $e;
+{indent}  }}
+{indent}  ApiMetrics::record(false);
+{indent}  return $result;
+{indent}}}"""
+
+  # This method handles preparation of the api controller php file contents for both controller designs
+  def prepareApiControllerPhpFileContents(self, controllerName):
+    apiControllerPhpFileContents = ""
+    if (self.apiControllerDesign == "joomla-bloat"):
+      apiSaveReturnPartial = """
+      return parent::save($recordKey);"""
+      if (self.siteViewCache):
+        apiSaveReturnPartial = f"""
+      $recordId = parent::save($recordKey);
+      {self.viewCachePurgeStatement()}
+      return $recordId;"""
+    # Create Joomla-Bloated and cantankerous API controllers complete with view abstractions to get poor-documentedly lost in.
+      apiControllerUsePartial = ""
+      apiDisplayListPartial = ""
+      if (self.apiMetrics):
+        apiControllerUsePartial += f"""
+  use {self.vendorName}\\Component\\{self.comNameInNamespaces}\\Api\\Helper\\ApiMetrics;"""
+      if (self.apiSparseFieldsets):
+        listTable = self.tableSpec.tableForController(controllerName)
+        listModelClassName = f"{self.tableSpec.tableClassName(listTable)}ListModel"
+        apiControllerUsePartial += f"""
+  use {self.vendorName}\\Component\\{self.comNameInNamespaces}\\Administrator\\Model\\{listModelClassName};
+  use {self.vendorName}\\Component\\{self.comNameInNamespaces}\\Api\\View\\{controllerName.capitalize()}\\JsonapiView;"""
+        filterNamesPartial = f"array_keys({listModelClassName}::FILTER_COLUMNS)"
+        if (listTable["partitioning"] is not None):
+          filterNamesPartial = f"array_merge({filterNamesPartial}, [{listModelClassName}::PARTITION_COLUMN . '_from', {listModelClassName}::PARTITION_COLUMN . '_to'])"
+        apiDisplayListPartial = f"""
 
-          if (self.apiControllerDesign == "joomla-bloat"):
-          # Create Joomla-Bloated and cantankerous API controllers complete with view abstractions to get poor-documentedly lost in.
-            self.apiControllerPhpFileContents = rf"""
+    /**
+     * Lists through the {listModelClassName}, which only reads the columns of the fields[{controllerName.lower()}] sparse fieldset.
+     * ApiController creates the model with ignore_request so its populateState() never runs, the whitelisted filter[<name>]
+     * and list[fullordering] are copied into the model state here and the model caps page[limit] at its MAX_LIMIT itself.
+     */
+    public function displayList()
+    {{
+      $this->input->set('model', '{self.tableSpec.tableClassName(listTable)}List');
+      $this->modelState->set('list.columns', JsonapiView::sparseFieldset(JsonapiView::SPARSE_FIELDS));
+      $filters = $this->input->get('filter', [], 'array');
+      foreach ({filterNamesPartial} as $filterName)
+      {{
+        if (isset($filters[$filterName]) && is_scalar($filters[$filterName]) && $filters[$filterName] !== '')
+        {{
+          $this->modelState->set('filter.' . $filterName, (string) $filters[$filterName]);
+        }}
+      }}
+      $fullOrdering = $this->input->get('list', [], 'array')['fullordering'] ?? '';
+      $ordering = is_string($fullOrdering) ? array_pad(explode(' ', trim($fullOrdering), 2), 2, 'ASC') : [''];
+      $orderingColumn = preg_replace('/^a\\./', '', $ordering[0]);
+      if (isset({listModelClassName}::FILTER_COLUMNS[$orderingColumn]))
+      {{
+        $this->modelState->set('list.ordering', 'a.' . $orderingColumn);
+        $this->modelState->set('list.direction', strtoupper(trim($ordering[1])) === 'DESC' ? 'DESC' : 'ASC');
+      }}
+      return parent::displayList();
+    }}"""
+      apiDisplayListPartial += self.prepareApiMetricsExecutePartial("    ")
+      apiControllerPhpFileContents = rf"""
             <?php
   namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Api\Controller;
 
   defined('_JEXEC') or die;
 
   use Joomla\CMS\MVC\Controller\ApiController;
-  use Joomla\Component\Fields\Administrator\Helper\FieldsHelper;
+  use Joomla\Component\Fields\Administrator\Helper\FieldsHelper;{apiControllerUsePartial}
 
   // {{controllerName}} here is merely a placeholder for the shared classnaming system across controllers, view folders (and possibly models)
   class {controllerName.capitalize()}Controller extends ApiController
@@ -325,13 +566,30 @@ Usage Example in Bash/sh/zsh:
           unset($data[$field->name]);
         }}
       }}
-      $this->input->set('data', $data);
-      return parent::save($recordKey);
-    }}
+      $this->input->set('data', $data);{apiSaveReturnPartial}
+    }}{apiDisplayListPartial}
   }}
             """[13:]
-          elif (self.apiControllerDesign == "unjoomla-fast"):
-            self.apiControllerPhpFileContents = rf"""
+      return apiControllerPhpFileContents
+
+    elif (self.apiControllerDesign == "unjoomla-fast"):
+      apiListPageMethodPartial = self.prepareApiListPageMethodPartial(controllerName)
+      apiTableQueryMethodsPartial = self.prepareApiTableQueryMethodsPartial(controllerName)
+      apiBulkWriteMethodsPartial = self.prepareApiBulkWriteMethodsPartial(controllerName)
+      apiGetDboExpression = "Factory::getContainer()->get('db')"
+      apiControllerUsePartial = ""
+      if (self.debugQueryRepeatThreshold is not None):
+        apiGetDboExpression = f"RepeatedQueryMonitor::attach({apiGetDboExpression})"
+        apiControllerUsePartial += f"""
+use {self.vendorName}\\Component\\{self.comNameInNamespaces}\\Administrator\\Helper\\RepeatedQueryMonitor;"""
+      if (self.apiServerTiming):
+        apiGetDboExpression = f"QueryTimingMonitor::attach({apiGetDboExpression})"
+        apiControllerUsePartial += f"""
+use {self.vendorName}\\Component\\{self.comNameInNamespaces}\\Api\\Helper\\QueryTimingMonitor;"""
+      if (self.apiMetrics):
+        apiControllerUsePartial += f"""
+use {self.vendorName}\\Component\\{self.comNameInNamespaces}\\Api\\Helper\\ApiMetrics;"""
+      apiControllerPhpFileContents = rf"""
             <?php
 namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Api\Controller;
 defined('_JEXEC') or die;
@@ -343,76 +601,9 @@ use Joomla\CMS\Filter\InputFilter;
 use Joomla\CMS\Factory;
 use Joomla\CMS\User\UserHelper as JUserTools;
 use Joomla\CMS\Log\Log;
+use Joomla\Database\ParameterType;
 
-/* UnJoomla Api Tools (welcome to FASTER J! API development)
-* This trait will probably evolve to become a class (installed by library package) in the future
-* and its methods will be statically called after inclusion by namespace.
-*/
-trait ApiTools {{
-  /**
-   * emitJson
-   *
-   * @author	Joe Hacobian
-   * @since	v0.0.1
-   * @access	public
-   * @param	mixed	$inputArr
-   * @return	void Writes Response & closes connection
-   */
-  public function emitJson($inputArr) {{
-    /* Thanks go out to Nicholas K. Dionysopoulos from Akeeba
-    for coming up with emitting JSON from Joomla this way.
-    */
-    header('Content-type:application/json;charset=utf-8');
-    // If you encounter otherwise intractable CORS issues, you may wish to uncomment the line below.
-    // header('Access-Control-Allow-Origin: *');
-    @ob_end_clean();
-    echo(json_encode($inputArr));
-    flush();
-    $this->app->close();
-    return;
-  }}
-
-  /**
-   * prepErrMsgExmplPldFmt
-   *
-   * @author	Joe Hacobian
-   * @since	v0.0.1
-   * @access	public
-   * @param	string	$pldString
-   * @param string  $pldMode --> encB64AndUri OR onlyEncUri OR literal
-   * @return string Returns payload string wrapped inside encoding functions according to the payload mode given in $pldMode
-   */
-  public function prepErrMsgExPldFmt($pldString, $pldMode)
-  {{
-    if (gettype($pldString) == 'string' && gettype($pldMode) == 'string')
-    {{
-      switch ($pldMode)
-      {{
-        case 'literal':
-          $formattedPayloadEncodingExample = $pldString;
-          break;
-        case 'onlyEncUri':
-          $formattedPayloadEncodingExample = "encodeURIComponent( '$pldString' )";
-          break;
-        case 'encB64AndUri':
-          $formattedPayloadEncodingExample = "encodeURIComponent( btoa( '$pldString' ) )";
-          break;
-        default:
-          $formattedPayloadEncodingExample = $pldString;
-          break;
-      }}
-      return $formattedPayloadEncodingExample;
-    }}
-    if (!isset($formattedPayloadEncodingExample))
-    {{
-      if ($pldString !== null && $pldMode !== null)
-      {{
-        return "Payload & Payload mode NOT supplied.";
-      }}
-    }}
-  }}
-}}
-
+use {self.vendorName}\Component\{self.comNameInNamespaces}\Api\Helper\ApiTools;{apiControllerUsePartial}
 
 class {controllerName.capitalize()}Controller extends ApiController
 {{
@@ -428,8 +619,8 @@ class {controllerName.capitalize()}Controller extends ApiController
   protected $res = [ 'success' => false ];
 
   // A utility method to get the J! database object
-  protected function getDbo() {{ return Factory::getContainer()->get('db'); }}
-
+  protected function getDbo() {{ return {apiGetDboExpression}; }}{self.prepareApiMetricsExecutePartial("  ")}
+{apiListPageMethodPartial}{apiTableQueryMethodsPartial}{apiBulkWriteMethodsPartial}
 
 
    /**
@@ -584,30 +775,468 @@ class {controllerName.capitalize()}Controller extends ApiController
 
 }}
             """[13:]
-          # then create the controller file and write contents to it in the controller folder
-          self.createFile(assetType = "f", targetPath = f"{self.apiControllerFolder}/{controllerName.capitalize()}Controller.php", fileContents = self.apiControllerPhpFileContents )
-          # Now go make the folders under the view directory matching these controller names
-          self.createFile( assetType = "d", targetPath = f"{self.apiViewFolder}/{controllerName}" )
-          self.apiViewPhpFileContents = f"""
+      return apiControllerPhpFileContents
+
+  # Keyset (seek) paginated list method for the unjoomla-fast design, empty unless --api-list-pagination="keyset"
+  def prepareApiListPageMethodPartial(self, controllerName):
+    if (self.apiListPagination != "keyset"):
+      return ""
+    listTable = self.tableSpec.tableForController(controllerName)
+    listTableName = f"{self.tablePrefix}{listTable['name']}"
+    keyColumns = listTable["primaryKey"]
+    keyColumn = keyColumns[0]
+    isIntegerKey = { columnName: self.tableSpec.isIntegerColumn(self.tableSpec.column(listTable, columnName)) for columnName in keyColumns }
+    cursorPosition = lambda rowValue: ", ".join(f"'{columnName}' => {'(int) ' if isIntegerKey[columnName] else ''}{rowValue(columnName)}" for columnName in keyColumns)
+    apiListPageCursorCheckPartial = f"!isset($cursor['{keyColumn}'])"
+    apiListPageOrderPartial = f"""
+      ->order($db->quoteName('{keyColumn}') . ' ASC')"""[1:]
+    apiListPageSeekPartial = rf"""
+      $afterId = (int) $cursor['{keyColumn}'];
+      $query->where($db->quoteName('{keyColumn}') . ' > :afterId')
+        ->bind(':afterId', $afterId, ParameterType::INTEGER);"""[1:]
+    if (len(keyColumns) > 1 or not isIntegerKey[keyColumn]):
+      # Seeks past the full primary key, "(a, b) > (x, y)" spelled out as a >= x AND (a > x OR (a = x AND b > y)) so the
+      # leading bound stays an index range scan, every placeholder is bound once
+      apiListPageCursorCheckPartial = "!isset(" + ", ".join(f"$cursor['{columnName}']" for columnName in keyColumns) + ")" + "".join(
+        f" || !is_scalar($cursor['{columnName}'])" for columnName in keyColumns if not isIntegerKey[columnName])
+      apiListPageOrderPartial = "\n".join(f"""      ->order($db->quoteName('{columnName}') . ' ASC')""" for columnName in keyColumns)
+      placeholders = []
+      def seekCondition(keyIndex, operator):
+        placeholders.append(( f":afterKey{keyIndex}_{sum(1 for _, index in placeholders if index == keyIndex)}", keyIndex ))
+        return f"{{$keyNames[{keyIndex}]}} {operator} {placeholders[-1][0]}"
+      seekWherePartials = [ f'"{seekCondition(0, ">=")}"' ] if len(keyColumns) > 1 else []
+      seekTerms = [ " AND ".join([ seekCondition(equalIndex, "=") for equalIndex in range(keyIndex) ] + [ seekCondition(keyIndex, ">") ]) for keyIndex in range(len(keyColumns)) ]
+      seekWherePartials.append('"(' + " OR ".join([ seekTerms[0] ] + [ f"({seekTerm})" for seekTerm in seekTerms[1:] ]) + ')"')
+      apiListPageSeekPartial = "\n".join(f"""      $afterKey{keyIndex} = ({'int' if isIntegerKey[columnName] else 'string'}) $cursor['{columnName}'];""" for keyIndex, columnName in enumerate(keyColumns))
+      apiListPageSeekPartial += f"""\n      // Rows after ({', '.join(keyColumns)}) of the cursor\n      $keyNames = $db->quoteName([{', '.join(f"'{columnName}'" for columnName in keyColumns)}]);"""
+      apiListPageSeekPartial += "\n      $query" + "".join(f"""->where({condition})
+        """ for condition in seekWherePartials)
+      apiListPageSeekPartial += "\n        ".join(f"""->bind('{placeholder}', $afterKey{keyIndex}, ParameterType::{'INTEGER' if isIntegerKey[keyColumns[keyIndex]] else 'STRING'})""" for placeholder, keyIndex in placeholders) + ";"
+    if (self.apiJsonEmitter == "streamed"):
+      # Rows go straight from the database iterator to the client, the extra (limit + 1)th row only tells us there is a next page.
+      apiListPageEmitPartial = rf"""
+    $db->setQuery($query);
+    $rowIterator = $db->getIterator();
+    $hasMore = false;
+    $pageRows = (function () use ($rowIterator, $limit, &$hasMore) {{
+      $rowCount = 0;
+      foreach ($rowIterator as $row)
+      {{
+        if ($rowCount++ === $limit) {{ $hasMore = true; break; }}
+        yield $row;
+      }}
+    }})();
+
+    $this->emitJsonStream($pageRows, function ($lastRow, $rowCount) use (&$hasMore) {{
+      return [ 'next_cursor' => ($hasMore && $lastRow !== null) ? $this->encodeCursor([ {cursorPosition(lambda columnName: f'$lastRow->{columnName}')} ]) : null ];
+    }});
+    return;"""[1:]
+    else:
+      apiListPageEmitPartial = rf"""
+    $db->setQuery($query);
+    $rows = $db->loadAssocList();
+    $hasMore = count($rows) > $limit;
+    if ($hasMore) {{ array_pop($rows); }}
+    $lastRow = end($rows);
+
+    $this->res['success'] = true;
+    $this->res['data'] = $rows;
+    $this->res['next_cursor'] = ($hasMore && $lastRow !== false) ? $this->encodeCursor([ {cursorPosition(lambda columnName: f"$lastRow['{columnName}']")} ]) : null;
+    $this->emitJson($this->res);
+    return;"""[1:]
+    apiListPageSelectPartial = """
+    $query = $db->getQuery(true)
+      ->select('*')"""[1:]
+    apiListPageFieldsDocPartial = ""
+    if (self.apiSparseFieldsets):
+      apiListPageSelectPartial = rf"""
+    // JSON:API sparse fieldset: fields[{controllerName.lower()}]=a,b reads only those columns (within the table spec's apiFields) and the key,
+    // unknown names are ignored and a fieldset without a known name reads every apiFields column, as JsonapiView::sparseFieldset() does
+    $selectableColumns = [{', '.join(f"'{columnName}'" for columnName in self.tableSpec.apiFieldNames(listTable))}];
+    $requestedFields = $this->input->get('fields', [], 'array')['{controllerName.lower()}'] ?? '';
+    $columns = is_string($requestedFields) ? array_intersect($selectableColumns, array_map('trim', explode(',', $requestedFields))) : [];
+    $columns = count($columns) > 0 ? array_values(array_unique(array_merge([{', '.join(f"'{columnName}'" for columnName in keyColumns)}], $columns))) : $selectableColumns;
+
+    $query = $db->getQuery(true)
+      ->select($db->quoteName($columns))"""[1:]
+      apiListPageFieldsDocPartial = f"""
+   * @param	array	$this->input->get('fields', [], 'array')['{controllerName.lower()}'] comma separated columns to return"""
+    apiListPageMethodPartial = rf"""
+
+  /**
+   * get{controllerName.capitalize()}Page
+   *
+   * Keyset (seek) paginated listing of {listTableName}, ordered by {', '.join(keyColumns)}.
+   * The client passes back the opaque next_cursor of the previous page, no OFFSET scans are involved.
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	string	$this->input->get('cursor', null, 'cmd')
+   * @param	int	$this->input->get('limit', 50, 'int'){apiListPageFieldsDocPartial}
+   * @return	void {{ "success" : true | false, [ "data" : [ {{ row }}, ... ], "next_cursor" : "<cursor>" | null | "message" : "<message>"] }}
+   */
+  public function get{controllerName.capitalize()}Page()
+  {{
+    $db = $this->getDbo();
+    $limit = min(max((int) $this->input->get('limit', 50, 'int'), 1), 500);
+    $cursorString = $this->input->get('cursor', null, 'cmd');
+    $cursor = ($cursorString !== null && $cursorString !== '') ? $this->decodeCursor($cursorString) : null;
+
+    if ($cursorString !== null && $cursorString !== '' && ($cursor === null || {apiListPageCursorCheckPartial}))
+    {{
+      http_response_code(400);
+      $this->res['success'] = false;
+      $this->res['message'] = "The given cursor is invalid, please pass back the next_cursor value of the previous page.";
+      $this->emitJson($this->res);
+      return;
+    }}
+
+{apiListPageSelectPartial}
+      ->from($db->quoteName('{listTableName}'))
+{apiListPageOrderPartial}
+      ->setLimit($limit + 1);
+
+    if ($cursor !== null)
+    {{
+{apiListPageSeekPartial}
+    }}
+
+{apiListPageEmitPartial}
+  }}"""
+    return apiListPageMethodPartial
+
+  # The write-behind queue table, pluginMaker's task plugin relies on these column names (see --api-write-behind-queue)
+  def writeBehindQueueTableSpec(self):
+    return TableSpec({ "tables": [ {
+      "name": "queue",
+      "columns": [
+        { "name": "id",           "type": "BIGINT UNSIGNED AUTO_INCREMENT", "nullable": False },
+        { "name": "job",          "type": "VARCHAR(255)",      "nullable": False, "comment": "Static callable Class::method the consumer calls with the payload" },
+        { "name": "payload",      "type": "MEDIUMTEXT",        "nullable": False, "comment": "JSON encoded job arguments" },
+        { "name": "state",        "type": "TINYINT",           "nullable": False, "default": 0, "comment": "0 pending, 1 running, 3 failed for good (done jobs are deleted)" },
+        { "name": "attempts",     "type": "SMALLINT UNSIGNED", "nullable": False, "default": 0 },
+        { "name": "available_at", "type": "DATETIME",          "nullable": False, "comment": "UTC, the job is not run before it (retries are pushed back here)" },
+        { "name": "locked_until", "type": "DATETIME",          "comment": "UTC, a running job whose lease ran out is claimed again" },
+        { "name": "claim_token",  "type": "CHAR(32)" },
+        { "name": "last_error",   "type": "TEXT" },
+        { "name": "created",      "type": "DATETIME",          "nullable": False },
+      ],
+      "primaryKey": [ "id" ],
+      "queries": [ { "name": "due", "equality": [ "state" ], "range": "available_at" }, { "name": "claimed", "equality": [ "claim_token" ] } ],
+    } ] }, source = "the write-behind queue")
+
+  # The statement the save paths run to drop the site view cache, see --site-view-cache
+  def viewCachePurgeStatement(self):
+    return f"\\{self.vendorName}\\Component\\{self.comNameInNamespaces}\\Administrator\\Helper\\ViewCache::purge();"
+
+  # bulkCreate() / bulkUpdate() writing to the controller's table through its generated <TableClassName>Writer, empty unless --api-bulk-write
+  def prepareApiBulkWriteMethodsPartial(self, controllerName):
+    if (not self.apiBulkWrite):
+      return ""
+    writeTable = self.tableSpec.tableForController(controllerName)
+    writerClass = f"\\{self.vendorName}\\Component\\{self.comNameInNamespaces}\\Administrator\\Helper\\{self.tableSpec.tableClassName(writeTable)}Writer"
+    exampleColumn = next((column["name"] for column in writeTable["columns"] if not self.tableSpec.isAutoIncrementColumn(column)), writeTable["columns"][0]["name"])
+    primaryKey = ", ".join(writeTable["primaryKey"])
+    primaryKeyExample = ", ".join(f'"{columnName}" : ' + ("42" if self.tableSpec.isIntegerColumn(self.tableSpec.column(writeTable, columnName)) else '"..."') for columnName in writeTable["primaryKey"])
+    responseKeyExample = "42" if len(writeTable["primaryKey"]) == 1 else f"{{ {primaryKeyExample} }}"
+    updateExampleColumn = next((column["name"] for column in writeTable["columns"] if column["name"] not in writeTable["primaryKey"]), exampleColumn)
+    viewCachePurgePartial = f"\n        {self.viewCachePurgeStatement()}" if self.siteViewCache else ""
+    apiBulkWriteMethodsPartial = rf"""
+
+  /**
+   * bulkCreate
+   *
+   * Validates every record, then inserts the valid ones into {self.tablePrefix}{writeTable['name']} in one transaction with multi-row INSERTs.
+   * Invalid records are reported and skipped, a database error rolls every record back.
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	string	$this->input->json->getRaw() [ {{ "{exampleColumn}" : "..." }}, ... ] at most {self.apiBulkMaxItems} records
+   * @return	void {{ "success" : true | false, [ "data" : [ {{ "index" : 0, "status" : 201, "id" : {responseKeyExample} }} | {{ "index" : 1, "status" : 422, "errors" : [ "..." ] }}, ... ] | "message" : "<message>"] }}
+   */
+  public function bulkCreate()
+  {{
+    $items = $this->readBulkItems();
+    if ($items === null)
+    {{
+      return;
+    }}
+    $writer = {writerClass}::class;
+    $db = $this->getDbo();
+    $results = [];
+    $validItems = [];
+    foreach ($items as $index => $item)
+    {{
+      $errors = $writer::validate($item, false);
+      if ($errors !== []) {{ $results[$index] = [ 'index' => $index, 'status' => 422, 'errors' => $errors ]; }}
+      else {{ $validItems[$index] = $item; }}
+    }}
+
+    if ($validItems !== [])
+    {{
+      try
+      {{
+        $db->transactionStart();
+        $keys = $writer::insertRows($db, array_values($validItems));
+        $db->transactionCommit();{viewCachePurgePartial}
+        foreach (array_keys($validItems) as $position => $index)
+        {{
+          $results[$index] = [ 'index' => $index, 'status' => 201, 'id' => $keys[$position] ];
+        }}
+      }}
+      catch (\RuntimeException $e)
+      {{
+        $db->transactionRollback();
+        Log::add('bulkCreate rolled back: ' . $e->getMessage(), Log::ERROR);
+        foreach (array_keys($validItems) as $index)
+        {{
+          $results[$index] = [ 'index' => $index, 'status' => 500, 'message' => "Not written, the batch was rolled back." ];
+        }}
+      }}
+    }}
+
+    ksort($results);
+    $this->res['success'] = count(array_filter($results, function ($result) {{ return $result['status'] !== 201; }})) === 0;
+    $this->res['data'] = array_values($results);
+    $this->emitJson($this->res);
+    return;
+  }}
+
+
+  /**
+   * bulkUpdate
+   *
+   * Validates every record, then updates the valid ones (found by {primaryKey}) in {self.tablePrefix}{writeTable['name']} in one transaction,
+   * one multi-row UPDATE per set of columns given. Only the columns a record carries are changed.
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	string	$this->input->json->getRaw() [ {{ {primaryKeyExample}, "{updateExampleColumn}" : "..." }}, ... ] at most {self.apiBulkMaxItems} records
+   * @return	void {{ "success" : true | false, [ "data" : [ {{ "index" : 0, "status" : 200, "id" : {responseKeyExample} }} | {{ "index" : 1, "status" : 404 | 409 | 422, ... }}, ... ] | "message" : "<message>"] }}
+   */
+  public function bulkUpdate()
+  {{
+    $items = $this->readBulkItems();
+    if ($items === null)
+    {{
+      return;
+    }}
+    $writer = {writerClass}::class;
+    $db = $this->getDbo();
+    $results = [];
+    $validItems = [];
+    $seenKeys = [];
+    foreach ($items as $index => $item)
+    {{
+      $errors = $writer::validate($item, true);
+      if ($errors !== [])
+      {{
+        $results[$index] = [ 'index' => $index, 'status' => 422, 'errors' => $errors ];
+      }}
+      elseif (isset($seenKeys[$writer::keyString($item)]))
+      {{
+        $results[$index] = [ 'index' => $index, 'status' => 409, 'message' => "Record " . $seenKeys[$writer::keyString($item)] . " already updates this " . implode(', ', $writer::PRIMARY_KEY) . "." ];
+      }}
+      else
+      {{
+        $seenKeys[$writer::keyString($item)] = $index;
+        $validItems[$index] = $item;
+      }}
+    }}
+
+    if ($validItems !== [])
+    {{
+      $updatedItems = [];
+      try
+      {{
+        $db->transactionStart();
+        $existingKeys = array_flip($writer::existingKeys($db, array_values($validItems)));
+        foreach ($validItems as $index => $item)
+        {{
+          if (isset($existingKeys[$writer::keyString($item)])) {{ $updatedItems[$index] = $item; }}
+          else {{ $results[$index] = [ 'index' => $index, 'status' => 404, 'message' => "No record has this " . implode(', ', $writer::PRIMARY_KEY) . "." ]; }}
+        }}
+        $writer::updateRows($db, array_values($updatedItems));
+        $db->transactionCommit();{viewCachePurgePartial}
+        foreach ($updatedItems as $index => $item)
+        {{
+          $results[$index] = [ 'index' => $index, 'status' => 200, 'id' => $writer::keyOf($item) ];
+        }}
+      }}
+      catch (\RuntimeException $e)
+      {{
+        $db->transactionRollback();
+        Log::add('bulkUpdate rolled back: ' . $e->getMessage(), Log::ERROR);
+        foreach (array_keys($updatedItems ?: $validItems) as $index)
+        {{
+          $results[$index] = [ 'index' => $index, 'status' => 500, 'message' => "Not written, the batch was rolled back." ];
+        }}
+      }}
+    }}
+
+    ksort($results);
+    $this->res['success'] = count(array_filter($results, function ($result) {{ return $result['status'] !== 200; }})) === 0;
+    $this->res['data'] = array_values($results);
+    $this->emitJson($this->res);
+    return;
+  }}"""
+    return apiBulkWriteMethodsPartial
+
+  # The distinct tables the API controllers write to with --api-bulk-write
+  def apiBulkWriteTables(self):
+    bulkWriteTables = []
+    for controllerName in self.apiControllerNames:
+      table = self.tableSpec.tableForController(controllerName)
+      if (table not in bulkWriteTables):
+        bulkWriteTables.append(table)
+    return bulkWriteTables
+
+  def apiTableQueryMethodName(self, query):
+    return f"get{query['name'][0].upper()}{query['name'][1:]}"
+
+  # The public methods generated into an unjoomla-fast controller, i.e. the ones a batch may call
+  def apiControllerGeneratedMethodNames(self, controllerName):
+    methodNames = []
+    if (self.apiListPagination == "keyset"):
+      methodNames.append(f"get{controllerName.capitalize()}Page")
+    for table in self.tableSpec.tables:
+      if ((table["controller"] or "").lower() == controllerName.lower()):
+        methodNames += [ self.apiTableQueryMethodName(query) for query in table["queries"] ]
+    return methodNames
+
+  # One method per lookup declared (in the table spec) on the tables mapped to this controller via "controller"
+  def prepareApiTableQueryMethodsPartial(self, controllerName):
+    apiTableQueryMethodsPartial = ""
+    for table in self.tableSpec.tables:
+      if ((table["controller"] or "").lower() != controllerName.lower()):
+        continue
+      queriesClass = f"\\{self.vendorName}\\Component\\{self.comNameInNamespaces}\\Administrator\\Helper\\{self.tableSpec.tableClassName(table)}Queries"
+      for query in table["queries"]:
+        methodName = self.apiTableQueryMethodName(query)
+        paramDocs = ""
+        equalsEntries = ""
+        for columnName in query["equality"]:
+          inputFilter = "int" if self.tableSpec.isIntegerColumn(self.tableSpec.column(table, columnName)) else "string"
+          paramDocs += f"\n   * @param	{inputFilter}	$this->input->get('{columnName}', null, '{inputFilter}')"
+          equalsEntries += f"\n      '{columnName}' => $this->input->get('{columnName}', null, '{inputFilter}'),"
+        apiQueryEqualsPartial = """
+    $equals = [];"""[1:]
+        if (equalsEntries != ""):
+          apiQueryEqualsPartial = rf"""
+    $equals = [{equalsEntries}
+    ];
+    foreach ($equals as $column => $value)
+    {{
+      if ($value === null)
+      {{
+        http_response_code(400);
+        $this->res['success'] = false;
+        $this->res['message'] = "The parameter " . $column . " is required.";
+        $this->emitJson($this->res);
+        return;
+      }}
+    }}"""[1:]
+        rangeArgs = "null, null"
+        if (query["range"]):
+          inputFilter = "int" if self.tableSpec.isIntegerColumn(self.tableSpec.column(table, query["range"])) else "string"
+          paramDocs += f"\n   * @param	{inputFilter}	$this->input->get('{query['range']}_from', null, '{inputFilter}')"
+          paramDocs += f"\n   * @param	{inputFilter}	$this->input->get('{query['range']}_to', null, '{inputFilter}')"
+          rangeArgs = f"$this->input->get('{query['range']}_from', null, '{inputFilter}'), $this->input->get('{query['range']}_to', null, '{inputFilter}')"
+        if (self.apiJsonEmitter == "streamed"):
+          apiQueryEmitPartial = """
+    $this->emitJsonStream($db->getIterator());
+    return;"""[1:]
+        else:
+          apiQueryEmitPartial = """
+    $this->res['success'] = true;
+    $this->res['data'] = $db->loadAssocList();
+    $this->emitJson($this->res);
+    return;"""[1:]
+        apiTableQueryMethodsPartial += rf"""
+
+  /**
+   * {methodName}
+   *
+   * Runs the "{query['name']}" lookup declared in the table spec for {self.tablePrefix}{table['name']}.
+   *
+   * @since	{self.comVersion}
+   * @access	public{paramDocs}
+   * @param	int	$this->input->get('limit', 50, 'int')
+   * @return	void {{ "success" : true | false, [ "data" : [ {{ row }}, ... ] | "message" : "<message>"] }}
+   */
+  public function {methodName}()
+  {{
+    $db = $this->getDbo();
+{apiQueryEqualsPartial}
+    $limit = min(max((int) $this->input->get('limit', 50, 'int'), 1), 500);
+
+    $db->setQuery({queriesClass}::{query['name']}($db, $equals, {rangeArgs}, $limit));
+{apiQueryEmitPartial}
+  }}"""
+    return apiTableQueryMethodsPartial
+
+  def prepareApiViewPhpFileContents(self, controllerName):
+    apiViewUsePartial = ""
+    apiViewFieldsPartial = """
+    protected $fieldsToRenderItem = ['id', 'alias', 'name', 'catid'];
+    protected $fieldsToRenderList = ['id', 'alias', 'name', 'catid'];"""[1:]
+    apiViewListSparsePartial = ""
+    apiViewItemSparsePartial = ""
+    if (self.apiSparseFieldsets):
+      sparseTable = self.tableSpec.tableForController(controllerName)
+      apiViewUsePartial = """
+  use Joomla\CMS\Factory;"""
+      apiViewFieldsPartial = f"""
+    /**
+     * Columns of {self.tablePrefix}{sparseTable['name']} a client may ask for with fields[{controllerName.lower()}]=a,b (JSON:API sparse fieldsets), from the table spec
+     */
+    public const SPARSE_FIELDS = [{', '.join(f"'{columnName}'" for columnName in self.tableSpec.apiFieldNames(sparseTable))}];
+
+    protected $fieldsToRenderItem = self::SPARSE_FIELDS;
+    protected $fieldsToRenderList = self::SPARSE_FIELDS;
+
+    /**
+     * The primary key, rendered whatever the sparse fieldset
+     */
+    public const KEY_FIELDS = [{', '.join(f"'{columnName}'" for columnName in sparseTable['primaryKey'])}];
+
+    /**
+     * The fields of the fields[{controllerName.lower()}] request param within $available plus the primary key. Unknown names are
+     * ignored, all of $available is returned when the client asked for none it may read (the rule of the unjoomla-fast list too)
+     */
+    public static function sparseFieldset(array $available): array
+    {{
+      $requested = Factory::getApplication()->input->get('fields', [], 'array')['{controllerName.lower()}'] ?? '';
+      $fields = is_string($requested) ? array_intersect($available, array_map('trim', explode(',', $requested))) : [];
+      if (count($fields) === 0)
+      {{
+        return $available;
+      }}
+      return array_values(array_unique(array_merge(array_intersect(self::KEY_FIELDS, $available), $fields)));
+    }}"""[1:]
+      apiViewListSparsePartial = """
+      $this->fieldsToRenderList = self::sparseFieldset($this->fieldsToRenderList);"""
+      apiViewItemSparsePartial = """
+      $this->fieldsToRenderItem = self::sparseFieldset($this->fieldsToRenderItem);"""
+    apiViewPhpFileContents = f"""
           <?php
   namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Api\View\{controllerName.capitalize()};
 
   defined('_JEXEC') or die;
-
+{apiViewUsePartial}
   use Joomla\CMS\MVC\View\JsonApiView as BaseApiView;
   use Joomla\Component\Fields\Administrator\Helper\FieldsHelper;
 
   class JsonapiView extends BaseApiView
   {{
-    protected $fieldsToRenderItem = ['id', 'alias', 'name', 'catid'];
-    protected $fieldsToRenderList = ['id', 'alias', 'name', 'catid'];
+{apiViewFieldsPartial}
 
     public function displayList(array $items = null)
     {{
       foreach (FieldsHelper::getFields('{self.comFolderName}.{controllerName.lower()}') as $field)
       {{
         $this->fieldsToRenderList[] = $field->id;
-      }}
+      }}{apiViewListSparsePartial}
       return parent::displayList();
     }}
 
@@ -616,7 +1245,7 @@ class {controllerName.capitalize()}Controller extends ApiController
       foreach (FieldsHelper::getFields('{self.comFolderName}.{controllerName.lower()}') as $field)
       {{
         $this->fieldsToRenderItem[] = $field->name;
-      }}
+      }}{apiViewItemSparsePartial}
       return parent::displayItem();
     }}
 
@@ -630,192 +1259,1643 @@ class {controllerName.capitalize()}Controller extends ApiController
     }}
   }}
           """[11:]
-          # then create the view file and write contents to it in the view folder
-          self.createFile(assetType = "f", targetPath = f"{self.apiViewFolder}/{controllerName.capitalize()}/JsonapiView.php", fileContents = self.apiViewPhpFileContents )
-      else:
-        # If the user only supplies a single string (non comma separated, then just create a single pair of controller and view files)
-        self.apiControllerName = self.apiControllerNamesStr
-        self.apiControllerPhpFileContents = f"""
-        <?php
-namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Api\Controller;
-
-defined('_JEXEC') or die;
-
-use Joomla\CMS\MVC\Controller\ApiController;
-use Joomla\Component\Fields\Administrator\Helper\FieldsHelper;
-
-// {{self.apiControllerName}} here is merely a placeholder for the shared classnaming system across controllers, view folders (and possibly models)
-class {self.apiControllerName.capitalize()}Controller extends ApiController
-{{
-	protected $contentType = '{self.apiControllerName.lower()}'; /* My understanding is that this maps to the desired model name */
-	protected $default_view = '{self.apiControllerName.lower()}'; /* This maps to the folder name containing the JSON API view */
-
-	protected function save($recordKey = null)
-	{{
-		$data = (array) json_decode($this->input->json->getRaw(), true);
-		foreach (FieldsHelper::getFields('{self.comFolderName}.{self.apiControllerName.lower()}') as $field) // This probably looks for a model of the same name
-		{{
-			if (isset($data[$field->name]))
-			{{
-				!isset($data['com_fields']) && $data['com_fields'] = [];
-				$data['com_fields'][$field->name] = $data[$field->name];
-				unset($data[$field->name]);
-			}}
-		}}
-		$this->input->set('data', $data);
-		return parent::save($recordKey);
-	}}
-}}
-        """[11:]
-        # then create the controller file and write contents to it in the controller folder
-        self.createFile(assetType = "f", targetPath = f"{self.apiControllerFolder}/{self.apiControllerName.capitalize()}Controller.php", fileContents = self.apiControllerPhpFileContents )
-        # Now go make the folders under the view directory matching these controller names
-        self.createFile( assetType = "d", targetPath = f"{self.apiViewFolder}/{self.apiControllerName}" )
-        self.apiViewPhpFileContents = f"""
-        <?php
-namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Api\View\{self.apiControllerName.capitalize()};
-
-defined('_JEXEC') or die;
-
-use Joomla\CMS\MVC\View\JsonApiView as BaseApiView;
-use Joomla\Component\Fields\Administrator\Helper\FieldsHelper;
+    return apiViewPhpFileContents
+
+  # A php single quoted string literal of value
+  def phpStringLiteral(self, value):
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+  # The ApiTools emitJson method, the original one-shot emitter unless an --api-json-etag / cache-control / compress option is given
+  def prepareApiToolsEmitJsonPartial(self):
+    apiToolsCapturePartial = ""
+    if (self.apiBatchController):
+      apiToolsCapturePartial = """
+    if ($this->captureResponse)
+    {
+      // Dispatched in-process by the BatchController, hand the payload back instead of writing it out
+      $this->capturedResponse = $inputArr;
+      return;
+    }"""
+    if (self.apiMetrics):
+      # Counted before the payload goes out, the emitters close the connection (the 304 path included) so execute() never gets to
+      apiToolsCapturePartial += """
+    ApiMetrics::record(http_response_code() >= 400 || (is_array($inputArr) && ($inputArr['success'] ?? true) === false));"""
+    encodeExpression = "json_encode($inputArr)"
+    timingMethodsPartial = ""
+    timingCacheablePartial = ""
+    if (self.apiServerTiming):
+      timingCacheablePartial = """
+    // A debug "_meta" block (see encodeTimedJson) differs on every response, no ETag could ever match it
+    $cacheable = $cacheable && !(is_array($inputArr) && $this->app->get('debug'));"""
+      encodeExpression = "$this->encodeTimedJson($inputArr)"
+      timingMethodsPartial = rf"""
 
-class JsonapiView extends BaseApiView
-{{
-	protected $fieldsToRenderItem = ['id', 'alias', 'name', 'catid'];
-	protected $fieldsToRenderList = ['id', 'alias', 'name', 'catid'];
-
-	public function displayList(array $items = null)
-	{{
-		foreach (FieldsHelper::getFields('{self.comFolderName}.{self.apiControllerName.lower()}') as $field)
-		{{
-			$this->fieldsToRenderList[] = $field->id;
-		}}
-		return parent::displayList();
-	}}
-
-	public function displayItem($item = null)
-	{{
-		foreach (FieldsHelper::getFields('{self.comFolderName}.{self.apiControllerName.lower()}') as $field)
-		{{
-			$this->fieldsToRenderItem[] = $field->name;
-		}}
-		return parent::displayItem();
-	}}
-
-	protected function prepareItem($item)
-	{{
-		foreach (FieldsHelper::getFields('{self.comFolderName}.{self.apiControllerName.lower()}', $item, true) as $field)
-		{{
-			$item->{{$field->name}} = isset($field->apivalue) ? $field->apivalue : $field->rawvalue;
-		}}
-		return parent::prepareItem($item);
-	}}
-}}
-        """[11:]
-        # then create the view file and write contents to it in the view folder
-        self.createFile(assetType = "f", targetPath = f"{self.apiViewFolder}/{self.apiControllerName.capitalize()}/JsonapiView.php", fileContents = self.apiViewPhpFileContents )
+  /**
+   * encodeTimedJson
+   *
+   * json_encode()s the payload and sends the Server-Timing header, with the site in debug mode
+   * array payloads gain a "_meta" block holding the query count and database time.
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	mixed	$inputArr
+   * @return	string The JSON body
+   */
+  public function encodeTimedJson($inputArr)
+  {{
+    if (is_array($inputArr) && $this->app->get('debug'))
+    {{
+      $inputArr['_meta'] = $this->timingMeta();
+    }}
+    $jsonStarted = microtime(true);
+    $body = json_encode($inputArr);
+    header('Server-Timing: ' . $this->serverTiming(microtime(true) - $jsonStarted));
+    return $body;
+  }}
 
-  def setupAdminServicesProviderPhpFile(self):
-    ################################### Create admin services provider.php ###################################
-    adminServicesProviderPhpFile = f"{self.adminFolder}/services/provider.php"
-    #################################### START Admin services provider.php ###################################
-    adminServicesProviderPhpFileContents = f"""
-    <?php
-    defined('_JEXEC') or die;
+  /**
+   * timingMeta
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @return	array [ 'queries' => <query count>, 'dbMs' => <database time>, 'elapsedMs' => <time since the request started> ]
+   */
+  public function timingMeta()
+  {{
+    $queryTimer = QueryTimingMonitor::current();
+    return [
+      'queries' => ($queryTimer !== null) ? $queryTimer->queryCount : 0,
+      'dbMs' => round((($queryTimer !== null) ? $queryTimer->queryTime : 0) * 1000, 3),
+      'elapsedMs' => round((microtime(true) - $this->input->server->getFloat('REQUEST_TIME_FLOAT', microtime(true))) * 1000, 3),
+    ];
+  }}
 
-    use Joomla\CMS\Dispatcher\ComponentDispatcherFactoryInterface;
-    use Joomla\CMS\Extension\ComponentInterface;
-    use Joomla\CMS\Extension\MVCComponent;
-    use Joomla\CMS\Extension\Service\Provider\ComponentDispatcherFactory;
-    use Joomla\CMS\Extension\Service\Provider\MVCFactory;
-    use Joomla\CMS\MVC\Factory\MVCFactoryInterface;
-    use Joomla\DI\Container;
+  /**
+   * serverTiming
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	float|null	$jsonSeconds	Time spent encoding the payload, null when it isn't known yet (streamed responses)
+   * @return	string The Server-Timing header value e.g. db;dur=4.2;desc="3 queries", json;dur=0.31, total;dur=18.6
+   */
+  public function serverTiming($jsonSeconds = null)
+  {{
+    $meta = $this->timingMeta();
+    $metrics = [ 'db;dur=' . $meta['dbMs'] . ';desc="' . $meta['queries'] . ' queries"' ];
+    if ($jsonSeconds !== null)
+    {{
+      $metrics[] = 'json;dur=' . round($jsonSeconds * 1000, 3);
+    }}
+    $metrics[] = 'total;dur=' . $meta['elapsedMs'];
+    return implode(', ', $metrics);
+  }}"""
+    if (not self.apiJsonEtag and self.apiJsonCacheControl is None and self.apiJsonCompressMinBytes is None):
+      return rf"""
+  /**
+   * emitJson
+   *
+   * @author	Joe Hacobian
+   * @since	v0.0.1
+   * @access	public
+   * @param	mixed	$inputArr
+   * @return	void Writes Response & closes connection
+   */
+  public function emitJson($inputArr) {{{apiToolsCapturePartial}
+    /* Thanks go out to Nicholas K. Dionysopoulos from Akeeba
+    for coming up with emitting JSON from Joomla this way.
+    */
+    header('Content-type:application/json;charset=utf-8');
+    // If you encounter otherwise intractable CORS issues, you may wish to uncomment the line below.
+    // header('Access-Control-Allow-Origin: *');
+    @ob_end_clean();
+    echo({encodeExpression});
+    flush();
+    $this->app->close();
+    return;
+  }}{timingMethodsPartial}"""[1:]
+    cacheControlPartial = ""
+    if (self.apiJsonCacheControl is not None):
+      cacheControlPartial = f"""
+    header('Cache-Control: ' . ($cacheable ? {self.phpStringLiteral(self.apiJsonCacheControl)} : 'no-store'));"""
+    compressionPartial = ""
+    compressionMethodsPartial = ""
+    etagHeaderValue = """'ETag: "' . $hash . '"'"""
+    if (self.apiJsonCompressMinBytes is not None):
+      etagHeaderValue = """'ETag: "' . $hash . ($contentEncoding !== null ? '-' . $contentEncoding : '') . '"'"""
+      compressionPartial = rf"""
+    header('Vary: Accept-Encoding');
+    $contentEncoding = $this->negotiateContentEncoding(strlen($body));"""
+      compressionMethodsPartial = rf"""
+
+  /**
+   * negotiateContentEncoding
+   *
+   * Picks gzip, then deflate, from the request's Accept-Encoding (honouring q=0) for bodies of at least {self.apiJsonCompressMinBytes} bytes.
+   * Returns null when zlib is missing or PHP is already compressing the output (zlib.output_compression).
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	int	$bodyLength
+   * @return	string|null gzip, deflate or null to send the body as is
+   */
+  public function negotiateContentEncoding($bodyLength)
+  {{
+    if ($bodyLength < {self.apiJsonCompressMinBytes} || !function_exists('gzencode') || ini_get('zlib.output_compression'))
+    {{
+      return null;
+    }}
+    $accepted = [];
+    foreach (explode(',', strtolower($this->input->server->getString('HTTP_ACCEPT_ENCODING', ''))) as $coding)
+    {{
+      $params = explode(';', $coding);
+      $quality = 1.0;
+      foreach (array_slice($params, 1) as $param)
+      {{
+        $param = trim($param);
+        if (strpos($param, 'q=') === 0) {{ $quality = (float) substr($param, 2); }}
+      }}
+      $accepted[trim($params[0])] = $quality;
+    }}
+    foreach (['gzip', 'deflate'] as $coding)
+    {{
+      if (($accepted[$coding] ?? $accepted['*'] ?? 0) > 0) {{ return $coding; }}
+    }}
+    return null;
+  }}"""
+    etagPartial = ""
+    etagMethodsPartial = ""
+    if (self.apiJsonEtag):
+      etagPartial = rf"""
+    if ($cacheable)
+    {{
+      // Strong validator of the exact bytes sent, the coding suffix keeps gzip & identity representations apart
+      $hash = md5($body);
+      header({etagHeaderValue});
+      if ($lastModified !== null)
+      {{
+        header('Last-Modified: ' . gmdate('D, d M Y H:i:s', $lastModified) . ' GMT');
+      }}
+      if ($this->requestIsFresh($hash, $lastModified))
+      {{
+        http_response_code(304);
+        flush();
+        $this->app->close();
+        return;
+      }}
+    }}"""
+      etagMethodsPartial = rf"""
+
+  /**
+   * requestIsFresh
+   *
+   * If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2), matching uses the weak comparison so
+   * W/ prefixed and content coding suffixed tags of the same body still match.
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	string	$hash	md5 of the response body
+   * @param	int|null	$lastModified	Unix timestamp of the newest data in the response
+   * @return	bool true when the client's cached copy is current and a 304 can be sent
+   */
+  public function requestIsFresh($hash, $lastModified = null)
+  {{
+    $ifNoneMatch = $this->input->server->getString('HTTP_IF_NONE_MATCH', '');
+    if ($ifNoneMatch !== '')
+    {{
+      foreach (explode(',', $ifNoneMatch) as $tag)
+      {{
+        $tag = trim($tag);
+        if ($tag === '*' || preg_replace('/^(W\/)?"([0-9a-f]{{32}})(-[a-z]+)?"$/', '$2', $tag) === $hash) {{ return true; }}
+      }}
+      return false;
+    }}
+    $ifModifiedSince = $this->input->server->getString('HTTP_IF_MODIFIED_SINCE', '');
+    if ($lastModified !== null && $ifModifiedSince !== '')
+    {{
+      $since = strtotime($ifModifiedSince);
+      return ($since !== false && $lastModified <= $since);
+    }}
+    return false;
+  }}"""
+    compressBodyPartial = ""
+    if (self.apiJsonCompressMinBytes is not None):
+      compressBodyPartial = rf"""
+    if ($contentEncoding !== null)
+    {{
+      // HTTP "deflate" is the zlib format, i.e. gzcompress() rather than gzdeflate()
+      $body = ($contentEncoding === 'gzip') ? gzencode($body, 6) : gzcompress($body, 6);
+      header('Content-Encoding: ' . $contentEncoding);
+    }}"""
+    return rf"""
+  /**
+   * emitJson
+   *
+   * Only successful GET (& HEAD) responses are cacheable, everything else is sent with the same headers as before.
+   *
+   * @author	Joe Hacobian
+   * @since	v0.0.1
+   * @access	public
+   * @param	mixed	$inputArr
+   * @param	int|null	$lastModified	Optional unix timestamp of the newest data in $inputArr, sent as Last-Modified
+   * @return	void Writes Response & closes connection
+   */
+  public function emitJson($inputArr, $lastModified = null) {{{apiToolsCapturePartial}
+    /* Thanks go out to Nicholas K. Dionysopoulos from Akeeba
+    for coming up with emitting JSON from Joomla this way.
+    */
+    $body = {encodeExpression};
+    $method = $this->input->getMethod();
+    $cacheable = ($method === 'GET' || $method === 'HEAD') && http_response_code() === 200 && (!is_array($inputArr) || ($inputArr['success'] ?? true) !== false);{timingCacheablePartial}
+    @ob_end_clean();
+    header('Content-type:application/json;charset=utf-8');
+    // If you encounter otherwise intractable CORS issues, you may wish to uncomment the line below.
+    // header('Access-Control-Allow-Origin: *');{cacheControlPartial}{compressionPartial}{etagPartial}{compressBodyPartial}
+    header('Content-Length: ' . strlen($body));
+    echo($body);
+    flush();
+    $this->app->close();
+    return;
+  }}{etagMethodsPartial}{compressionMethodsPartial}{timingMethodsPartial}"""[1:]
+
+  def setupApiHelperApiToolsPhpFile(self):
+    # The ApiTools trait lives in its own file so that every unjoomla-fast controller (and a single request loading several of them) shares one declaration
+    if (self.apiControllerDesign != "unjoomla-fast"):
+      return
+    apiHelperApiToolsPhpFile = f"{self.apiHelperFolder}/ApiTools.php"
+    apiToolsStreamedEmitterPartial = ""
+    if (self.apiJsonEmitter == "streamed"):
+      # A streamed body can't be hashed or compressed up front, so it gets no ETag, but max-age caching still applies
+      apiToolsStreamCacheControlLine = ""
+      apiToolsStreamCapturePartial = ""
+      apiToolsStreamTimingLine = ""
+      apiToolsStreamMetaPartial = ""
+      if (self.apiServerTiming):
+        # Headers go out before the rows, so the header covers the query execution and the debug "_meta" trailer the whole response
+        apiToolsStreamTimingLine = """
+    header('Server-Timing: ' . $this->serverTiming());"""
+        apiToolsStreamMetaPartial = """    if ($this->app->get('debug'))
+    {
+      $trailerKeys['_meta'] = $this->timingMeta();
+    }
+"""
+      if (self.apiBatchController):
+        apiToolsStreamCapturePartial = """
+    if ($this->captureResponse)
+    {
+      // Dispatched in-process by the BatchController, collect the rows the stream would have written
+      $data = [];
+      $lastRow = null;
+      foreach ($rows as $row)
+      {
+        $data[] = $row;
+        $lastRow = $row;
+      }
+      $this->capturedResponse = array_merge([ 'success' => true, 'data' => $data ], ($trailer !== null) ? $trailer($lastRow, count($data)) : []);
+      return;
+    }"""
+      apiToolsStreamMetricsLine = ""
+      if (self.apiMetrics):
+        apiToolsStreamMetricsLine = """
+    ApiMetrics::record(http_response_code() >= 400);"""
+      if (self.apiJsonStreamNoStore):
+        apiToolsStreamCacheControlLine = """
+    // --api-json-stream-no-store: the 200 goes out before the rows, a database error mid-stream must not leave a truncated body in a cache
+    header('Cache-Control: no-store');"""
+      elif (self.apiJsonCacheControl is not None):
+        # As in emitJson, debug mode responses carry the per-request "_meta" trailer
+        streamDebugCacheablePartial = " && !$this->app->get('debug')" if self.apiServerTiming else ""
+        apiToolsStreamCacheControlLine = f"""
+    // The status and headers go out before the rows: a database error mid-stream leaves a truncated 200 body, which a cache
+    // would keep until it expires. Generate with --api-json-stream-no-store to keep streamed responses out of caches.
+    $method = $this->input->getMethod();
+    $cacheable = ($method === 'GET' || $method === 'HEAD') && http_response_code() === 200{streamDebugCacheablePartial};
+    header('Cache-Control: ' . ($cacheable ? {self.phpStringLiteral(self.apiJsonCacheControl)} : 'no-store'));"""
+      apiToolsStreamedEmitterPartial = rf"""
+
+  /**
+   * emitJsonStream
+   *
+   * Streams {{ "success" : true, "data" : [ ...rows... ], <trailer keys> }} without ever holding the full result set,
+   * rows are encoded one at a time as the iterator yields them.
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	iterable	$rows	Any row iterator e.g. $db->getIterator() or a generator
+   * @param	callable|null	$trailer	Receives ($lastRow, $rowCount) once the rows are written, returns the keys to append after "data"
+   * @param	int	$flushEvery	Flush the output buffer every n rows
+   * @return	void Writes Response & closes connection
+   */
+  public function emitJsonStream($rows, callable $trailer = null, $flushEvery = 100)
+  {{{apiToolsStreamCapturePartial}
+    header('Content-type:application/json;charset=utf-8');{apiToolsStreamCacheControlLine}{apiToolsStreamTimingLine}
+    @ob_end_clean();
+    echo('{{"success":true,"data":[');
+    $rowCount = 0;
+    $lastRow = null;
+    foreach ($rows as $row)
+    {{
+      echo(($rowCount > 0 ? ',' : '') . json_encode($row));
+      $lastRow = $row;
+      if ((++$rowCount % $flushEvery) === 0) {{ flush(); }}
+    }}
+    echo(']');
+    $trailerKeys = ($trailer !== null) ? $trailer($lastRow, $rowCount) : [];
+{apiToolsStreamMetaPartial}    foreach ($trailerKeys as $key => $value)
+    {{
+      echo(',' . json_encode((string) $key) . ':' . json_encode($value));
+    }}
+    echo('}}');
+    flush();{apiToolsStreamMetricsLine}
+    $this->app->close();
+    return;
+  }}"""
+    apiToolsEmitJsonPartial = self.prepareApiToolsEmitJsonPartial()
+    apiToolsCapturePropertiesPartial = ""
+    if (self.apiBatchController):
+      apiToolsCapturePropertiesPartial = rf"""
+  /**
+   * When set (by the BatchController) the emitters store their payload in $capturedResponse instead of sending it
+   *
+   * @var    bool
+   * @since  {self.comVersion}
+   */
+  public $captureResponse = false;
+
+  /**
+   * The payload captured while $captureResponse is set
+   *
+   * @var    mixed
+   * @since  {self.comVersion}
+   */
+  public $capturedResponse = null;
+
+"""[1:]
+    apiToolsKeysetCursorPartial = ""
+    if (self.apiListPagination == "keyset"):
+      apiToolsKeysetCursorPartial = rf"""
+
+  /**
+   * encodeCursor
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	array	$position	The keyset position of the last row sent e.g. [ 'id' => 42 ]
+   * @return	string An opaque, url safe cursor
+   */
+  public function encodeCursor(array $position)
+  {{
+    return rtrim(strtr(base64_encode(json_encode($position)), '+/', '-_'), '=');
+  }}
+
+  /**
+   * decodeCursor
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	string	$cursor	A cursor previously produced by encodeCursor()
+   * @return	array|null The keyset position, or null if the cursor is malformed
+   */
+  public function decodeCursor($cursor)
+  {{
+    $padded = str_pad(strtr($cursor, '-_', '+/'), (int) (ceil(strlen($cursor) / 4) * 4), '=');
+    $json = base64_decode($padded, true);
+    $position = ($json !== false) ? json_decode($json, true) : null;
+    return is_array($position) ? $position : null;
+  }}"""
+    apiToolsBulkItemsPartial = ""
+    if (self.apiBulkWrite):
+      apiToolsBulkItemsPartial = rf"""
+
+  /**
+   * readBulkItems
+   *
+   * Reads the JSON array body of a bulk write, refusing bodies over {self.apiBulkMaxBytes} bytes (before reading them when
+   * Content-Length is sent) and arrays of more than {self.apiBulkMaxItems} records.
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @return	array|null The records, or null once an error response has been emitted
+   */
+  public function readBulkItems()
+  {{
+    $errorStatus = null;
+    if ($this->input->server->getInt('CONTENT_LENGTH', 0) > {self.apiBulkMaxBytes})
+    {{
+      $errorStatus = 413;
+    }}
+    else
+    {{
+      $body = $this->input->json->getRaw();
+      $items = (strlen($body) <= {self.apiBulkMaxBytes}) ? json_decode($body, true) : null;
+      if (strlen($body) > {self.apiBulkMaxBytes} || (is_array($items) && count($items) > {self.apiBulkMaxItems}))
+      {{
+        $errorStatus = 413;
+      }}
+      elseif (!is_array($items) || $items === [] || array_keys($items) !== range(0, count($items) - 1))
+      {{
+        $errorStatus = 400;
+      }}
+    }}
+    if ($errorStatus !== null)
+    {{
+      http_response_code($errorStatus);
+      $this->res['success'] = false;
+      $this->res['message'] = ($errorStatus === 413) ? "A bulk write may carry at most {self.apiBulkMaxItems} records in {self.apiBulkMaxBytes} bytes." : "Please send a non empty JSON array of records.";
+      $this->emitJson($this->res);
+      return null;
+    }}
+    return $items;
+  }}"""
+    apiToolsEnqueuePartial = ""
+    if (self.apiWriteBehindQueue):
+      apiToolsEnqueuePartial = rf"""
+
+  /**
+   * enqueue
+   *
+   * Hands slow work (emails, third party syncs) to the write-behind queue instead of doing it inside the request.
+   * The scheduler task plugin generated by pluginMaker.py --plugin-type="task" --task-queue-component="{self.comFolderName}"
+   * calls the job with the payload later, retrying failures with a growing backoff.
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	string	$job	A static callable e.g. '\{self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\Helper\Mailer::sendWelcome'
+   * @param	array	$payload	The job's arguments, JSON encoded into the queue
+   * @param	int	$delaySeconds	Seconds before the job may run
+   * @return	int The queued job's id
+   */
+  public function enqueue($job, array $payload = [], $delaySeconds = 0)
+  {{
+    $db = $this->getDbo();
+    $payloadJson = json_encode($payload, JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES | JSON_THROW_ON_ERROR);
+    $availableAt = gmdate('Y-m-d H:i:s', time() + max(0, (int) $delaySeconds));
+    $created = gmdate('Y-m-d H:i:s');
+    $query = $db->getQuery(true)
+      ->insert($db->quoteName('{self.tablePrefix}queue'))
+      ->columns($db->quoteName(['job', 'payload', 'available_at', 'created']))
+      ->values(':job, :payload, :availableAt, :created')
+      ->bind(':job', $job)
+      ->bind(':payload', $payloadJson)
+      ->bind(':availableAt', $availableAt)
+      ->bind(':created', $created);
+    $db->setQuery($query)->execute();
+    return (int) $db->insertid();
+  }}"""
+    #################################### START Api src/Helper/ApiTools.php ###################################
+    apiHelperApiToolsPhpFileContents = rf"""
+    <?php
+namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Api\Helper;
+defined('_JEXEC') or die;
+
+/* UnJoomla Api Tools (welcome to FASTER J! API development)
+* This trait will probably evolve to become a class (installed by library package) in the future
+* and its methods will be statically called after inclusion by namespace.
+*/
+trait ApiTools {{
+{apiToolsCapturePropertiesPartial}{apiToolsEmitJsonPartial}{apiToolsStreamedEmitterPartial}{apiToolsKeysetCursorPartial}{apiToolsBulkItemsPartial}{apiToolsEnqueuePartial}
+
+  /**
+   * prepErrMsgExmplPldFmt
+   *
+   * @author	Joe Hacobian
+   * @since	v0.0.1
+   * @access	public
+   * @param	string	$pldString
+   * @param string  $pldMode --> encB64AndUri OR onlyEncUri OR literal
+   * @return string Returns payload string wrapped inside encoding functions according to the payload mode given in $pldMode
+   */
+  public function prepErrMsgExPldFmt($pldString, $pldMode)
+  {{
+    if (gettype($pldString) == 'string' && gettype($pldMode) == 'string')
+    {{
+      switch ($pldMode)
+      {{
+        case 'literal':
+          $formattedPayloadEncodingExample = $pldString;
+          break;
+        case 'onlyEncUri':
+          $formattedPayloadEncodingExample = "encodeURIComponent( '$pldString' )";
+          break;
+        case 'encB64AndUri':
+          $formattedPayloadEncodingExample = "encodeURIComponent( btoa( '$pldString' ) )";
+          break;
+        default:
+          $formattedPayloadEncodingExample = $pldString;
+          break;
+      }}
+      return $formattedPayloadEncodingExample;
+    }}
+    if (!isset($formattedPayloadEncodingExample))
+    {{
+      if ($pldString !== null && $pldMode !== null)
+      {{
+        return "Payload & Payload mode NOT supplied.";
+      }}
+    }}
+  }}
+}}
+    """[5:]
+    ##################################### END Api src/Helper/ApiTools.php ####################################
+    self.createFile(assetType = "f", targetPath = apiHelperApiToolsPhpFile, fileContents = apiHelperApiToolsPhpFileContents)
+
+  def setupApiHelperQueryTimingMonitorPhpFile(self):
+    # The query monitor getDbo() attaches for the Server-Timing header, only generated with --api-server-timing
+    if (not self.apiServerTiming):
+      return
+    apiHelperQueryTimingMonitorPhpFile = f"{self.apiHelperFolder}/QueryTimingMonitor.php"
+    #################################### START Api src/Helper/QueryTimingMonitor.php ###################################
+    apiHelperQueryTimingMonitorPhpFileContents = rf"""
+    <?php
+namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Api\Helper;
+defined('_JEXEC') or die;
+
+use Joomla\Database\DatabaseDriver;
+use Joomla\Database\Monitor\ChainedMonitor;
+use Joomla\Database\QueryMonitorInterface;
+
+/**
+ * Counts the queries of the current request and adds up their time, for the Server-Timing header sent by ApiTools.
+ * One instance per request is chained after any monitor already attached (e.g. Joomla's debug monitor).
+ *
+ * @since  {self.comVersion}
+ */
+class QueryTimingMonitor implements QueryMonitorInterface
+{{
+  /**
+   * @var    QueryTimingMonitor|null
+   * @since  {self.comVersion}
+   */
+  private static $instance = null;
+
+  /**
+   * @var    int
+   * @since  {self.comVersion}
+   */
+  public $queryCount = 0;
+
+  /**
+   * Total query time in seconds
+   *
+   * @var    float
+   * @since  {self.comVersion}
+   */
+  public $queryTime = 0.0;
+
+  /**
+   * @var    float|null
+   * @since  {self.comVersion}
+   */
+  private $queryStarted = null;
+
+  /**
+   * attach
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	DatabaseDriver	$db
+   * @return	DatabaseDriver The same database driver, now timed
+   */
+  public static function attach(DatabaseDriver $db)
+  {{
+    if (self::$instance === null)
+    {{
+      self::$instance = new self;
+      $existingMonitor = $db->getMonitor();
+      if ($existingMonitor === null)
+      {{
+        $db->setMonitor(self::$instance);
+      }}
+      else
+      {{
+        $chainedMonitor = new ChainedMonitor;
+        $chainedMonitor->addMonitor($existingMonitor);
+        $chainedMonitor->addMonitor(self::$instance);
+        $db->setMonitor($chainedMonitor);
+      }}
+    }}
+    return $db;
+  }}
+
+  /**
+   * current
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @return	QueryTimingMonitor|null The monitor of this request, null when no query went through getDbo()
+   */
+  public static function current()
+  {{
+    return self::$instance;
+  }}
+
+  public function startQuery(string $sql, $boundParams = null): void
+  {{
+    $this->queryStarted = microtime(true);
+  }}
+
+  public function stopQuery(): void
+  {{
+    if ($this->queryStarted !== null)
+    {{
+      $this->queryCount++;
+      $this->queryTime += microtime(true) - $this->queryStarted;
+      $this->queryStarted = null;
+    }}
+  }}
+}}
+    """[5:]
+    ##################################### END Api src/Helper/QueryTimingMonitor.php ####################################
+    self.createFile(assetType = "f", targetPath = apiHelperQueryTimingMonitorPhpFile, fileContents = apiHelperQueryTimingMonitorPhpFileContents)
+
+  def setupApiHelperApiMetricsPhpFile(self):
+    # The APCu counters behind --api-metrics, shared by both controller designs
+    if (not self.apiMetrics):
+      return
+    apiHelperApiMetricsPhpFile = f"{self.apiHelperFolder}/ApiMetrics.php"
+    metricName = "".join(character if character.isalnum() else "_" for character in f"{self.comFolderName}_api")
+    bucketBounds = ", ".join(f"{bound:g}" for bound in self.apiMetricsBuckets)
+    #################################### START Api src/Helper/ApiMetrics.php ###################################
+    apiHelperApiMetricsPhpFileContents = rf"""
+    <?php
+namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Api\Helper;
+defined('_JEXEC') or die;
+
+use Joomla\CMS\Factory;
+
+/**
+ * Request, error and latency histogram counters of every API route (controller.task and HTTP method), kept in APCu so
+ * all PHP workers of the server add to the same numbers. The MetricsController serves them in the Prometheus text format.
+ * Without APCu nothing is counted. The counters live until APCu is cleared (e.g. a PHP-FPM restart), which Prometheus
+ * handles as a counter reset.
+ *
+ * @since  {self.comVersion}
+ */
+class ApiMetrics
+{{
+  /**
+   * Upper bounds in seconds of the latency histogram buckets, the request count is the +Inf bucket
+   *
+   * @var    array
+   * @since  {self.comVersion}
+   */
+  const BUCKETS = [{bucketBounds}];
+
+  /**
+   * @var    string
+   * @since  {self.comVersion}
+   */
+  const KEY_PREFIX = '{self.comFolderName}_metrics|';
+
+  /**
+   * @var    string
+   * @since  {self.comVersion}
+   */
+  const METRIC_NAME = '{metricName}';
+
+  /**
+   * @var    bool
+   * @since  {self.comVersion}
+   */
+  private static $recorded = false;
+
+  /**
+   * record
+   *
+   * Counts the current request once, timed from the start of the request. Each request increments three counters
+   * (four when it failed), its histogram bucket is made cumulative when the metrics are read.
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	bool	$failed	Counted as an error too
+   * @return	void
+   */
+  public static function record($failed)
+  {{
+    if (self::$recorded || !function_exists('apcu_enabled') || !apcu_enabled())
+    {{
+      return;
+    }}
+    self::$recorded = true;
+    $input = Factory::getApplication()->input;
+    $series = $input->getCmd('controller') . '.' . $input->getCmd('task') . '|' . $input->getMethod();
+    $seconds = microtime(true) - $input->server->getFloat('REQUEST_TIME_FLOAT', microtime(true));
+    self::increment('requests|' . $series);
+    if ($failed)
+    {{
+      self::increment('errors|' . $series);
+    }}
+    self::increment('sum|' . $series, (int) round($seconds * 1000000));
+    foreach (self::BUCKETS as $bucketIndex => $upperBound)
+    {{
+      if ($seconds <= $upperBound)
+      {{
+        self::increment('bucket|' . $series . '|' . $bucketIndex);
+        break;
+      }}
+    }}
+  }}
+
+  /**
+   * renderPrometheus
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @return	string The counters in the Prometheus text exposition format (version 0.0.4)
+   */
+  public static function renderPrometheus()
+  {{
+    $allSeries = [];
+    if (function_exists('apcu_enabled') && apcu_enabled() && class_exists('APCUIterator'))
+    {{
+      foreach (new \APCUIterator('/^' . preg_quote(self::KEY_PREFIX, '/') . '/', APC_ITER_KEY | APC_ITER_VALUE) as $entry)
+      {{
+        // [ kind, controller.task, method(, bucket index) ]
+        $keyParts = explode('|', substr($entry['key'], strlen(self::KEY_PREFIX)));
+        $seriesKey = $keyParts[1] . '|' . $keyParts[2];
+        $allSeries[$seriesKey] = $allSeries[$seriesKey] ?? [ 'requests' => 0, 'errors' => 0, 'sum' => 0, 'buckets' => [] ];
+        if ($keyParts[0] === 'bucket')
+        {{
+          $allSeries[$seriesKey]['buckets'][(int) $keyParts[3]] = $entry['value'];
+        }}
+        else
+        {{
+          $allSeries[$seriesKey][$keyParts[0]] = $entry['value'];
+        }}
+      }}
+      ksort($allSeries);
+    }}
+    $requestLines = [];
+    $errorLines = [];
+    $durationLines = [];
+    foreach ($allSeries as $seriesKey => $series)
+    {{
+      [$route, $method] = explode('|', $seriesKey);
+      $labels = 'route="' . $route . '",method="' . $method . '"';
+      $requestLines[] = self::METRIC_NAME . '_requests_total{{' . $labels . '}} ' . $series['requests'];
+      $errorLines[] = self::METRIC_NAME . '_errors_total{{' . $labels . '}} ' . $series['errors'];
+      // The counters are read one by one while requests keep adding to them, keep the buckets monotonic
+      $cumulative = 0;
+      foreach (self::BUCKETS as $bucketIndex => $upperBound)
+      {{
+        $cumulative += $series['buckets'][$bucketIndex] ?? 0;
+        $durationLines[] = self::METRIC_NAME . '_request_duration_seconds_bucket{{' . $labels . ',le="' . $upperBound . '"}} ' . $cumulative;
+      }}
+      $durationLines[] = self::METRIC_NAME . '_request_duration_seconds_bucket{{' . $labels . ',le="+Inf"}} ' . max($cumulative, $series['requests']);
+      $durationLines[] = self::METRIC_NAME . '_request_duration_seconds_sum{{' . $labels . '}} ' . round($series['sum'] / 1000000, 6);
+      $durationLines[] = self::METRIC_NAME . '_request_duration_seconds_count{{' . $labels . '}} ' . max($cumulative, $series['requests']);
+    }}
+    return implode("\n", array_merge(
+      [ '# HELP ' . self::METRIC_NAME . '_requests_total API requests by route and method.', '# TYPE ' . self::METRIC_NAME . '_requests_total counter' ],
+      $requestLines,
+      [ '# HELP ' . self::METRIC_NAME . '_errors_total API requests that failed (status 400 and up, success false or a thrown error).', '# TYPE ' . self::METRIC_NAME . '_errors_total counter' ],
+      $errorLines,
+      [ '# HELP ' . self::METRIC_NAME . '_request_duration_seconds API request latency from the start of the request.', '# TYPE ' . self::METRIC_NAME . '_request_duration_seconds histogram' ],
+      $durationLines
+    )) . "\n";
+  }}
+
+  /**
+   * increment
+   *
+   * @since	{self.comVersion}
+   * @access	private
+   * @param	string	$key
+   * @param	int	$step
+   * @return	void
+   */
+  private static function increment($key, $step = 1)
+  {{
+    // apcu_add() is a no-op on an existing key, apcu_inc() itself is atomic
+    apcu_add(self::KEY_PREFIX . $key, 0);
+    apcu_inc(self::KEY_PREFIX . $key, $step);
+  }}
+}}
+    """[5:]
+    ##################################### END Api src/Helper/ApiMetrics.php ####################################
+    self.createFile(assetType = "f", targetPath = apiHelperApiMetricsPhpFile, fileContents = apiHelperApiMetricsPhpFileContents)
+
+  def setupApiMetricsControllerPhpFile(self):
+    # The scrape endpoint of --api-metrics, routed by pluginMaker.py --plugin-webservices-metrics-route
+    if (not self.apiMetrics):
+      return
+    apiMetricsControllerPhpFile = f"{self.apiControllerFolder}/MetricsController.php"
+    #################################### START Api MetricsController.php ###################################
+    apiMetricsControllerPhpFileContents = rf"""
+    <?php
+namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Api\Controller;
+defined('_JEXEC') or die;
+
+use Joomla\CMS\MVC\Controller\ApiController;
+
+use {self.vendorName}\Component\{self.comNameInNamespaces}\Api\Helper\ApiMetrics;
+
+class MetricsController extends ApiController
+{{
+  /**
+   * prometheus
+   *
+   * GET v1/{self.comNameJoomla}/metrics, the ApiMetrics counters for a Prometheus scrape. The route is not public, the scraper
+   * authenticates with an API token like any other client. Scrapes are not counted themselves.
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @return	void Writes the metrics & closes connection
+   */
+  public function prometheus()
+  {{
+    @ob_end_clean();
+    header('Content-type:text/plain; version=0.0.4; charset=utf-8');
+    header('Cache-Control: no-store');
+    echo(ApiMetrics::renderPrometheus());
+    flush();
+    $this->app->close();
+    return;
+  }}
+}}
+    """[5:]
+    ##################################### END Api MetricsController.php ####################################
+    self.createFile(assetType = "f", targetPath = apiMetricsControllerPhpFile, fileContents = apiMetricsControllerPhpFileContents)
+
+  def setupApiBatchControllerPhpFile(self):
+    # The batch controller answers many controller.method calls in one HTTP round trip, dispatching them in this PHP process
+    if (not self.apiBatchController):
+      return
+    apiBatchControllerPhpFile = f"{self.apiControllerFolder}/BatchController.php"
+    batchableEntries = ""
+    for controllerName in self.apiControllerNames:
+      methodNames = ", ".join([ f"'{methodName}'" for methodName in self.apiControllerGeneratedMethodNames(controllerName) ])
+      batchableEntries += f"\n    '{controllerName.lower()}' => " + (f"[ {methodNames} ]," if methodNames != "" else "[],")
+    #################################### START Api BatchController.php ###################################
+    apiBatchControllerPhpFileContents = rf"""
+    <?php
+namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Api\Controller;
+defined('_JEXEC') or die;
+
+use Joomla\CMS\MVC\Controller\ApiController;
+use Joomla\CMS\Input\Input;
+use Joomla\CMS\Log\Log;
+
+use {self.vendorName}\Component\{self.comNameInNamespaces}\Api\Helper\ApiTools;
+
+class BatchController extends ApiController
+{{
+  // Pull in our ApiTools trait.
+  use ApiTools;
+
+  // Initialize success to false, set to true just before sending assembled payload.
+  protected $res = [ 'success' => false ];
+
+  /**
+   * The controllers (lowercase) and public methods a batch may call, anything else is answered with a 404 sub response.
+   * Add the methods you write to your controllers here to make them batchable.
+   *
+   * @var    array
+   * @since  {self.comVersion}
+   */
+  const BATCHABLE = [{batchableEntries}
+  ];
+
+  /**
+   * The most sub requests a single batch may carry
+   *
+   * @var    int
+   * @since  {self.comVersion}
+   */
+  const MAX_REQUESTS = {self.apiBatchMaxRequests};
+
+  /**
+   * dispatchBatch
+   *
+   * POST {{ "requests" : [ {{ "id" : "a", "controller" : "{self.apiControllerNames[0].lower()}", "method" : "<method>", "params" : {{ "limit" : 20 }} }}, ... ] }}
+   * Each sub request runs against a fresh controller whose input holds only its params, sub requests share this
+   * request's session, user and database connection.
+   *
+   * @since	{self.comVersion}
+   * @access	public
+   * @param	string	$this->input->json->getRaw()
+   * @return	void {{ "success" : true | false, [ "data" : [ {{ "id" : "a", "status" : 200, "body" : {{ ... }} }}, ... ] | "message" : "<message>"] }}
+   */
+  public function dispatchBatch()
+  {{
+    $req = json_decode($this->input->json->getRaw(), true);
+    $subRequests = (is_array($req) && isset($req['requests']) && is_array($req['requests'])) ? array_values($req['requests']) : [];
+    if (count($subRequests) === 0)
+    {{
+      http_response_code(400);
+      $this->res['success'] = false;
+      $this->res['message'] = "Please POST a non empty requests array.";
+      $this->emitJson($this->res);
+      return;
+    }}
+    if (count($subRequests) > self::MAX_REQUESTS)
+    {{
+      http_response_code(413);
+      $this->res['success'] = false;
+      $this->res['message'] = "A batch may carry at most " . self::MAX_REQUESTS . " requests, " . count($subRequests) . " were given.";
+      $this->emitJson($this->res);
+      return;
+    }}
+
+    $responses = [];
+    foreach ($subRequests as $index => $subRequest)
+    {{
+      $responses[] = $this->dispatchSubRequest($index, is_array($subRequest) ? $subRequest : []);
+    }}
+
+    // Sub requests set their own status codes, the batch itself succeeded.
+    http_response_code(200);
+    $this->res['success'] = true;
+    $this->res['data'] = $responses;
+    $this->emitJson($this->res);
+    return;
+  }}
+
+  /**
+   * dispatchSubRequest
+   *
+   * @since	{self.comVersion}
+   * @access	protected
+   * @param	int	$index	Position of the sub request in the batch, its id when none is given
+   * @param	array	$subRequest	{{ "id", "controller", "method", "params" }}
+   * @return	array {{ "id" : <id>, "status" : <http status>, "body" : <the payload the method emitted> }}
+   */
+  protected function dispatchSubRequest($index, array $subRequest)
+  {{
+    $id = $subRequest['id'] ?? $index;
+    $controllerName = strtolower((string) ($subRequest['controller'] ?? ''));
+    $methodName = (string) ($subRequest['method'] ?? '');
+    $params = (isset($subRequest['params']) && is_array($subRequest['params'])) ? $subRequest['params'] : [];
+
+    if (!in_array($methodName, self::BATCHABLE[$controllerName] ?? [], true))
+    {{
+      return [ 'id' => $id, 'status' => 404, 'body' => [ 'success' => false, 'message' => "The method " . $controllerName . "." . $methodName . " is not batchable." ] ];
+    }}
+
+    try
+    {{
+      http_response_code(200);
+      $controller = $this->factory->createController(ucfirst($controllerName), 'Api', [], $this->app, new Input($params));
+      $controller->captureResponse = true;
+      $controller->$methodName();
+      return [ 'id' => $id, 'status' => http_response_code(), 'body' => $controller->capturedResponse ];
+    }}
+    catch (\Throwable $e)
+    {{
+      Log::add('Batch sub request ' . $controllerName . '.' . $methodName . ' failed: ' . $e->getMessage(), Log::ERROR);
+      return [ 'id' => $id, 'status' => 500, 'body' => [ 'success' => false, 'message' => "The request failed." ] ];
+    }}
+  }}
+}}
+    """[5:]
+    ##################################### END Api BatchController.php ####################################
+    self.createFile(assetType = "f", targetPath = apiBatchControllerPhpFile, fileContents = apiBatchControllerPhpFileContents)
+
+  def setupAdminServicesProviderPhpFile(self):
+    ################################### Create admin services provider.php ###################################
+    adminServicesProviderPhpFile = f"{self.adminFolder}/services/provider.php"
+    classMapRequirePartial = """
+
+    require_once __DIR__ . '/classmap_autoload.php';""" if self.args.classmap_autoloader else ""
+    #################################### START Admin services provider.php ###################################
+    adminServicesProviderPhpFileContents = f"""
+    <?php
+    defined('_JEXEC') or die;{classMapRequirePartial}
+
+    use Joomla\CMS\Dispatcher\ComponentDispatcherFactoryInterface;
+    use Joomla\CMS\Extension\ComponentInterface;
+    use Joomla\CMS\Extension\MVCComponent;
+    use Joomla\CMS\Extension\Service\Provider\ComponentDispatcherFactory;
+    use Joomla\CMS\Extension\Service\Provider\MVCFactory;
+    use Joomla\CMS\MVC\Factory\MVCFactoryInterface;
+    use Joomla\DI\Container;
     use Joomla\DI\ServiceProviderInterface;
 
-    return new class implements ServiceProviderInterface {{
-        public function register(Container $container): void {{
-            $container->registerServiceProvider(new MVCFactory('\\\{self.vendorName}\\\Component\\\{self.comNameInNamespaces}'));
-            $container->registerServiceProvider(new ComponentDispatcherFactory('\\\{self.vendorName}\\\Component\\\{self.comNameInNamespaces}'));
-            $container->set(
-                ComponentInterface::class,
-                function (Container $container) {{
-                    $component = new MVCComponent($container->get(ComponentDispatcherFactoryInterface::class));
-                    $component->setMVCFactory($container->get(MVCFactoryInterface::class));
+    return new class implements ServiceProviderInterface {{
+        public function register(Container $container): void {{
+            $container->registerServiceProvider(new MVCFactory('\\\{self.vendorName}\\\Component\\\{self.comNameInNamespaces}'));
+            $container->registerServiceProvider(new ComponentDispatcherFactory('\\\{self.vendorName}\\\Component\\\{self.comNameInNamespaces}'));
+            $container->set(
+                ComponentInterface::class,
+                function (Container $container) {{
+                    $component = new MVCComponent($container->get(ComponentDispatcherFactoryInterface::class));
+                    $component->setMVCFactory($container->get(MVCFactoryInterface::class));
+
+                    return $component;
+                }}
+            );
+        }}
+    }};
+    """[5:]
+    ##################################### END Admin services provider.php ####################################
+    self.createFile(assetType = "f", targetPath = adminServicesProviderPhpFile, fileContents = adminServicesProviderPhpFileContents)
+
+
+  def setupAdminServicesClassMapPhpFiles(self):
+    # Map every generated class to its installed path, runs after all php files of the package are written
+    if (not self.args.emit_classmap):
+      return
+    classIndex = indexPhpClasses(self.comPackageBaseFolder, componentInstallPaths(self.comFolderName))
+    self.createFile(assetType = "f", targetPath = f"{self.adminFolder}/services/classmap.php", fileContents = renderPhpClassMap(classIndex))
+    if (not self.args.classmap_autoloader):
+      return
+    namespacePrefix = f"{self.vendorName}\\Component\\{self.comNameInNamespaces}\\"
+    adminServicesClassMapAutoloadPhpFile = f"{self.adminFolder}/services/classmap_autoload.php"
+    #################################### START Admin services classmap_autoload.php ###################################
+    adminServicesClassMapAutoloadPhpFileContents = rf"""
+    <?php
+    defined('_JEXEC') or die;
+
+    /**
+    * @package     Joomla.Administrator
+    * @subpackage  {self.comFolderName}
+    *
+    * @copyright   {self.comCopyRightHolder}
+    * @license     Copyright (C)  {self.comCreationYear} {self.comLicenseType} All rights reserved.
+    */
+
+    /**
+    * Loads the component's classes straight from classmap.php, ahead of Joomla's PSR-4 namespace loader
+    * which would otherwise probe the filesystem for each of them. Classes missing from the map fall through to it.
+    * @since  {self.comVersion}
+    */
+    spl_autoload_register(
+        static function ($className) {{
+            static $classMap = null;
+            if (strncmp($className, '{namespacePrefix.replace(chr(92), chr(92) * 2)}', {len(namespacePrefix)}) !== 0) {{
+                return;
+            }}
+            if ($classMap === null) {{
+                $classMap = require __DIR__ . '/classmap.php';
+            }}
+            if (isset($classMap[$className])) {{
+                require JPATH_ROOT . '/' . $classMap[$className];
+            }}
+        }},
+        true,
+        true
+    );
+    """[5:]
+    ##################################### END Admin services classmap_autoload.php ####################################
+    self.createFile(assetType = "f", targetPath = adminServicesClassMapAutoloadPhpFile, fileContents = adminServicesClassMapAutoloadPhpFileContents)
+
+  ##########################################################################################################
+  ############################################ START i8n setup #############################################
+  ##########################################################################################################
+
+  def setupAdminLanguageLangLocalCodeIniFile(self):
+    adminLanguageLangLocalCodeIniFile = f"{self.adminFolder}/language/{self.langLocaleCode}/{self.langLocaleCode}.{self.comFolderName}.ini"
+    #################################### START Admin i8n language strings ###################################
+    adminLanguageLangLocalCodeIniFileContents = f"""
+    ; {self.comName} Admin Strings
+    ; Copyright (C)  {self.comCreationYear} {self.comCopyRightHolder}. All Rights Reserved.
+
+    COM_HELLOWORLD_MSG_HELLO_WORLD="Hello World (i8n translation string)!"
+    """[5:]
+    ##################################### END Admin i8n language strings ####################################
+    self.createFile(assetType = "f", targetPath = adminLanguageLangLocalCodeIniFile, fileContents = adminLanguageLangLocalCodeIniFileContents)
+
+  def setupAdminLanguageLangLocalCodeSysIniFile(self):
+    adminLanguageLangLocalCodeSysIniFile = f"{self.adminFolder}/language/{self.langLocaleCode}/{self.langLocaleCode}.{self.comFolderName}.sys.ini"
+    #################################### START Admin i8n language strings ###################################
+    adminLanguageLangLocalCodeSysIniFileContents = f"""
+    ; {self.comName} Sys.ini Strings
+    ; Copyright (C)  {self.comCreationYear} {self.comCopyRightHolder}. All Rights Reserved.
+
+    COM_HELLOWORLD_MENU_HELLO_WORLD_TITLE="Hello World (i8n translation string)!"
+    COM_HELLOWORLD_MENU_HELLO_WORLD_DESC="My first Joomla! page"
+    """[5:]
+    ##################################### END Admin i8n language strings ####################################
+    self.createFile(assetType = "f", targetPath = adminLanguageLangLocalCodeSysIniFile, fileContents = adminLanguageLangLocalCodeSysIniFileContents)
+
+  def setupSiteLanguageLangLocalCodeIniFile(self):
+    siteLanguageLangLocalCodeIniFile = f"{self.siteFolder}/language/{self.langLocaleCode}/{self.langLocaleCode}.{self.comFolderName}.ini"
+    #################################### START site i8n language strings ###################################
+    siteLanguageLangLocalCodeIniFileContents = f"""
+    ; {self.comName} site Strings
+    ; Copyright (C)  {self.comCreationYear} {self.comCopyRightHolder}. All Rights Reserved.
+
+    COM_HELLOWORLD_MSG_HELLO_WORLD="Hello World (i8n translation string)!"
+    COM_HELLOWORLD_MSG_GREETING="This message is coming from the item model!"
+    """[5:]
+    ##################################### END site i8n language strings ####################################
+    self.createFile(assetType = "f", targetPath = siteLanguageLangLocalCodeIniFile, fileContents = siteLanguageLangLocalCodeIniFileContents)
+
+  ##########################################################################################################
+  ############################################# END i8n setup ##############################################
+  ##########################################################################################################
+
+
+
+
+  ##########################################################################################################
+  ############################################ START ADMIN SIDE ############################################
+  ##########################################################################################################
+
+  def setupAdminSrcControllerDisplayControllerPhpFile(self):
+    # Create the first admin display controller
+    adminSrcControllerDisplayControllerPhpFile = f"{self.adminFolder}/src/Controller/DisplayController.php"
+    #################################### START Admin src/Controller/DisplayController.php ###################################
+    adminSrcControllerDisplayControllerPhpFileContents = f"""
+    <?php
+    namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\Controller;
+    defined('_JEXEC') or die;
+
+    use Joomla\CMS\MVC\Controller\BaseController;
+
+    /**
+    * @package     Joomla.Administrator
+    * @subpackage  {self.comFolderName}
+    *
+    * @copyright   {self.comCopyRightHolder}
+    * @license     Copyright (C)  {self.comCreationYear} {self.comLicenseType} All rights reserved.
+    */
+
+    /**
+    * Default Controller of {self.comNameInNamespaces} component
+    *
+    * @package     Joomla.Administrator
+    * @subpackage  {self.comFolderName}
+    */
+    class DisplayController extends BaseController {{
+        /**
+        * The default view for the display method.
+        *
+        * @var string
+        */
+        protected $default_view = '{self.initialViewNameLower}';
+
+        public function display($cachable = false, $urlparams = array()) {{
+            return parent::display($cachable, $urlparams);
+
+            /* TODO: Configure admin displaycontroller to use this message model.
+            $document = Factory::getDocument();
+            $viewName = $this->input->getCmd('view', 'login');
+            $viewFormat = $document->getType();
+
+            $view = $this->getView($viewName, $viewFormat);
+            $view->setModel($this->getModel('Message'), true);
+
+            $view->document = $document;
+            $view->display();
+            */
+        }}
+
+    }}
+    """[5:]
+    ##################################### END Admin src/Controller/DisplayController.php ####################################
+    self.createFile(assetType = "f", targetPath = adminSrcControllerDisplayControllerPhpFile, fileContents = adminSrcControllerDisplayControllerPhpFileContents)
+
+  def setupAdminSrcViewInitialHtmlViewPhpFile(self):
+    # Create the intial admin view (the name is set at beginning of file in global variables)
+    adminSrcViewInitialHtmlViewPhpFile = f"{self.adminFolder}/src/View/{self.initialViewName}/HtmlView.php"
+    #################################### START Admin src/View/<self.initialViewName>/HtmlView.php ###################################
+    adminSrcViewInitialHtmlViewPhpFileContents = f"""
+    <?php
+    namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\View\{self.initialViewName};
+
+    defined('_JEXEC') or die;
 
-                    return $component;
-                }}
-            );
+    use Joomla\CMS\MVC\View\HtmlView as BaseHtmlView;
+
+    /**
+    * @package     Joomla.Administrator
+    * @subpackage  {self.comFolderName}
+    *
+    * @copyright   {self.comCopyRightHolder}
+    * @license     Copyright (C)  {self.comCreationYear} {self.comLicenseType} All rights reserved.
+    */
+
+    /**
+    * Main "{self.comName}" Admin View
+    */
+    class HtmlView extends BaseHtmlView {{
+
+        /**
+        * Display the main "{self.comName}" view, here called {self.initialViewName}
+        *
+        * @param   string  $tpl  The name of the template file to parse; automatically searches through the template paths.
+        * @return  void
+        */
+        function display($tpl = null) {{
+            parent::display($tpl);
         }}
-    }};
+
+    }}
     """[5:]
-    ##################################### END Admin services provider.php ####################################
-    self.createFile(assetType = "f", targetPath = adminServicesProviderPhpFile, fileContents = adminServicesProviderPhpFileContents)
+    ##################################### END Admin src/View/<self.initialViewName>/HtmlView.php ####################################
+    self.createFile(assetType = "f", targetPath = adminSrcViewInitialHtmlViewPhpFile, fileContents = adminSrcViewInitialHtmlViewPhpFileContents)
 
+  def setupAdminTmplInitialViewTemplatePhpFile(self):
+    # Create the initial admin view's template
+    adminTmplInitialViewTemplatePhpFile = f"{self.adminFolder}/tmpl/{self.initialViewNameLower}/default.php"
+    #################################### START Admin tmpl/<self.initialViewNameLower>/default.php ###################################
+    adminTmplInitialViewTemplatePhpFileContents = f"""
+    <?php
 
-  ##########################################################################################################
-  ############################################ START i8n setup #############################################
-  ##########################################################################################################
+    use Joomla\CMS\Language\Text;
 
-  def setupAdminLanguageLangLocalCodeIniFile(self):
-    adminLanguageLangLocalCodeIniFile = f"{self.adminFolder}/language/{self.langLocaleCode}/{self.langLocaleCode}.{self.comFolderName}.ini"
-    #################################### START Admin i8n language strings ###################################
-    adminLanguageLangLocalCodeIniFileContents = f"""
-    ; {self.comName} Admin Strings
-    ; Copyright (C)  {self.comCreationYear} {self.comCopyRightHolder}. All Rights Reserved.
+    /**
+    * @package     Joomla.Administrator
+    * @subpackage  {self.comFolderName}
+    *
+    * @copyright   {self.comCopyRightHolder}
+    * @license     Copyright (C)  {self.comCreationYear} {self.comLicenseType} All rights reserved.
+    */
 
-    COM_HELLOWORLD_MSG_HELLO_WORLD="Hello World (i8n translation string)!"
+    // No direct access to this file
+    defined('_JEXEC') or die('Restricted Access');
+    ?>
+    <!-- <h2><?= Text::_('COM_HELLOWORLD_MSG_HELLO_WORLD') ?></h2> -->
+    <h2>Hello world!</h2>
+    <h4>This is the initial admin view.</h4>
     """[5:]
-    ##################################### END Admin i8n language strings ####################################
-    self.createFile(assetType = "f", targetPath = adminLanguageLangLocalCodeIniFile, fileContents = adminLanguageLangLocalCodeIniFileContents)
+    # <p><?= $this->getModel()->getItem()->message; ?></p>
+    ##################################### END Admin tmpl/<self.initialViewNameLower>/default.php ####################################
+    self.createFile(assetType = "f", targetPath = adminTmplInitialViewTemplatePhpFile, fileContents = adminTmplInitialViewTemplatePhpFileContents)
 
-  def setupAdminLanguageLangLocalCodeSysIniFile(self):
-    adminLanguageLangLocalCodeSysIniFile = f"{self.adminFolder}/language/{self.langLocaleCode}/{self.langLocaleCode}.{self.comFolderName}.sys.ini"
-    #################################### START Admin i8n language strings ###################################
-    adminLanguageLangLocalCodeSysIniFileContents = f"""
-    ; {self.comName} Sys.ini Strings
-    ; Copyright (C)  {self.comCreationYear} {self.comCopyRightHolder}. All Rights Reserved.
+  def prepareModelRepeatedQueryMonitorPartials(self):
+    # The use line and getDbo() override watching a generated model's queries, empty without --debug-query-repeat-threshold
+    if (self.debugQueryRepeatThreshold is None):
+      return "", ""
+    modelUsePartial = f"""
+    use Joomla\\Database\\DatabaseInterface;
+    use {self.vendorName}\\Component\\{self.comNameInNamespaces}\\Administrator\\Helper\\RepeatedQueryMonitor;"""
+    modelGetDboPartial = """
 
-    COM_HELLOWORLD_MENU_HELLO_WORLD_TITLE="Hello World (i8n translation string)!"
-    COM_HELLOWORLD_MENU_HELLO_WORLD_DESC="My first Joomla! page"
+        /**
+        * The model's database driver, watched for repeated query shapes (N+1) while the site is in debug mode
+        * @return DatabaseInterface
+        */
+        public function getDbo() {
+            return RepeatedQueryMonitor::attach(parent::getDbo());
+        }"""
+    return modelUsePartial, modelGetDboPartial
+
+  def setupAdminSrcModelMessageModelPhpFile(self):
+    # Create the first admin model
+    modelUsePartial, modelGetDboPartial = self.prepareModelRepeatedQueryMonitorPartials()
+    adminSrcModelMessageModelPhpFile = f"{self.adminFolder}/src/Model/MessageModel.php"
+    #################################### START Admin src/Model/MessageModel.php ###################################
+    adminSrcModelMessageModelPhpFileContents = f"""
+    <?php
+    namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\Model;
+    defined('_JEXEC') or die;
+
+    /* List of availabel model classes
+    use Joomla\CMS\MVC\Model\AdminModel
+    use Joomla\CMS\MVC\Model\BaseModel
+    use Joomla\CMS\MVC\Model\FormModel
+    use Joomla\CMS\MVC\Model\ItemModel
+    use Joomla\CMS\MVC\Model\ListModel
+    */
+
+    use Joomla\CMS\MVC\Model\ItemModel;
+    use Joomla\CMS\Language\Text;{modelUsePartial}
+
+    /**
+    * @package     Joomla.Administrator
+    * @subpackage  {self.comFolderName}
+    *
+    * @copyright   {self.comCopyRightHolder}
+    * @license     Copyright (C) {self.comLicenseType} All rights reserved.
+    */
+
+    /**
+    * Hello World Message Model
+    * @since 0.0.1
+    */
+    class MessageModel extends ItemModel {{
+
+        /**
+        * Returns a message for display
+        * @param integer $pk Primary key of the "message item", currently unused
+        * @return object Message object
+        */
+        public function getItem($pk= null): object {{
+            $item = new \stdClass();
+            $item->message = "A message from the admin message model";
+            /* $item->message = Text::_('COM_HELLOWORLD_MSG_GREETING'); */
+            return $item;
+        }}{modelGetDboPartial}
+
+    }}
     """[5:]
-    ##################################### END Admin i8n language strings ####################################
-    self.createFile(assetType = "f", targetPath = adminLanguageLangLocalCodeSysIniFile, fileContents = adminLanguageLangLocalCodeSysIniFileContents)
+    ##################################### END Admin src/Controller/DisplayController.php ####################################
+    self.createFile(assetType = "f", targetPath = adminSrcModelMessageModelPhpFile, fileContents = adminSrcModelMessageModelPhpFileContents)
 
-  def setupSiteLanguageLangLocalCodeIniFile(self):
-    siteLanguageLangLocalCodeIniFile = f"{self.siteFolder}/language/{self.langLocaleCode}/{self.langLocaleCode}.{self.comFolderName}.ini"
-    #################################### START site i8n language strings ###################################
-    siteLanguageLangLocalCodeIniFileContents = f"""
-    ; {self.comName} site Strings
-    ; Copyright (C)  {self.comCreationYear} {self.comCopyRightHolder}. All Rights Reserved.
+  def setupAdminSrcModelTableListModelPhpFiles(self):
+    # Create one ListModel per spec table, filtering and ordering only on index leading columns, only generated with --list-models
+    if (not self.listModels):
+      return
+    modelUsePartial, modelGetDboPartial = self.prepareModelRepeatedQueryMonitorPartials()
+    for table in self.tableSpec.tables:
+      tableClassName = self.tableSpec.tableClassName(table)
+      adminSrcModelTableListModelPhpFile = f"{self.adminFolder}/src/Model/{tableClassName}ListModel.php"
+      primaryKey = table["primaryKey"][0]
+      indexedColumns = self.tableSpec.leadingIndexColumns(table)
+      selectColumns = ", ".join(f"'a.{column['name']}'" for column in table["columns"])
+      filterFields = ", ".join(f"'{columnName}', 'a.{columnName}'" for columnName in indexedColumns)
+      filterColumns = ", ".join(f"'{columnName}' => ParameterType::{'INTEGER' if self.tableSpec.isIntegerColumn(self.tableSpec.column(table, columnName)) else 'STRING'}" for columnName in indexedColumns)
+      selectableColumnsPartial = ""
+      storeIdColumnsPartial = ""
+      partitionColumnPartial = ""
+      storeIdPartitionPartial = ""
+      partitionFilterPartial = ""
+      if (table["partitioning"] is not None):
+        partitionColumn = table["partitioning"]["column"]
+        partitionColumnPartial = f"""
 
-    COM_HELLOWORLD_MSG_HELLO_WORLD="Hello World (i8n translation string)!"
-    COM_HELLOWORLD_MSG_GREETING="This message is coming from the item model!"
+        /**
+        * The partition column, filter.{partitionColumn}_from (inclusive) and filter.{partitionColumn}_to (exclusive) bound it
+        * so MySQL only reads the partitions in that range
+        */
+        const PARTITION_COLUMN = '{partitionColumn}';"""
+        storeIdPartitionPartial = """
+            $id .= ':' . $this->getState('filter.' . self::PARTITION_COLUMN . '_from') . ':' . $this->getState('filter.' . self::PARTITION_COLUMN . '_to');"""
+        partitionFilterPartial = """
+
+            foreach (['from' => ' >= ', 'to' => ' < '] as $bound => $operator) {
+                $filterName = self::PARTITION_COLUMN . '_' . $bound;
+                $filterValue = $this->getState('filter.' . $filterName);
+                if ($filterValue === null || $filterValue === '' || is_array($filterValue)) {
+                    continue;
+                }
+                $filterValues[$filterName] = (string) $filterValue;
+                $query->where($db->quoteName('a.' . self::PARTITION_COLUMN) . $operator . ':filter_' . $filterName)
+                    ->bind(':filter_' . $filterName, $filterValues[$filterName], ParameterType::STRING);
+            }"""
+      selectPartial = f"""
+                ->select($db->quoteName([{selectColumns}]))"""[1:]
+      if (self.apiSparseFieldsets):
+        selectableColumnsPartial = f"""
+
+        /**
+        * Columns the list.columns state (the API's sparse fieldset) may narrow the SELECT to, the table spec's apiFields
+        */
+        const SELECTABLE_COLUMNS = [{', '.join(f"'{columnName}'" for columnName in self.tableSpec.apiFieldNames(table))}];"""
+        storeIdColumnsPartial = """
+            $id .= ':' . implode(',', (array) $this->getState('list.columns', []));"""
+        selectPartial = f"""
+            // A list.columns state (within SELECTABLE_COLUMNS) narrows the SELECT to those columns and the primary key
+            $columns = array_intersect(self::SELECTABLE_COLUMNS, (array) $this->getState('list.columns', []));
+            $selectColumns = count($columns) > 0 ? array_map(fn ($column) => 'a.' . $column, array_unique(array_merge([self::PRIMARY_KEY], $columns))) : [{selectColumns}];
+            $query = $db->getQuery(true)
+                ->select($db->quoteName(array_values($selectColumns)))"""[1:]
+      else:
+        selectPartial = """
+            $query = $db->getQuery(true)
+""" [1:] + selectPartial
+      #################################### START Admin src/Model/<TableClassName>ListModel.php ###################################
+      adminSrcModelTableListModelPhpFileContents = rf"""
+    <?php
+    namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\Model;
+    defined('_JEXEC') or die;
+
+    use Joomla\CMS\Cache\CacheControllerFactoryInterface;
+    use Joomla\CMS\Factory;
+    use Joomla\CMS\MVC\Factory\MVCFactoryInterface;
+    use Joomla\CMS\MVC\Model\ListModel;
+    use Joomla\Database\ParameterType;{modelUsePartial}
+
+    /**
+    * @package     Joomla.Administrator
+    * @subpackage  {self.comFolderName}
+    *
+    * @copyright   {self.comCopyRightHolder}
+    * @license     Copyright (C)  {self.comCreationYear} {self.comLicenseType} All rights reserved.
+    */
+
+    /**
+    * Paginated list of {self.tablePrefix}{table['name']}. Filters (filter[<column>]) and orderings (list[fullordering]) are limited
+    * to columns an index leads with, so every filter or ordering can be served by an index, and list.limit is capped at MAX_LIMIT.
+    * @since  {self.comVersion}
+    */
+    class {tableClassName}ListModel extends ListModel {{
+
+        const TABLE = '{self.tablePrefix}{table['name']}';
+
+        const PRIMARY_KEY = '{primaryKey}';
+
+        /**
+        * Columns an index leads with, the only ones filtered on, with their bind type
+        */
+        const FILTER_COLUMNS = [{filterColumns}];{partitionColumnPartial}
+
+        const MAX_LIMIT = {self.listModelMaxLimit};
+
+        /**
+        * How getTotal() counts: exact (COUNT(*) per page load), cached (COUNT(*) reused for COUNT_TTL minutes) or approximate
+        */
+        const COUNT_MODE = '{self.listModelCount}';
+
+        const COUNT_TTL = {self.listModelCountTtl};{selectableColumnsPartial}{modelGetDboPartial}
+
+        /**
+        * @param   array                 $config   An optional associative array of configuration settings
+        * @param   MVCFactoryInterface   $factory  The factory
+        */
+        public function __construct($config = [], MVCFactoryInterface $factory = null) {{
+            if (empty($config['filter_fields'])) {{
+                $config['filter_fields'] = [{filterFields}];
+            }}
+            parent::__construct($config, $factory);
+        }}
+
+        /**
+        * Reads the filters, ordering and page from the request, capping the page size
+        *
+        * @param   string  $ordering   An optional ordering field
+        * @param   string  $direction  An optional direction (asc|desc)
+        * @return  void
+        */
+        protected function populateState($ordering = 'a.{primaryKey}', $direction = 'ASC') {{
+            parent::populateState($ordering, $direction);
+            $this->capLimit();
+        }}
+
+        /**
+        * Caps the page size here too, models created with ignore_request (e.g. by ApiController::displayList()) skip
+        * populateState() and take page[limit] as list.limit unchecked
+        *
+        * @return  mixed[]
+        */
+        public function getItems() {{
+            $this->capLimit();
+            return parent::getItems();
+        }}
+
+        /**
+        * @return  \Joomla\CMS\Pagination\Pagination
+        */
+        public function getPagination() {{
+            $this->capLimit();
+            return parent::getPagination();
+        }}
+
+        // Reads the state object directly, getState() would run populateState() (again) before it is marked done
+        private function capLimit() {{
+            $limit = (int) $this->state->get('list.limit');
+            if ($limit <= 0 || $limit > self::MAX_LIMIT) {{
+                $this->state->set('list.limit', self::MAX_LIMIT);
+            }}
+        }}
+
+        /**
+        * @param   string  $id  A prefix for the store id
+        * @return  string
+        */
+        protected function getStoreId($id = '') {{
+            foreach (array_keys(self::FILTER_COLUMNS) as $column) {{
+                $id .= ':' . $this->getState('filter.' . $column);
+            }}{storeIdPartitionPartial}{storeIdColumnsPartial}
+            return parent::getStoreId($id);
+        }}
+
+        /**
+        * @return  \Joomla\Database\QueryInterface
+        */
+        protected function getListQuery() {{
+            $db = $this->getDbo();
+{selectPartial}
+                ->from($db->quoteName(self::TABLE, 'a'));
+
+            $filterValues = [];
+            foreach (self::FILTER_COLUMNS as $column => $parameterType) {{
+                $filterValue = $this->getState('filter.' . $column);
+                if ($filterValue === null || $filterValue === '' || is_array($filterValue)) {{
+                    continue;
+                }}
+                $filterValues[$column] = $filterValue;
+                $query->where($db->quoteName('a.' . $column) . ' = :filter_' . $column)
+                    ->bind(':filter_' . $column, $filterValues[$column], $parameterType);
+            }}{partitionFilterPartial}
+
+            // populateState() only lets through orderings listed in filter_fields, the primary key keeps pages stable on ties
+            $ordering = $this->getState('list.ordering', 'a.' . self::PRIMARY_KEY);
+            $direction = strtoupper($this->getState('list.direction', 'ASC')) === 'DESC' ? 'DESC' : 'ASC';
+            $query->order($db->escape($ordering) . ' ' . $direction);
+            if ($ordering !== 'a.' . self::PRIMARY_KEY && $ordering !== self::PRIMARY_KEY) {{
+                $query->order($db->quoteName('a.' . self::PRIMARY_KEY) . ' ' . $direction);
+            }}
+
+            return $query;
+        }}
+
+        /**
+        * Counts the rows of the list query following COUNT_MODE, getTotal() and getStart() call this on every page load
+        *
+        * @param   \Joomla\Database\QueryInterface  $query  The list query
+        * @return  integer
+        */
+        protected function _getListCount($query) {{
+            if (self::COUNT_MODE === 'exact') {{
+                return parent::_getListCount($query);
+            }}
+            $isFiltered = count($query->getBounded()) > 0;
+            $cache = Factory::getContainer()->get(CacheControllerFactoryInterface::class)
+                ->createCacheController('output', ['defaultgroup' => '{self.comFolderName}_counts', 'lifetime' => self::COUNT_TTL, 'caching' => true]);
+            $cacheId = md5(self::COUNT_MODE . (string) $query . serialize($query->getBounded()));
+            $count = $cache->get($cacheId);
+            if ($count !== false) {{
+                return (int) $count;
+            }}
+            if (self::COUNT_MODE === 'approximate' && !$isFiltered) {{
+                // InnoDB's running row estimate, within some tens of percent of the real count and free to read
+                $db = $this->getDbo();
+                $estimateQuery = $db->getQuery(true)
+                    ->select($db->quoteName('TABLE_ROWS'))
+                    ->from($db->quoteName('information_schema.TABLES'))
+                    ->where($db->quoteName('TABLE_SCHEMA') . ' = DATABASE()')
+                    ->where($db->quoteName('TABLE_NAME') . ' = ' . $db->quote($db->replacePrefix(self::TABLE)));
+                $count = (int) $db->setQuery($estimateQuery)->loadResult();
+            }} else {{
+                $count = parent::_getListCount($query);
+            }}
+            $cache->store((string) $count, $cacheId);
+            return $count;
+        }}
+    }}
     """[5:]
-    ##################################### END site i8n language strings ####################################
-    self.createFile(assetType = "f", targetPath = siteLanguageLangLocalCodeIniFile, fileContents = siteLanguageLangLocalCodeIniFileContents)
+      ##################################### END Admin src/Model/<TableClassName>ListModel.php ####################################
+      self.createFile(assetType = "f", targetPath = adminSrcModelTableListModelPhpFile, fileContents = adminSrcModelTableListModelPhpFileContents)
 
-  ##########################################################################################################
-  ############################################# END i8n setup ##############################################
-  ##########################################################################################################
+  def setupAdminSrcHelperViewCachePhpFile(self):
+    # The purge the save paths call to drop the cached site views, only generated with --site-view-cache
+    if (not self.siteViewCache):
+      return
+    adminSrcHelperViewCachePhpFile = f"{self.adminFolder}/src/Helper/ViewCache.php"
+    #################################### START Admin src/Helper/ViewCache.php ###################################
+    adminSrcHelperViewCachePhpFileContents = rf"""
+    <?php
+    namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\Helper;
+    defined('_JEXEC') or die;
 
+    use Joomla\CMS\Cache\CacheControllerFactoryInterface;
+    use Joomla\CMS\Factory;
+    use Joomla\CMS\Log\Log;
+    use {self.vendorName}\Component\{self.comNameInNamespaces}\Site\View\{self.initialViewName}\HtmlView as {self.initialViewName}HtmlView;
 
+    /**
+    * @package     Joomla.Administrator
+    * @subpackage  {self.comFolderName}
+    *
+    * @copyright   {self.comCopyRightHolder}
+    * @license     Copyright (C)  {self.comCreationYear} {self.comLicenseType} All rights reserved.
+    */
 
+    /**
+    * Drops the cached output of the component's site views, call it after every write that changes what they show.
+    * @since  {self.comVersion}
+    */
+    class ViewCache {{
 
-  ##########################################################################################################
-  ############################################ START ADMIN SIDE ############################################
-  ##########################################################################################################
+        /**
+        * The site views rendered through the view cache, each declaring its CACHE_GROUPS
+        */
+        const VIEWS = [{self.initialViewName}HtmlView::class];
 
-  def setupAdminSrcControllerDisplayControllerPhpFile(self):
-    # Create the first admin display controller
-    adminSrcControllerDisplayControllerPhpFile = f"{self.adminFolder}/src/Controller/DisplayController.php"
-    #################################### START Admin src/Controller/DisplayController.php ###################################
-    adminSrcControllerDisplayControllerPhpFileContents = f"""
+        /**
+        * Cleans every cache group of the cached site views, from any client (the site cache folder is addressed directly)
+        * @return void
+        */
+        public static function purge() {{
+            $app = Factory::getApplication();
+            $cacheGroups = [];
+            foreach (self::VIEWS as $viewClass) {{
+                $cacheGroups = array_merge($cacheGroups, $viewClass::CACHE_GROUPS);
+            }}
+            foreach (array_unique($cacheGroups) as $cacheGroup) {{
+                try {{
+                    Factory::getContainer()->get(CacheControllerFactoryInterface::class)
+                        ->createCacheController('callback', ['defaultgroup' => $cacheGroup, 'cachebase' => $app->get('cache_path', JPATH_SITE . '/cache')])
+                        ->clean();
+                }} catch (\RuntimeException $e) {{
+                    Log::add('Could not purge the ' . $cacheGroup . ' cache group: ' . $e->getMessage(), Log::WARNING, '{self.comFolderName}');
+                }}
+            }}
+        }}
+    }}
+    """[5:]
+    ##################################### END Admin src/Helper/ViewCache.php ####################################
+    self.createFile(assetType = "f", targetPath = adminSrcHelperViewCachePhpFile, fileContents = adminSrcHelperViewCachePhpFileContents)
+
+  def setupAdminSrcHelperRepeatedQueryMonitorPhpFile(self):
+    # The debug-only N+1 detector getDbo() attaches, only generated with --debug-query-repeat-threshold
+    if (self.debugQueryRepeatThreshold is None):
+      return
+    adminSrcHelperRepeatedQueryMonitorPhpFile = f"{self.adminFolder}/src/Helper/RepeatedQueryMonitor.php"
+    #################################### START Admin src/Helper/RepeatedQueryMonitor.php ###################################
+    adminSrcHelperRepeatedQueryMonitorPhpFileContents = rf"""
     <?php
-    namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\Controller;
+    namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\Helper;
     defined('_JEXEC') or die;
 
-    use Joomla\CMS\MVC\Controller\BaseController;
+    use Joomla\CMS\Factory;
+    use Joomla\CMS\Log\Log;
+    use Joomla\CMS\Uri\Uri;
+    use Joomla\Database\DatabaseDriver;
+    use Joomla\Database\Monitor\ChainedMonitor;
+    use Joomla\Database\QueryMonitorInterface;
 
     /**
     * @package     Joomla.Administrator
@@ -826,51 +2906,152 @@ class JsonapiView extends BaseApiView
     */
 
     /**
-    * Default Controller of {self.comNameInNamespaces} component
-    *
-    * @package     Joomla.Administrator
-    * @subpackage  {self.comFolderName}
+    * Debug-only N+1 query detector. Every query of the request is reduced to its shape (literals, numbers,
+    * bound parameter names and IN lists replaced by ?) and counted per shape together with the line that ran it.
+    * At the end of the request each shape run more than THRESHOLD times is logged as a warning in the
+    * {self.comFolderName} log category. Nothing is attached unless the site runs in debug mode.
+    * @since  {self.comVersion}
     */
-    class DisplayController extends BaseController {{
+    class RepeatedQueryMonitor implements QueryMonitorInterface {{
+
+        const THRESHOLD = {self.debugQueryRepeatThreshold};
+
         /**
-        * The default view for the display method.
-        *
-        * @var string
+        * @var    RepeatedQueryMonitor|null
+        * @since  {self.comVersion}
         */
-        protected $default_view = '{self.initialViewNameLower}';
+        private static $instance = null;
 
-        public function display($cachable = false, $urlparams = array()) {{
-            return parent::display($cachable, $urlparams);
+        /**
+        * Drivers already watched, keyed by spl_object_id, so repeated getDbo() calls chain the monitor only once
+        * @var    array
+        * @since  {self.comVersion}
+        */
+        private static $watchedDrivers = [];
 
-            /* TODO: Configure admin displaycontroller to use this message model.
-            $document = Factory::getDocument();
-            $viewName = $this->input->getCmd('view', 'login');
-            $viewFormat = $document->getType();
+        /**
+        * Run count, normalised SQL and call site counts, per query shape fingerprint
+        * @var    array
+        * @since  {self.comVersion}
+        */
+        private $shapes = [];
 
-            $view = $this->getView($viewName, $viewFormat);
-            $view->setModel($this->getModel('Message'), true);
+        /**
+        * Attaches the request's monitor to the driver (chained after any monitor already attached) when in debug mode
+        * @param DatabaseDriver $db
+        * @return DatabaseDriver The same database driver
+        */
+        public static function attach(DatabaseDriver $db) {{
+            if (self::$instance === null) {{
+                if (!Factory::getApplication()->get('debug')) {{
+                    return $db;
+                }}
+                self::$instance = new self;
+                register_shutdown_function([self::$instance, 'report']);
+            }}
+            if (isset(self::$watchedDrivers[spl_object_id($db)])) {{
+                return $db;
+            }}
+            self::$watchedDrivers[spl_object_id($db)] = true;
+            $existingMonitor = $db->getMonitor();
+            if ($existingMonitor === null) {{
+                $db->setMonitor(self::$instance);
+            }} else {{
+                $chainedMonitor = new ChainedMonitor;
+                $chainedMonitor->addMonitor($existingMonitor);
+                $chainedMonitor->addMonitor(self::$instance);
+                $db->setMonitor($chainedMonitor);
+            }}
+            return $db;
+        }}
 
-            $view->document = $document;
-            $view->display();
-            */
+        /**
+        * Reduces a query to its shape, so queries differing only in their values share one fingerprint
+        * @param string $sql
+        * @return string
+        */
+        public static function normalize(string $sql): string {{
+            $sql = preg_replace('/\'(?:[^\'\\\\]|\\\\.)*\'/s', '?', $sql);
+            $sql = preg_replace('/(?<![\w`])-?\d+(?:\.\d+)?(?![\w`])/', '?', $sql);
+            $sql = preg_replace('/:\w+/', '?', $sql);
+            $sql = preg_replace('/\(\s*\?(?:\s*,\s*\?)*\s*\)/', '(?+)', $sql);
+            return preg_replace('/\s+/', ' ', trim($sql));
+        }}
+
+        public function startQuery(string $sql, $boundParams = null): void {{
+            $shape = self::normalize($sql);
+            $fingerprint = md5($shape);
+            if (!isset($this->shapes[$fingerprint])) {{
+                $this->shapes[$fingerprint] = ['count' => 0, 'shape' => $shape, 'callSites' => []];
+            }}
+            $callSite = $this->callSite();
+            $this->shapes[$fingerprint]['count']++;
+            $this->shapes[$fingerprint]['callSites'][$callSite] = ($this->shapes[$fingerprint]['callSites'][$callSite] ?? 0) + 1;
+        }}
+
+        public function stopQuery(): void {{
+        }}
+
+        /**
+        * The first file:line up the stack outside the database package and this monitor
+        * @return string
+        */
+        private function callSite(): string {{
+            foreach (debug_backtrace(DEBUG_BACKTRACE_IGNORE_ARGS, 24) as $frame) {{
+                if (!isset($frame['file']) || $frame['file'] === __FILE__) {{
+                    continue;
+                }}
+                if (strpos(str_replace('\\', '/', $frame['file']), '/joomla/database/') !== false) {{
+                    continue;
+                }}
+                return $frame['file'] . ':' . $frame['line'];
+            }}
+            return 'unknown';
         }}
 
+        /**
+        * Logs every query shape that ran more than THRESHOLD times in this request, runs at shutdown
+        * @return void
+        */
+        public function report() {{
+            foreach ($this->shapes as $shape) {{
+                if ($shape['count'] <= self::THRESHOLD) {{
+                    continue;
+                }}
+                arsort($shape['callSites']);
+                $callSites = [];
+                foreach ($shape['callSites'] as $callSite => $count) {{
+                    $callSites[] = $callSite . ' x' . $count;
+                }}
+                Log::add(
+                    sprintf('Possible N+1: query shape ran %d times (threshold %d) in %s %s: %s | call sites: %s',
+                        $shape['count'], self::THRESHOLD, $_SERVER['REQUEST_METHOD'] ?? 'CLI', Uri::getInstance()->toString(['path', 'query']),
+                        $shape['shape'], implode(', ', $callSites)),
+                    Log::WARNING, '{self.comFolderName}');
+            }}
+        }}
     }}
     """[5:]
-    ##################################### END Admin src/Controller/DisplayController.php ####################################
-    self.createFile(assetType = "f", targetPath = adminSrcControllerDisplayControllerPhpFile, fileContents = adminSrcControllerDisplayControllerPhpFileContents)
-
-  def setupAdminSrcViewInitialHtmlViewPhpFile(self):
-    # Create the intial admin view (the name is set at beginning of file in global variables)
-    adminSrcViewInitialHtmlViewPhpFile = f"{self.adminFolder}/src/View/{self.initialViewName}/HtmlView.php"
-    #################################### START Admin src/View/<self.initialViewName>/HtmlView.php ###################################
-    adminSrcViewInitialHtmlViewPhpFileContents = f"""
+    ##################################### END Admin src/Helper/RepeatedQueryMonitor.php ####################################
+    self.createFile(assetType = "f", targetPath = adminSrcHelperRepeatedQueryMonitorPhpFile, fileContents = adminSrcHelperRepeatedQueryMonitorPhpFileContents)
+
+  def setupAdminSrcHelperTableQueriesPhpFiles(self):
+    # Create one query builder class per spec table that declares lookups, each shaped to use the index planned for it
+    for table in self.tableSpec.tables:
+      if (len(table["queries"]) == 0):
+        continue
+      tableClassName = self.tableSpec.tableClassName(table)
+      adminSrcHelperTableQueriesPhpFile = f"{self.adminFolder}/src/Helper/{tableClassName}Queries.php"
+      tableQueryMethodsPartial = "".join(self.prepareTableQueryMethodPartial(table, query) for query in table["queries"])
+      #################################### START Admin src/Helper/<TableClassName>Queries.php ###################################
+      adminSrcHelperTableQueriesPhpFileContents = rf"""
     <?php
-    namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\View\{self.initialViewName};
-
+    namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\Helper;
     defined('_JEXEC') or die;
 
-    use Joomla\CMS\MVC\View\HtmlView as BaseHtmlView;
+    use Joomla\Database\DatabaseInterface;
+    use Joomla\Database\ParameterType;
+    use Joomla\Database\QueryInterface;
 
     /**
     * @package     Joomla.Administrator
@@ -881,33 +3062,39 @@ class JsonapiView extends BaseApiView
     */
 
     /**
-    * Main "{self.comName}" Admin View
+    * Query builders for the lookups declared on {self.tablePrefix}{table['name']} in the table spec.
+    * The where and order by columns follow the column order of the index noted on each method.
+    * @since  {self.comVersion}
     */
-    class HtmlView extends BaseHtmlView {{
-
-        /**
-        * Display the main "{self.comName}" view, here called {self.initialViewName}
-        *
-        * @param   string  $tpl  The name of the template file to parse; automatically searches through the template paths.
-        * @return  void
-        */
-        function display($tpl = null) {{
-            parent::display($tpl);
-        }}
+    class {tableClassName}Queries {{
 
+        const TABLE = '{self.tablePrefix}{table['name']}';{tableQueryMethodsPartial}
     }}
     """[5:]
-    ##################################### END Admin src/View/<self.initialViewName>/HtmlView.php ####################################
-    self.createFile(assetType = "f", targetPath = adminSrcViewInitialHtmlViewPhpFile, fileContents = adminSrcViewInitialHtmlViewPhpFileContents)
+      ##################################### END Admin src/Helper/<TableClassName>Queries.php ####################################
+      self.createFile(assetType = "f", targetPath = adminSrcHelperTableQueriesPhpFile, fileContents = adminSrcHelperTableQueriesPhpFileContents)
 
-  def setupAdminTmplInitialViewTemplatePhpFile(self):
-    # Create the initial admin view's template
-    adminTmplInitialViewTemplatePhpFile = f"{self.adminFolder}/tmpl/{self.initialViewNameLower}/default.php"
-    #################################### START Admin tmpl/<self.initialViewNameLower>/default.php ###################################
-    adminTmplInitialViewTemplatePhpFileContents = f"""
+  def setupAdminSrcHelperTableWriterPhpFiles(self):
+    # Create the validating, multi-row writer behind bulkCreate() / bulkUpdate() for every table an API controller writes to
+    if (not self.apiBulkWrite):
+      return
+    for table in self.apiBulkWriteTables():
+      tableClassName = self.tableSpec.tableClassName(table)
+      adminSrcHelperTableWriterPhpFile = f"{self.adminFolder}/src/Helper/{tableClassName}Writer.php"
+      autoKeyColumn = next((columnName for columnName in table["primaryKey"] if self.tableSpec.isAutoIncrementColumn(self.tableSpec.column(table, columnName))), None)
+      columnEntries = ""
+      for column in table["columns"]:
+        maxLength = self.tableSpec.columnMaxLength(column)
+        columnEntries += f"""
+            '{column['name']}' => [ '{self.tableSpec.columnValueKind(column)}', {'true' if column['nullable'] else 'false'}, {'true' if self.tableSpec.isRequiredColumn(column) else 'false'}, {maxLength if maxLength is not None else 'null'} ],"""
+      #################################### START Admin src/Helper/<TableClassName>Writer.php ###################################
+      adminSrcHelperTableWriterPhpFileContents = rf"""
     <?php
+    namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\Helper;
+    defined('_JEXEC') or die;
 
-    use Joomla\CMS\Language\Text;
+    use Joomla\Database\DatabaseInterface;
+    use Joomla\Database\ParameterType;
 
     /**
     * @package     Joomla.Administrator
@@ -917,67 +3104,316 @@ class JsonapiView extends BaseApiView
     * @license     Copyright (C)  {self.comCreationYear} {self.comLicenseType} All rights reserved.
     */
 
-    // No direct access to this file
-    defined('_JEXEC') or die('Restricted Access');
-    ?>
-    <!-- <h2><?= Text::_('COM_HELLOWORLD_MSG_HELLO_WORLD') ?></h2> -->
-    <h2>Hello world!</h2>
-    <h4>This is the initial admin view.</h4>
-    """[5:]
-    # <p><?= $this->getModel()->getItem()->message; ?></p>
-    ##################################### END Admin tmpl/<self.initialViewNameLower>/default.php ####################################
-    self.createFile(assetType = "f", targetPath = adminTmplInitialViewTemplatePhpFile, fileContents = adminTmplInitialViewTemplatePhpFileContents)
+    /**
+    * Validation and multi-row writes for {self.tablePrefix}{table['name']}, generated from the table spec.
+    * The write methods don't manage transactions, the caller wraps them in one.
+    * @since  {self.comVersion}
+    */
+    class {tableClassName}Writer {{
 
-  def setupAdminSrcModelMessageModelPhpFile(self):
-    # Create the first admin model
-    adminSrcModelMessageModelPhpFile = f"{self.adminFolder}/src/Model/MessageModel.php"
-    #################################### START Admin src/Model/MessageModel.php ###################################
-    adminSrcModelMessageModelPhpFileContents = f"""
-    <?php
-    namespace {self.vendorName}\Component\{self.comNameInNamespaces}\Administrator\Model;
-    defined('_JEXEC') or die;
+        const TABLE = '{self.tablePrefix}{table['name']}';
 
-    /* List of availabel model classes
-    use Joomla\CMS\MVC\Model\AdminModel
-    use Joomla\CMS\MVC\Model\BaseModel
-    use Joomla\CMS\MVC\Model\FormModel
-    use Joomla\CMS\MVC\Model\ItemModel
-    use Joomla\CMS\MVC\Model\ListModel
-    */
+        // Rows are addressed by every primary key column, e.g. a partitioned table's [ id, created ]
+        const PRIMARY_KEY = [{', '.join(f"'{columnName}'" for columnName in table['primaryKey'])}];
 
-    use Joomla\CMS\MVC\Model\ItemModel;
-    use Joomla\CMS\Language\Text;
+        // The primary key column the database assigns (SERIAL / AUTO_INCREMENT), inserts must leave it out, null when there is none
+        const AUTO_KEY = {f"'{autoKeyColumn}'" if autoKeyColumn is not None else 'null'};
 
-    /**
-    * @package     Joomla.Administrator
-    * @subpackage  {self.comFolderName}
-    *
-    * @copyright   {self.comCopyRightHolder}
-    * @license     Copyright (C) {self.comLicenseType} All rights reserved.
-    */
+        // column => [ value kind (int, float or string), nullable, required on insert, max characters or null ]
+        const COLUMNS = [{columnEntries}
+        ];
 
-    /**
-    * Hello World Message Model
-    * @since 0.0.1
-    */
-    class MessageModel extends ItemModel {{
+        // Rows per statement, further limited so a statement stays under MySQL's 65535 prepared statement placeholders
+        const ROWS_PER_STATEMENT = 500;
+
+        const MAX_PLACEHOLDERS = 65000;
 
         /**
-        * Returns a message for display
-        * @param integer $pk Primary key of the "message item", currently unused
-        * @return object Message object
+        * validate
+        *
+        * @param   mixed  $item       One decoded JSON record
+        * @param   bool   $forUpdate  Updates need every primary key column and may leave out required columns
+        *
+        * @return  string[]  The problems found, empty when the record may be written
+        * @since   {self.comVersion}
         */
-        public function getItem($pk= null): object {{
-            $item = new \stdClass();
-            $item->message = "A message from the admin message model";
-            /* $item->message = Text::_('COM_HELLOWORLD_MSG_GREETING'); */
-            return $item;
+        public static function validate($item, $forUpdate)
+        {{
+            if (!is_array($item) || $item === [] || array_keys($item) === range(0, count($item) - 1)) {{
+                return ['Each record must be a non empty JSON object.'];
+            }}
+            $errors = [];
+            foreach ($item as $column => $value) {{
+                if (!isset(self::COLUMNS[$column])) {{
+                    $errors[] = 'Unknown column ' . $column . '.';
+                    continue;
+                }}
+                list($kind, $nullable, , $maxLength) = self::COLUMNS[$column];
+                if ($value === null) {{
+                    if (!$nullable) {{
+                        $errors[] = $column . ' may not be null.';
+                    }}
+                }} elseif ($kind === 'int' && filter_var($value, FILTER_VALIDATE_INT) === false) {{
+                    $errors[] = $column . ' must be an integer.';
+                }} elseif ($kind === 'float' && !is_numeric($value)) {{
+                    $errors[] = $column . ' must be a number.';
+                }} elseif ($kind === 'string' && !is_scalar($value)) {{
+                    $errors[] = $column . ' must be a string.';
+                }} elseif ($kind === 'string' && $maxLength !== null && mb_strlen((string) $value) > $maxLength) {{
+                    $errors[] = $column . ' may be at most ' . $maxLength . ' characters.';
+                }}
+            }}
+            if ($forUpdate) {{
+                $missingKeys = array_diff(self::PRIMARY_KEY, array_keys(array_filter($item, 'is_scalar')));
+                if ($missingKeys !== []) {{
+                    $errors[] = 'The ' . implode(', ', $missingKeys) . ' of the record to update is required.';
+                }} elseif (count($item) === count(self::PRIMARY_KEY)) {{
+                    $errors[] = 'There is nothing to update.';
+                }}
+            }} else {{
+                if (self::AUTO_KEY !== null && array_key_exists(self::AUTO_KEY, $item)) {{
+                    $errors[] = self::AUTO_KEY . ' is assigned by the database.';
+                }}
+                foreach (self::COLUMNS as $column => $definition) {{
+                    // The other primary key columns are required too, insertRows() reports each new row's full key
+                    $isKey = in_array($column, self::PRIMARY_KEY, true) && $column !== self::AUTO_KEY;
+                    if (($definition[2] || $isKey) && !array_key_exists($column, $item)) {{
+                        $errors[] = $column . ' is required.';
+                    }}
+                }}
+            }}
+            return $errors;
+        }}
+
+        /**
+        * insertRows
+        *
+        * Multi-row INSERTs, the columns a record leaves out get their DEFAULT.
+        *
+        * @param   DatabaseInterface  $db
+        * @param   array              $rows  Validated records
+        *
+        * @return  array  The primary key of each row as keyOf() gives it, in order
+        * @since   {self.comVersion}
+        */
+        public static function insertRows(DatabaseInterface $db, array $rows)
+        {{
+            $columns = array_values(array_diff(array_keys(self::COLUMNS), self::AUTO_KEY !== null ? [self::AUTO_KEY] : []));
+            $keyStep = self::AUTO_KEY !== null ? (int) $db->setQuery('SELECT @@auto_increment_increment')->loadResult() : 0;
+            $keys = [];
+            foreach (array_chunk($rows, self::rowsPerStatement(count($columns))) as $chunk) {{
+                $query = $db->getQuery(true)
+                    ->insert($db->quoteName(self::TABLE))
+                    ->columns($db->quoteName($columns));
+                foreach ($chunk as $row) {{
+                    $cells = [];
+                    foreach ($columns as $column) {{
+                        $cells[] = self::cell($query, $row, $column, 'DEFAULT');
+                    }}
+                    $query->values(implode(', ', $cells));
+                }}
+                $db->setQuery($query)->execute();
+                // A multi-row VALUES list is a "simple insert": InnoDB reserves its ids in one consecutive run starting at insertid()
+                $firstKey = self::AUTO_KEY !== null ? (int) $db->insertid() : 0;
+                foreach (array_values($chunk) as $offset => $row) {{
+                    if (self::AUTO_KEY !== null) {{
+                        $row[self::AUTO_KEY] = $firstKey + $offset * $keyStep;
+                    }}
+                    $keys[] = self::keyOf($row);
+                }}
+            }}
+            return $keys;
+        }}
+
+        /**
+        * keyOf
+        *
+        * @param   array  $row  A record carrying every primary key column
+        *
+        * @return  mixed  The primary key value, or column => value for a composite primary key
+        * @since   {self.comVersion}
+        */
+        public static function keyOf(array $row)
+        {{
+            $key = [];
+            foreach (self::PRIMARY_KEY as $column) {{
+                $key[$column] = (self::COLUMNS[$column][0] === 'int') ? (int) $row[$column] : $row[$column];
+            }}
+            return (count($key) === 1) ? reset($key) : $key;
+        }}
+
+        /**
+        * keyString
+        *
+        * @param   array  $row  A record carrying every primary key column
+        *
+        * @return  string  The record's primary key as an array key, e.g. to find duplicates
+        * @since   {self.comVersion}
+        */
+        public static function keyString(array $row)
+        {{
+            return json_encode(array_map('strval', (array) self::keyOf($row)));
+        }}
+
+        /**
+        * existingKeys
+        *
+        * @param   DatabaseInterface  $db
+        * @param   array              $rows  Records carrying every primary key column
+        *
+        * @return  string[]  The keyString() of those records which are in the table
+        * @since   {self.comVersion}
+        */
+        public static function existingKeys(DatabaseInterface $db, array $rows)
+        {{
+            $existingKeys = [];
+            foreach (array_chunk($rows, self::rowsPerStatement(count(self::PRIMARY_KEY))) as $chunk) {{
+                $query = $db->getQuery(true)
+                    ->select($db->quoteName(self::PRIMARY_KEY))
+                    ->from($db->quoteName(self::TABLE));
+                $query->where(self::keyCondition($db, $query, $chunk));
+                foreach ($db->setQuery($query)->loadAssocList() as $existingRow) {{
+                    $existingKeys[] = self::keyString($existingRow);
+                }}
+            }}
+            return $existingKeys;
+        }}
+
+        /**
+        * updateRows
+        *
+        * Records are grouped by the columns they carry, each group is written with multi-row
+        * UPDATE ... SET column = CASE WHEN <primary key matches> THEN ... END statements.
+        *
+        * @param   DatabaseInterface  $db
+        * @param   array              $rows  Validated records of existing rows, each carrying every primary key column
+        *
+        * @return  void
+        * @since   {self.comVersion}
+        */
+        public static function updateRows(DatabaseInterface $db, array $rows)
+        {{
+            $groups = [];
+            foreach ($rows as $row) {{
+                $columns = array_values(array_diff(array_keys($row), self::PRIMARY_KEY));
+                sort($columns);
+                $groups[implode(',', $columns)][] = $row;
+            }}
+            foreach ($groups as $columnList => $group) {{
+                $columns = explode(',', $columnList);
+                $keyCount = count(self::PRIMARY_KEY);
+                foreach (array_chunk($group, self::rowsPerStatement(($keyCount + 1) * count($columns) + $keyCount)) as $chunk) {{
+                    $query = $db->getQuery(true)->update($db->quoteName(self::TABLE));
+                    foreach ($columns as $column) {{
+                        $cases = '';
+                        foreach ($chunk as $row) {{
+                            $keyMatches = [];
+                            foreach (self::PRIMARY_KEY as $keyColumn) {{
+                                $keyMatches[] = $db->quoteName($keyColumn) . ' = ' . self::cell($query, $row, $keyColumn);
+                            }}
+                            $cases .= ' WHEN ' . implode(' AND ', $keyMatches) . ' THEN ' . self::cell($query, $row, $column);
+                        }}
+                        $query->set($db->quoteName($column) . ' = CASE' . $cases . ' END');
+                    }}
+                    $query->where(self::keyCondition($db, $query, $chunk));
+                    $db->setQuery($query)->execute();
+                }}
+            }}
+        }}
+
+        // Matches the rows' primary keys, "id IN (...)" or "(id, created) IN ((...), ...)" for a composite primary key
+        private static function keyCondition(DatabaseInterface $db, $query, array $rows)
+        {{
+            $keys = [];
+            foreach ($rows as $row) {{
+                $cells = [];
+                foreach (self::PRIMARY_KEY as $column) {{
+                    $cells[] = self::cell($query, $row, $column);
+                }}
+                $keys[] = (count($cells) === 1) ? $cells[0] : '(' . implode(', ', $cells) . ')';
+            }}
+            $keyColumns = implode(', ', $db->quoteName(self::PRIMARY_KEY));
+            return ((count(self::PRIMARY_KEY) === 1) ? $keyColumns : '(' . $keyColumns . ')') . ' IN (' . implode(', ', $keys) . ')';
+        }}
+
+        // A bound placeholder for $row[$column], NULL, or $missing when the record leaves the column out
+        private static function cell($query, array $row, $column, $missing = 'NULL')
+        {{
+            if (!array_key_exists($column, $row)) {{
+                return $missing;
+            }}
+            if ($row[$column] === null) {{
+                return 'NULL';
+            }}
+            return $query->bindArray([$row[$column]], self::parameterType($column))[0];
+        }}
+
+        private static function parameterType($column)
+        {{
+            return (self::COLUMNS[$column][0] === 'int') ? ParameterType::INTEGER : ParameterType::STRING;
         }}
 
+        private static function rowsPerStatement($placeholdersPerRow)
+        {{
+            return max(1, min(self::ROWS_PER_STATEMENT, intdiv(self::MAX_PLACEHOLDERS, max(1, $placeholdersPerRow))));
+        }}
     }}
     """[5:]
-    ##################################### END Admin src/Controller/DisplayController.php ####################################
-    self.createFile(assetType = "f", targetPath = adminSrcModelMessageModelPhpFile, fileContents = adminSrcModelMessageModelPhpFileContents)
+      ##################################### END Admin src/Helper/<TableClassName>Writer.php ####################################
+      self.createFile(assetType = "f", targetPath = adminSrcHelperTableWriterPhpFile, fileContents = adminSrcHelperTableWriterPhpFileContents)
+
+  def prepareTableQueryMethodPartial(self, table, query):
+    supportingIndex = self.tableSpec.supportingIndex(table, query)
+    indexNote = f"Index: {supportingIndex['name']} ({', '.join(supportingIndex['columns'])})" if supportingIndex is not None else "WARNING: No supporting index, see the table spec lint output"
+    selectExpression = "$db->quoteName([" + ", ".join(f"'{c}'" for c in query["select"]) + "])" if len(query["select"]) > 0 else "'*'"
+    whereStatements = ""
+    for columnName in query["equality"]:
+      parameterType = "ParameterType::INTEGER" if self.tableSpec.isIntegerColumn(self.tableSpec.column(table, columnName)) else "ParameterType::STRING"
+      whereStatements += f"""
+            if (!isset($equals['{columnName}'])) {{
+                throw new \InvalidArgumentException('{query['name']} needs an equality value for {columnName}');
+            }}
+            $eq_{columnName} = $equals['{columnName}'];
+            $query->where($db->quoteName('{columnName}') . ' = :eq_{columnName}')->bind(':eq_{columnName}', $eq_{columnName}, {parameterType});"""
+    rangeDocs = ""
+    if (query["range"]):
+      rangeColumn = query["range"]
+      parameterType = "ParameterType::INTEGER" if self.tableSpec.isIntegerColumn(self.tableSpec.column(table, rangeColumn)) else "ParameterType::STRING"
+      rangeDocs = f"""
+        * @param   mixed              $rangeFrom  Inclusive lower bound on {rangeColumn}, null for none
+        * @param   mixed              $rangeTo    Inclusive upper bound on {rangeColumn}, null for none"""
+      whereStatements += f"""
+            if ($rangeFrom !== null) {{
+                $query->where($db->quoteName('{rangeColumn}') . ' >= :rangeFrom')->bind(':rangeFrom', $rangeFrom, {parameterType});
+            }}
+            if ($rangeTo !== null) {{
+                $query->where($db->quoteName('{rangeColumn}') . ' <= :rangeTo')->bind(':rangeTo', $rangeTo, {parameterType});
+            }}"""
+    orderBy = query["orderBy"] if (len(query["orderBy"]) > 0 or not query["range"]) else [ ( query["range"], "ASC" ) ]
+    orderStatements = "".join(f"""
+            $query->order($db->quoteName('{columnName}') . ' {direction}');""" for columnName, direction in orderBy)
+    tableQueryMethodPartial = f"""
+
+        /**
+        * {query['name']}
+        *
+        * {indexNote}
+        *
+        * @param   DatabaseInterface  $db
+        * @param   array              $equals     Equality values keyed by column name{(': ' + ', '.join(query['equality'])) if query['equality'] else ' (unused)'}{rangeDocs}
+        * @param   int                $limit
+        * @return  QueryInterface
+        */
+        public static function {query['name']}(DatabaseInterface $db, array $equals = [], $rangeFrom = null, $rangeTo = null, $limit = 50) {{
+            $query = $db->getQuery(true)
+                ->select({selectExpression})
+                ->from($db->quoteName(self::TABLE))
+                ->setLimit((int) $limit);
+{whereStatements[1:] if whereStatements else ''}{orderStatements}
+
+            return $query;
+        }}"""
+    return tableQueryMethodPartial
 
   ##########################################################################################################
   ############################################# END ADMIN SIDE #############################################
@@ -991,6 +3427,53 @@ class JsonapiView extends BaseApiView
   def setupSiteSrcControllerDisplayControllerPhpFile(self):
     # Create the Initial site display controller
     siteSrcControllerDisplayControllerPhpFile = f"{self.siteFolder}/src/Controller/DisplayController.php"
+    siteDisplayControllerBodyPartial = """
+        public function display($cachable = false, $urlparams = array()) {
+            $document = Factory::getDocument();
+            $viewName = $this->input->getCmd('view', 'login');
+            $viewFormat = $document->getType();
+
+            $view = $this->getView($viewName, $viewFormat);
+            $view->setModel($this->getModel('Message'), true);
+
+            $view->document = $document;
+            $view->display();
+        }"""
+    if (self.siteViewCache):
+      safeUrlParamsPartial = ", ".join(f"'{paramName}' => '{paramFilter}'" for paramName, paramFilter in self.siteCacheSafeUrlParams)
+      siteDisplayControllerBodyPartial = f"""
+        /**
+        * The default view for the display method.
+        *
+        * @var string
+        */
+        protected $default_view = '{self.initialViewNameLower}';
+
+        /**
+        * URL params selecting distinct cached output (name => input filter), every other param shares the cache entry
+        */
+        const SAFE_URL_PARAMS = [{safeUrlParamsPartial}];
+
+        /**
+        * Renders the view through Joomla's view cache (group {self.comFolderName}, see the view's CACHE_GROUPS) for guest GET requests
+        *
+        * @param   boolean  $cachable   Whether the output may be served from the view cache
+        * @param   array    $urlparams  Extra safe URL params, merged over SAFE_URL_PARAMS
+        * @return  static
+        */
+        public function display($cachable = true, $urlparams = array()) {{
+            $viewName = $this->input->getCmd('view', $this->default_view);
+            $viewFormat = Factory::getDocument()->getType();
+
+            // BaseController::display() renders the instance getView() keeps, so the model set here is the one used
+            $view = $this->getView($viewName, $viewFormat, '', ['base_path' => $this->basePath, 'layout' => $this->input->getString('layout', 'default')]);
+            $view->setModel($this->getModel('Message'), true);
+
+            // Logged in users may see personalised output, only cache what every guest sees
+            $cachable = $cachable && $this->app->getIdentity()->guest && $this->input->getMethod() === 'GET';
+
+            return parent::display($cachable, array_merge(self::SAFE_URL_PARAMS, $urlparams));
+        }}"""
     #################################### START Site src/Controller/DisplayController.php ###################################
     siteSrcControllerDisplayControllerPhpFileContents = f"""
     <?php
@@ -1013,18 +3496,7 @@ class JsonapiView extends BaseApiView
     * @since  {self.comVersion}
     */
     class DisplayController extends BaseController {{
-
-        public function display($cachable = false, $urlparams = array()) {{
-            $document = Factory::getDocument();
-            $viewName = $this->input->getCmd('view', 'login');
-            $viewFormat = $document->getType();
-
-            $view = $this->getView($viewName, $viewFormat);
-            $view->setModel($this->getModel('Message'), true);
-
-            $view->document = $document;
-            $view->display();
-        }}
+{siteDisplayControllerBodyPartial}
 
     }}
     """[5:]
@@ -1034,6 +3506,14 @@ class JsonapiView extends BaseApiView
   def setupSiteSrcViewInitialHtmlViewPhpFile(self):
     # Create the Initial site view
     siteSrcViewInitialHtmlViewPhpFile = f"{self.siteFolder}/src/View/{self.initialViewName}/HtmlView.php"
+    siteViewCacheGroupsPartial = ""
+    if (self.siteViewCache):
+      siteViewCacheGroupsPartial = f"""
+
+        /**
+        * Cache groups holding this view's output, purged by ViewCache::purge() whenever the component saves data
+        */
+        const CACHE_GROUPS = ['{self.comFolderName}'];"""
     #################################### START Site src/Controller/DisplayController.php ###################################
     siteSrcViewInitialHtmlViewPhpFileContents = f"""
     <?php
@@ -1053,7 +3533,7 @@ class JsonapiView extends BaseApiView
     /**
     * View for the user identity validation form
     */
-    class HtmlView extends BaseHtmlView {{
+    class HtmlView extends BaseHtmlView {{{siteViewCacheGroupsPartial}
 
 
         /**
@@ -1102,6 +3582,7 @@ class JsonapiView extends BaseApiView
 
   def setupSiteSrcModelMessageModelPhpFile(self):
     # Create the first site model
+    modelUsePartial, modelGetDboPartial = self.prepareModelRepeatedQueryMonitorPartials()
     siteSrcModelMessageModelPhpFile = f"{self.siteFolder}/src/Model/MessageModel.php"
     #################################### START Site src/Model/MessageModel.php ###################################
     siteSrcModelMessageModelPhpFileContents = f"""
@@ -1118,7 +3599,7 @@ class JsonapiView extends BaseApiView
 
 
     use Joomla\CMS\MVC\Model\ItemModel;
-    use Joomla\CMS\Language\Text;
+    use Joomla\CMS\Language\Text;{modelUsePartial}
 
     /**
     * @package     Joomla.Administrator
@@ -1144,7 +3625,7 @@ class JsonapiView extends BaseApiView
             $item->message = "A message from the site message model";
             /* $item->message = Text::_('COM_HELLOWORLD_MSG_GREETING'); */
             return $item;
-        }}
+        }}{modelGetDboPartial}
 
     }}
     """[5:]
@@ -1190,35 +3671,21 @@ class JsonapiView extends BaseApiView
     # Create the Install SQL file (only runs upon installation (not updates i.e. install over existing installation))
     adminSqlInstallFile = f"{self.sqlAssetFolder}/{self.sqlInstallFilename}"
     #################################### START Install SQL ###################################
-    adminSqlInstallFileContents = f"""
-    DROP TABLE IF EXISTS `#__{self.comNameJoomla}_{self.initialTableName}`;
-
-    CREATE TABLE `#__{self.comNameJoomla}_{self.initialTableName}`(
-        `id` SERIAL NOT NULL COMMENT "The auto-increment pk of this i.e. {self.initialTableName} table",
-        `name` VARCHAR(255) NOT NULL COMMENT "Required (can't be null) name field",
-        `address` VARCHAR(255) NULL COMMENT "Example 'Address' field of {self.initialTableName} if no value provided, will be NULL",
-        `city` VARCHAR(128) NULL COMMENT "Example 'City' field of {self.initialTableName} if no value provided, will be NULL",
-        `state` VARCHAR(128) NULL COMMENT "Example 'State' field of {self.initialTableName} if no value provided, will be NULL",
-        `zip_postcode` MEDIUMINT NULL COMMENT "Example 'Postal code' field of {self.initialTableName} if no value provided, will be NULL",
-        PRIMARY KEY(`id`)
-    ) ENGINE = InnoDB;
-
-    /* Testing insertion into our newly created table */
-    INSERT INTO `#__{self.comNameJoomla}_{self.initialTableName}` (`name`) VALUES
-        ("Example.com"),
-        ("Foo Bar Bat");
-    """[5:]
+    adminSqlInstallFileContents = self.tableSpec.renderInstallSql(self.tablePrefix)
+    if (self.apiWriteBehindQueue):
+      adminSqlInstallFileContents += "\n" + self.writeBehindQueueTableSpec().renderInstallSql(self.tablePrefix)
     ##################################### END Install SQL ####################################
     self.createFile(assetType = "f", targetPath = adminSqlInstallFile, fileContents = adminSqlInstallFileContents)
+    if (len(self.tableSpec.partitionedTables()) > 0):
+      print(f"""NOTE: partitioned tables need their partition maintenance task, generate it with ./pluginMaker.py --plugin-type="task" --task-partition-spec="{self.args.table_spec}" --task-partition-table-prefix="{self.tablePrefix}\"""")
 
   def setupAdminSqlUninstallFile(self):
     # Create the Uninstall SQL file (only runs upon Uninstallation (not updates i.e. Install over existing innstallation))
     adminSqlUninstallFile = f"{self.sqlAssetFolder}/{self.sqlUninstallFilename}"
     #################################### START Uninstall SQL ###################################
-    adminSqlUninstallFileContents = f"""
-    DROP TABLE IF EXISTS `#__{self.comNameJoomla}_{self.initialTableName}`;
-
-    """[5:]
+    adminSqlUninstallFileContents = self.tableSpec.renderUninstallSql(self.tablePrefix)
+    if (self.apiWriteBehindQueue):
+      adminSqlUninstallFileContents = adminSqlUninstallFileContents[:-1] + self.writeBehindQueueTableSpec().renderUninstallSql(self.tablePrefix)
     ##################################### END Uninstall SQL ####################################
     self.createFile(assetType = "f", targetPath = adminSqlUninstallFile, fileContents = adminSqlUninstallFileContents)
 
@@ -1226,14 +3693,118 @@ class JsonapiView extends BaseApiView
     # Create the Update SQL file (only runs upon update (An update is an install over existing innstallation))
     adminSqlUpdateFile = f"{self.sqlAssetUpdatesFolder}/{self.sqlUpdateFilename}"
     #################################### START Update SQL ###################################
+    updateTable = self.tableSpec.tables[0]
     adminSqlUpdateFileContents = f"""
-    ALTER TABLE `#__{self.comNameJoomla}_{self.initialTableName}` ADD `new_field_from_update` TEXT NULL DEFAULT NULL AFTER `zip_postcode`,
+    ALTER TABLE `{self.tablePrefix}{updateTable['name']}` ADD `new_field_from_update` TEXT NULL DEFAULT NULL AFTER `{updateTable['columns'][-1]['name']}`,
     ADD FULLTEXT `idx_new_field_from_update` (`new_field_from_update`);
     """[5:]
+    if (self.schemaMigration is not None):
+      adminSqlUpdateFileContents = self.schemaMigration.renderUpdateSql(f"Update to {self.comVersion} from the table spec {self.args.table_spec_previous}")
+      if (self.apiWriteBehindQueue):
+        # The queue table is not part of the spec, an update from a version without it creates it
+        queueTableSpec = self.writeBehindQueueTableSpec()
+        adminSqlUpdateFileContents += "\n" + queueTableSpec.renderCreateTable(queueTableSpec.tables[0], f"{self.tablePrefix}queue", dropExisting = False)
     ##################################### END Update SQL ####################################
     self.createFile(assetType = "f", targetPath = adminSqlUpdateFile, fileContents = adminSqlUpdateFileContents)
 
 
+  def setupSeedDataFile(self):
+    # Create the bulk seed SQL file next to (not inside) the package, it is loaded by hand with the mysql client for load testing
+    if (self.args.seed_rows is None and self.args.seed_csv is None):
+      return
+    if (self.args.seed_rows is not None and self.args.seed_csv is not None):
+      raise Exception("""--seed-rows and --seed-csv are mutually exclusive, please pass only one of them.""")
+    seedTableName = self.args.seed_table if self.args.seed_table is not None else self.tableSpec.tables[0]["name"]
+    seedFolder = f"{self.currDir}/{self.comFolderName}_seed"
+    seedFile = f"{seedFolder}/{seedTableName}.seed.sql"
+    self.createFile(assetType = "d", targetPath = seedFolder)
+    seededRows = writeSeedFile(self.tableSpec, seedTableName, f"{self.args.seed_db_prefix}{self.comNameJoomla}_{seedTableName}", seedFile,
+                               rowCount = self.args.seed_rows, csvPath = self.args.seed_csv, maxAllowedPacket = self.args.seed_max_allowed_packet,
+                               deferIndexes = self.args.seed_defer_indexes, packetFlagName = "--seed-max-allowed-packet")
+    print( f"Created file: {seedFile}, with {seededRows} seed rows" )
+
+
+  # A loadTest.py value template for a column of the table spec
+  def loadTestValueTemplate(self, column):
+    valueKind = self.tableSpec.columnValueKind(column)
+    typeName = column["type"].split("(")[0].split()[0]
+    if (valueKind == "int"):
+      return "{{randInt:1:1000}}"
+    if (valueKind == "float"):
+      return "{{randFloat:0:1000}}"
+    if (typeName == "DATE"):
+      return "2024-01-{{randInt:10:28}}"
+    if (typeName in ("DATETIME", "TIMESTAMP")):
+      return "2024-01-{{randInt:10:28}} 12:00:00"
+    maxLength = self.tableSpec.columnMaxLength(column)
+    return f"{{{{randStr:{min(12, maxLength) if maxLength is not None else 12}}}}}"
+
+  # One loadTest.py route per generated API controller method
+  def apiLoadTestRoutes(self):
+    routePrefix = f"/api/index.php/v1/{self.comNameJoomla}"
+    loadTestRoutes = []
+    batchRequests = []
+    for controllerName in self.apiControllerNames:
+      controllerPath = f"{routePrefix}/{controllerName.lower()}"
+      if (self.apiControllerDesign == "joomla-bloat"):
+        loadTestRoutes.append({ "name": f"{controllerName.lower()}.displayList", "method": "GET", "path": controllerPath, "weight": 3, "body": None })
+        loadTestRoutes.append({ "name": f"{controllerName.lower()}.displayItem", "method": "GET", "path": f"{controllerPath}/{{{{randInt:1:1000}}}}", "weight": 3, "body": None })
+        continue
+      table = self.tableSpec.tableForController(controllerName)
+      methodParams = {}
+      if (self.apiListPagination == "keyset"):
+        methodParams[f"get{controllerName.capitalize()}Page"] = { "limit": 50 }
+      for specTable in self.tableSpec.tables:
+        if ((specTable["controller"] or "").lower() == controllerName.lower()):
+          for query in specTable["queries"]:
+            methodParams[self.apiTableQueryMethodName(query)] = { **{ columnName: self.loadTestValueTemplate(self.tableSpec.column(specTable, columnName)) for columnName in query["equality"] }, "limit": 50 }
+      for methodName, params in methodParams.items():
+        queryString = "&".join(f"{name}={value}" for name, value in params.items())
+        loadTestRoutes.append({ "name": f"{controllerName.lower()}.{methodName}", "method": "GET", "path": f"{controllerPath}/{methodName}?{queryString}", "weight": 3, "body": None })
+        batchRequests.append({ "id": f"{controllerName.lower()}.{methodName}", "controller": controllerName.lower(), "method": methodName, "params": params })
+      if (self.apiBulkWrite):
+        writableColumns = [ column for column in table["columns"] if not self.tableSpec.isAutoIncrementColumn(column) ]
+        updateColumns = [ column for column in writableColumns if column["name"] not in table["primaryKey"] ][:1]
+        loadTestRoutes.append({ "name": f"{controllerName.lower()}.bulkCreate", "method": "POST", "path": f"{controllerPath}/bulkCreate", "weight": 1,
+                                "body": [ { column["name"]: self.loadTestValueTemplate(column) for column in writableColumns } for _ in range(10) ] })
+        loadTestRoutes.append({ "name": f"{controllerName.lower()}.bulkUpdate", "method": "POST", "path": f"{controllerPath}/bulkUpdate", "weight": 1,
+                                "body": [ { **{ columnName: self.loadTestValueTemplate(self.tableSpec.column(table, columnName)) for columnName in table["primaryKey"] },
+                                            **{ column["name"]: self.loadTestValueTemplate(column) for column in updateColumns } } for _ in range(10) ] })
+      if (len(methodParams) == 0 and not self.apiBulkWrite):
+        loadTestRoutes.append({ "name": f"{controllerName.lower()}.<method>", "method": "GET", "path": f"{controllerPath}/<method>", "weight": 1, "body": None })
+    if (self.apiBatchController):
+      loadTestRoutes.append({ "name": "batch.dispatchBatch", "method": "POST", "path": f"{routePrefix}/batch", "weight": 1,
+                              "body": { "requests": batchRequests[:self.apiBatchMaxRequests] } })
+    return loadTestRoutes
+
+  # Copy loadTest.py & its stub server next to the component together with a loadTestConfig.json of the generated routes
+  def setupLoadTestFolder(self):
+    if (not self.args.emit_load_test):
+      return
+    loadTestFolder = f"{self.currDir}/{self.comFolderName}_loadtest"
+    self.createFile(assetType = "d", targetPath = loadTestFolder)
+    toolsFolder = os.path.dirname(os.path.realpath(__file__))
+    for scriptName in ("loadTest.py", "loadTestStubServer.py"):
+      with open(f"{toolsFolder}/{scriptName}", "rt") as scriptHandle:
+        self.createFile(assetType = "f", targetPath = f"{loadTestFolder}/{scriptName}", fileContents = scriptHandle.read())
+    loadTestConfig = { "baseUrl": "http://localhost", "headers": { "X-Joomla-Token": "<api token>" },
+                       "concurrency": 10, "durationSeconds": 30, "timeoutSeconds": 10, "routes": self.apiLoadTestRoutes() }
+    self.createFile(assetType = "f", targetPath = f"{loadTestFolder}/loadTestConfig.json", fileContents = json.dumps(loadTestConfig, indent = 2) + "\n")
+
+  # Write the OPcache preload script of the generated classes (and the tool merging it with other extensions') next to the package
+  def setupPreloadFolder(self):
+    if (not self.args.emit_preload):
+      return
+    preloadFolder = f"{self.currDir}/{self.comFolderName}_preload"
+    self.createFile(assetType = "d", targetPath = preloadFolder)
+    classIndex = indexPhpClasses(self.comPackageBaseFolder, componentInstallPaths(self.comFolderName))
+    preloadManifest = writePreloadFiles(preloadFolder, self.comFolderName, classIndex)
+    toolsFolder = os.path.dirname(os.path.realpath(__file__))
+    with open(f"{toolsFolder}/phpPreload.py", "rt") as scriptHandle:
+      self.createFile(assetType = "f", targetPath = f"{preloadFolder}/phpPreload.py", fileContents = scriptHandle.read())
+    print(f"Wrote {preloadFolder}/preload.php preloading {len(preloadManifest['files'])} files")
+
+
   # # Create the Update SQL file (only runs upon Update (not Installs i.e. Installs over existing installation))
   # adminSqlUpdateFile = f"{self.sqlAssetUpdatesFolder}/{self.comVersion}.sql"
   # #################################### START Update SQL ###################################
@@ -1275,6 +3846,11 @@ class JsonapiView extends BaseApiView
     self.setupSiteAndAdminFolders()
     self.setupComponentManifestFile()
     self.setupApiControllerAndViewPhpFiles()
+    self.setupApiHelperApiToolsPhpFile()
+    self.setupApiHelperQueryTimingMonitorPhpFile()
+    self.setupApiBatchControllerPhpFile()
+    self.setupApiHelperApiMetricsPhpFile()
+    self.setupApiMetricsControllerPhpFile()
     self.setupAdminServicesProviderPhpFile()
     self.setupAdminLanguageLangLocalCodeIniFile()
     self.setupAdminLanguageLangLocalCodeSysIniFile()
@@ -1283,15 +3859,24 @@ class JsonapiView extends BaseApiView
     self.setupAdminSrcViewInitialHtmlViewPhpFile()
     self.setupAdminTmplInitialViewTemplatePhpFile()
     self.setupAdminSrcModelMessageModelPhpFile()
+    self.setupAdminSrcModelTableListModelPhpFiles()
+    self.setupAdminSrcHelperRepeatedQueryMonitorPhpFile()
+    self.setupAdminSrcHelperViewCachePhpFile()
+    self.setupAdminSrcHelperTableQueriesPhpFiles()
+    self.setupAdminSrcHelperTableWriterPhpFiles()
     self.setupSiteSrcControllerDisplayControllerPhpFile()
     self.setupSiteSrcViewInitialHtmlViewPhpFile()
     self.setupSiteTmplInitialViewTemplatePhpFile()
     self.setupSiteSrcModelMessageModelPhpFile()
     self.setupSiteTmplInitialViewTemplateXmlFile()
+    self.setupAdminServicesClassMapPhpFiles()
     self.setupSqlAssetFolder()
     self.setupAdminSqlInstallFile()
     self.setupAdminSqlUninstallFile()
     self.setupAdminSqlUpdateFile()
+    self.setupSeedDataFile()
+    self.setupLoadTestFolder()
+    self.setupPreloadFolder()
     self.finishAndCreateInstallable()
 
 CM = ComponentMaker()
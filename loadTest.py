@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+
+# Standalone asyncio HTTP/1.1 load test harness, emitted next to generated extensions by
+# componentMaker.py / pluginMaker.py --emit-load-test together with a loadTestConfig.json of their routes.
+# Only needs the python 3.7+ standard library.
+#   ./loadTest.py loadTestConfig.json [--concurrency=50] [--duration=30] [--base-url="https://example.com"] [--route="main.getMainPage"]
+#   ./loadTest.py loadTestConfig.json --stub     (runs against loadTestStubServer.py in-process to try the harness offline)
+#
+# loadTestConfig.json:
+# {
+#   "baseUrl": "http://localhost",
+#   "headers": { "X-Joomla-Token": "<api token>" },
+#   "concurrency": 10,
+#   "durationSeconds": 30,
+#   "timeoutSeconds": 10,
+#   "routes": [
+#     { "name": "main.getMainPage", "method": "GET", "path": "/api/index.php/v1/example/main/page?limit={{randInt:1:50}}", "weight": 3 },
+#     { "name": "main.bulkCreate", "method": "POST", "path": "/api/index.php/v1/example/main/bulk", "body": [ { "name": "{{randStr:12}}" } ] }
+#   ]
+# }
+#
+# Templates in paths and bodies: {{randInt:min:max}}, {{randFloat:min:max}}, {{randStr:length}}, {{choice:a|b|c}} and {{seq}}
+# (a per run request counter). A body string holding nothing but a randInt, randFloat or seq template becomes a JSON number.
+# Routes whose path still holds a <placeholder> are skipped until it is filled in.
+# Every worker holds one keep-alive connection, so --concurrency is also the number of connections.
+import sys, json, time, random, string, asyncio, argparse, ssl, re
+from urllib.parse import urlsplit
+
+templatePattern = re.compile(r"\{\{(\w+)(?::([^}]*))?\}\}")
+percentilesReported = ( 50, 90, 95, 99 )
+
+##########################################################################################################
+############################################### Templates ################################################
+##########################################################################################################
+
+def templateValue(kind, templateArgs, sequence):
+  if ( kind == "randInt" ):
+    low, high = ( int(arg) for arg in templateArgs.split(":") )
+    return random.randint(low, high)
+  if ( kind == "randFloat" ):
+    low, high = ( float(arg) for arg in templateArgs.split(":") )
+    return round(random.uniform(low, high), 4)
+  if ( kind == "randStr" ):
+    return "".join(random.choices(string.ascii_lowercase, k = int(templateArgs)))
+  if ( kind == "choice" ):
+    return random.choice(templateArgs.split("|"))
+  if ( kind == "seq" ):
+    return sequence
+  raise Exception(f"""Unknown load test template {{{{{kind}}}}}, expected randInt, randFloat, randStr, choice or seq.""")
+
+def renderText(text, sequence):
+  return templatePattern.sub(lambda match: str(templateValue(match.group(1), match.group(2), sequence)), text)
+
+def renderBody(body, sequence):
+  if ( type(body) is dict ):
+    return { key: renderBody(value, sequence) for key, value in body.items() }
+  if ( type(body) is list ):
+    return [ renderBody(value, sequence) for value in body ]
+  if ( type(body) is str ):
+    wholeMatch = templatePattern.fullmatch(body)
+    if ( wholeMatch is not None and wholeMatch.group(1) in ( "randInt", "randFloat", "seq" ) ):
+      return templateValue(wholeMatch.group(1), wholeMatch.group(2), sequence)
+    return renderText(body, sequence)
+  return body
+
+##########################################################################################################
+############################################# HTTP/1.1 client ############################################
+##########################################################################################################
+
+class HttpConnection:
+  def __init__(self, baseUrl, timeoutSeconds):
+    baseParts = urlsplit(baseUrl)
+    self.secure = baseParts.scheme == "https"
+    self.host = baseParts.hostname
+    self.port = baseParts.port or (443 if self.secure else 80)
+    self.hostHeader = baseParts.netloc
+    self.basePath = baseParts.path.rstrip("/")
+    self.timeoutSeconds = timeoutSeconds
+    self.reader = None
+    self.writer = None
+
+  async def connect(self):
+    sslContext = ssl.create_default_context() if self.secure else None
+    self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port, ssl = sslContext), self.timeoutSeconds)
+
+  def close(self):
+    if ( self.writer is not None ):
+      self.writer.close()
+    self.reader = None
+    self.writer = None
+
+  # Returns ( status, bodyBytes ), reconnecting first when the previous response closed the connection
+  async def request(self, method, path, headers, body):
+    if ( self.writer is None ):
+      await self.connect()
+    requestHead = f"{method} {self.basePath}{path} HTTP/1.1\r\nHost: {self.hostHeader}\r\n"
+    requestHead += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    if ( body is not None ):
+      requestHead += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+    self.writer.write((requestHead + "\r\n").encode("latin-1") + (body or b""))
+    await self.writer.drain()
+    return await asyncio.wait_for(self.readResponse(method), self.timeoutSeconds)
+
+  async def readResponse(self, method):
+    statusLine = await self.reader.readline()
+    if ( not statusLine ):
+      raise ConnectionError("The server closed the connection")
+    status = int(statusLine.split()[1])
+    responseHeaders = {}
+    while True:
+      headerLine = await self.reader.readline()
+      if ( headerLine in ( b"\r\n", b"\n", b"" ) ):
+        break
+      headerName, _, headerValue = headerLine.decode("latin-1").partition(":")
+      responseHeaders[headerName.strip().lower()] = headerValue.strip()
+    bodyBytes = 0
+    if ( method == "HEAD" or status in ( 204, 304 ) or 100 <= status < 200 ):
+      pass
+    elif ( responseHeaders.get("transfer-encoding", "").lower() == "chunked" ):
+      while True:
+        chunkSize = int((await self.reader.readline()).split(b";")[0], 16)
+        if ( chunkSize == 0 ):
+          while ( (await self.reader.readline()) not in ( b"\r\n", b"\n", b"" ) ):
+            pass
+          break
+        bodyBytes += len(await self.reader.readexactly(chunkSize + 2)) - 2
+    elif ( "content-length" in responseHeaders ):
+      bodyBytes = len(await self.reader.readexactly(int(responseHeaders["content-length"])))
+    else:
+      bodyBytes = len(await self.reader.read())
+      self.close()
+    if ( responseHeaders.get("connection", "").lower() == "close" ):
+      self.close()
+    return status, bodyBytes
+
+##########################################################################################################
+############################################### Load test ################################################
+##########################################################################################################
+
+class RouteStats:
+  def __init__(self, name):
+    self.name = name
+    self.latencies = []
+    self.statusCounts = {}
+    self.errors = 0
+    self.bodyBytes = 0
+
+  def record(self, latency, status, bodyBytes):
+    self.latencies.append(latency)
+    self.statusCounts[status] = self.statusCounts.get(status, 0) + 1
+    self.bodyBytes += bodyBytes
+
+  def merge(self, other):
+    self.latencies += other.latencies
+    for status, count in other.statusCounts.items():
+      self.statusCounts[status] = self.statusCounts.get(status, 0) + count
+    self.errors += other.errors
+    self.bodyBytes += other.bodyBytes
+
+  # Nearest rank percentile, in milliseconds
+  def percentile(self, sortedLatencies, percent):
+    if ( len(sortedLatencies) == 0 ):
+      return None
+    rank = max(1, -(-percent * len(sortedLatencies) // 100))
+    return sortedLatencies[int(rank) - 1] * 1000
+
+  def summary(self, elapsedSeconds):
+    sortedLatencies = sorted(self.latencies)
+    return {
+      "route": self.name,
+      "requests": len(self.latencies),
+      "errors": self.errors,
+      "non2xx": sum(count for status, count in self.statusCounts.items() if not 200 <= status < 300),
+      "statusCounts": { str(status): count for status, count in sorted(self.statusCounts.items()) },
+      "throughputRps": len(self.latencies) / elapsedSeconds if elapsedSeconds > 0 else 0,
+      "meanMs": (sum(sortedLatencies) / len(sortedLatencies) * 1000) if len(sortedLatencies) > 0 else None,
+      **{ f"p{percent}Ms": self.percentile(sortedLatencies, percent) for percent in percentilesReported },
+      "maxMs": sortedLatencies[-1] * 1000 if len(sortedLatencies) > 0 else None,
+      "bodyBytes": self.bodyBytes,
+    }
+
+class LoadTest:
+  def __init__(self, config, baseUrl, concurrency, durationSeconds, timeoutSeconds):
+    self.baseUrl = baseUrl
+    self.headers = { "Accept": "application/json", **config.get("headers", {}) }
+    self.concurrency = concurrency
+    self.durationSeconds = durationSeconds
+    self.timeoutSeconds = timeoutSeconds
+    self.routes = config["routes"]
+    self.weights = [ route.get("weight", 1) for route in self.routes ]
+    self.stats = { route["name"]: RouteStats(route["name"]) for route in self.routes }
+    self.sequence = 0
+
+  async def worker(self, deadline):
+    connection = HttpConnection(self.baseUrl, self.timeoutSeconds)
+    try:
+      while ( time.monotonic() < deadline ):
+        route = random.choices(self.routes, weights = self.weights)[0]
+        self.sequence += 1
+        path = renderText(route["path"], self.sequence)
+        body = json.dumps(renderBody(route["body"], self.sequence)).encode("utf-8") if route.get("body") is not None else None
+        routeStats = self.stats[route["name"]]
+        started = time.perf_counter()
+        try:
+          status, bodyBytes = await connection.request(route.get("method", "GET").upper(), path, self.headers, body)
+          routeStats.record(time.perf_counter() - started, status, bodyBytes)
+        except ( OSError, ValueError, IndexError, asyncio.TimeoutError, asyncio.IncompleteReadError ):
+          routeStats.errors += 1
+          connection.close()
+          # Don't spin on a refused or dropped connection
+          await asyncio.sleep(0.05)
+    finally:
+      connection.close()
+
+  async def run(self):
+    started = time.monotonic()
+    await asyncio.gather(*( self.worker(started + self.durationSeconds) for _ in range(self.concurrency) ))
+    return time.monotonic() - started
+
+def formatMs(value):
+  return f"{value:9.2f}" if value is not None else f"{'-':>9}"
+
+def printReport(summaries, elapsedSeconds, concurrency):
+  print(f"\n{concurrency} connections for {elapsedSeconds:.1f}s, latencies in ms\n")
+  print(f"{'route':<40} {'requests':>9} {'rps':>9} {'errors':>7} {'non2xx':>7} {'mean':>9}" + "".join(f" {'p' + str(p):>9}" for p in percentilesReported) + f" {'max':>9}")
+  for summary in summaries:
+    print(f"{summary['route'][:40]:<40} {summary['requests']:>9} {summary['throughputRps']:>9.1f} {summary['errors']:>7} {summary['non2xx']:>7} {formatMs(summary['meanMs'])}"
+          + "".join(f" {formatMs(summary[f'p{p}Ms'])}" for p in percentilesReported) + f" {formatMs(summary['maxMs'])}")
+
+async def runLoadTest(config, args):
+  stubServer = None
+  baseUrl = args.base_url or config.get("baseUrl", "http://localhost")
+  if ( args.stub ):
+    from loadTestStubServer import startStubServer
+    stubServer = await startStubServer(port = 0, delayMs = args.stub_delay_ms)
+    baseUrl = f"http://127.0.0.1:{stubServer.sockets[0].getsockname()[1]}"
+  try:
+    loadTest = LoadTest(config, baseUrl, args.concurrency or config.get("concurrency", 10),
+                        args.duration or config.get("durationSeconds", 30), config.get("timeoutSeconds", 10))
+    elapsedSeconds = await loadTest.run()
+  finally:
+    if ( stubServer is not None ):
+      stubServer.close()
+      await stubServer.wait_closed()
+  totalStats = RouteStats("TOTAL")
+  for routeStats in loadTest.stats.values():
+    totalStats.merge(routeStats)
+  summaries = [ routeStats.summary(elapsedSeconds) for routeStats in loadTest.stats.values() ] + [ totalStats.summary(elapsedSeconds) ]
+  return summaries, elapsedSeconds, loadTest.concurrency
+
+# The routes to drive: the selected ones, minus those whose path still holds a <placeholder>
+def selectRoutes(config, routeNames):
+  routes = [ route for route in config.get("routes", []) if not routeNames or route["name"] in routeNames ]
+  for route in [ route for route in routes if re.search(r"<[^>]+>", route["path"]) ]:
+    print(f"Skipping route {route['name']}: please replace the <placeholder> in its path {route['path']}", file = sys.stderr)
+  return [ route for route in routes if not re.search(r"<[^>]+>", route["path"]) ]
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description='Drive the routes of a loadTestConfig.json with concurrent keep-alive HTTP/1.1 connections and report latency percentiles and throughput.', allow_abbrev=False)
+  parser.add_argument('config', help="""Path to the loadTestConfig.json""")
+  parser.add_argument('--base-url', required=False, metavar='e.g. --base-url="https://staging.example.com"',
+                      help="""OPTIONAL: Overrides "baseUrl" of the config, the site root the route paths are appended to.""")
+  parser.add_argument('--concurrency', required=False, type=int, metavar='e.g. --concurrency=50',
+                      help="""OPTIONAL: Overrides "concurrency" of the config, the number of concurrent connections.""")
+  parser.add_argument('--duration', required=False, type=float, metavar='e.g. --duration=60',
+                      help="""OPTIONAL: Overrides "durationSeconds" of the config.""")
+  parser.add_argument('--route', required=False, action='append', metavar='e.g. --route="main.getMainPage"',
+                      help="""OPTIONAL: Only drive this route, may be repeated.""")
+  parser.add_argument('--json', required=False, default=False, action='store_true',
+                      help="""OPTIONAL: Print the results as JSON instead of a table.""")
+  parser.add_argument('--stub', required=False, default=False, action='store_true',
+                      help="""OPTIONAL: Run against an in-process loadTestStubServer.py instead of the base url, to try the harness offline.""")
+  parser.add_argument('--stub-delay-ms', required=False, type=float, default=0, metavar='e.g. --stub-delay-ms=5',
+                      help="""OPTIONAL: Simulated server time of the --stub server, in milliseconds.""")
+  args = parser.parse_args()
+  with open(args.config, "rt") as configHandle:
+    config = json.load(configHandle)
+  config["routes"] = selectRoutes(config, args.route)
+  if ( len(config["routes"]) == 0 ):
+    sys.exit("No runnable routes, please check the routes of the config and --route.")
+  summaries, elapsedSeconds, concurrency = asyncio.run(runLoadTest(config, args))
+  if ( args.json ):
+    print(json.dumps({ "elapsedSeconds": elapsedSeconds, "concurrency": concurrency, "routes": summaries }, indent = 2))
+  else:
+    printReport(summaries, elapsedSeconds, concurrency)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+# Minimal asyncio HTTP/1.1 server answering every request with a small JSON payload, so loadTest.py can be
+# tried (and the harness itself measured) offline. Keep-alive is honoured, request bodies are read and discarded.
+#   ./loadTestStubServer.py [--port=8080] [--delay-ms=5] [--payload-rows=10]
+# Only needs the python 3.7+ standard library.
+import json, asyncio, argparse
+
+def stubPayload(payloadRows):
+  rows = [ { "id": rowNumber, "name": f"Stub row {rowNumber}" } for rowNumber in range(1, payloadRows + 1) ]
+  return json.dumps({ "success": True, "data": rows }).encode("utf-8")
+
+async def handleClient(reader, writer, delaySeconds, payload):
+  try:
+    while True:
+      requestLine = await reader.readline()
+      if ( not requestLine ):
+        break
+      contentLength = 0
+      keepAlive = not requestLine.rstrip().endswith(b"HTTP/1.0")
+      while True:
+        headerLine = await reader.readline()
+        if ( headerLine in ( b"\r\n", b"\n", b"" ) ):
+          break
+        headerName, _, headerValue = headerLine.decode("latin-1").partition(":")
+        headerName = headerName.strip().lower()
+        if ( headerName == "content-length" ):
+          contentLength = int(headerValue.strip())
+        elif ( headerName == "connection" ):
+          keepAlive = headerValue.strip().lower() != "close"
+      if ( contentLength > 0 ):
+        await reader.readexactly(contentLength)
+      if ( delaySeconds > 0 ):
+        await asyncio.sleep(delaySeconds)
+      writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json;charset=utf-8\r\nContent-Length: "
+                   + str(len(payload)).encode("ascii") + (b"\r\n\r\n" if keepAlive else b"\r\nConnection: close\r\n\r\n") + payload)
+      await writer.drain()
+      if ( not keepAlive ):
+        break
+  except ( ConnectionError, asyncio.IncompleteReadError ):
+    pass
+  finally:
+    writer.close()
+
+# Returns the asyncio server, its port is server.sockets[0].getsockname()[1] (pass port 0 for any free port)
+async def startStubServer(host = "127.0.0.1", port = 8080, delayMs = 0, payloadRows = 10):
+  payload = stubPayload(payloadRows)
+  return await asyncio.start_server(lambda reader, writer: handleClient(reader, writer, delayMs / 1000, payload), host, port)
+
+async def serveForever(args):
+  server = await startStubServer(args.host, args.port, args.delay_ms, args.payload_rows)
+  print(f"Stub server listening on http://{args.host}:{server.sockets[0].getsockname()[1]}/ (Ctrl+C to stop)")
+  async with server:
+    await server.serve_forever()
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description='Offline stub HTTP server for loadTest.py.', allow_abbrev=False)
+  parser.add_argument('--host', required=False, default="127.0.0.1", metavar='e.g. --host="0.0.0.0"',
+                      help="""OPTIONAL: The address to listen on. Defaults to 127.0.0.1.""")
+  parser.add_argument('--port', required=False, type=int, default=8080, metavar='e.g. --port=8080',
+                      help="""OPTIONAL: The port to listen on. Defaults to 8080.""")
+  parser.add_argument('--delay-ms', required=False, type=float, default=0, metavar='e.g. --delay-ms=5',
+                      help="""OPTIONAL: Simulated server time added to every response, in milliseconds.""")
+  parser.add_argument('--payload-rows', required=False, type=int, default=10, metavar='e.g. --payload-rows=100',
+                      help="""OPTIONAL: How many rows the JSON payload holds. Defaults to 10.""")
+  try:
+    asyncio.run(serveForever(parser.parse_args()))
+  except KeyboardInterrupt:
+    pass
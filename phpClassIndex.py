@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+# Indexes the php classes, interfaces and traits declared in a generated extension package folder,
+# together with the path Joomla installs each file to (relative to the site root). The makers use it for the
+# OPcache preload script and the classmap, pass the package folder and where each of its top level folders goes, e.g.
+#   indexPhpClasses("./com_foo", [ ( "admin", "administrator/components/com_foo" ), ( "site", "components/com_foo" ) ])
+# Only the generated code's own simple layout is understood: one namespace statement per file, declarations at line start.
+#   ./phpClassIndex.py ./com_foo
+import os, re, sys, json
+
+commentPattern = re.compile(r"/\*.*?\*/|//[^\n]*|#[^\n\[]*", re.S)
+namespacePattern = re.compile(r"^\s*namespace\s+([\w\\]+)\s*;", re.M)
+declarationPattern = re.compile(r"^\s*(?:(?:abstract|final)\s+)*(class|interface|trait)\s+(\w+)", re.M)
+
+# Folders whose php files are never autoloaded classes (layouts and install sql)
+skippedFolderNames = ( "tmpl", "layouts", "sql", "language" )
+
+def phpDeclarations(phpSource):
+  phpSource = commentPattern.sub("", phpSource)
+  namespaceMatch = namespacePattern.search(phpSource)
+  namespace = namespaceMatch.group(1) if namespaceMatch else ""
+  return [ ( kind, f"{namespace}\\{name}" if namespace else name ) for kind, name in declarationPattern.findall(phpSource) ]
+
+# installPaths is a list of ( package folder prefix, install folder relative to the Joomla root ), "" matches the package root.
+# Files outside every prefix (e.g. an install script) are left out. Returns dicts sorted by class name.
+def indexPhpClasses(packageFolder, installPaths):
+  classIndex = []
+  for folderPath, folderNames, fileNames in os.walk(packageFolder):
+    folderNames[:] = sorted(folderName for folderName in folderNames if folderName not in skippedFolderNames)
+    for fileName in sorted(fileNames):
+      if ( not fileName.endswith(".php") ):
+        continue
+      packagePath = os.path.relpath(os.path.join(folderPath, fileName), packageFolder).replace(os.sep, "/")
+      installedPath = installedPathOf(packagePath, installPaths)
+      if ( installedPath is None ):
+        continue
+      with open(os.path.join(folderPath, fileName), "rt", encoding = "utf-8") as phpHandle:
+        declarations = phpDeclarations(phpHandle.read())
+      for kind, className in declarations:
+        classIndex.append({ "class": className, "kind": kind, "packagePath": packagePath, "installedPath": installedPath })
+  return sorted(classIndex, key = lambda entry: entry["class"])
+
+def installedPathOf(packagePath, installPaths):
+  for packagePrefix, installPrefix in installPaths:
+    if ( packagePrefix == "" ):
+      return f"{installPrefix}/{packagePath}"
+    if ( packagePath.startswith(f"{packagePrefix}/") ):
+      return f"{installPrefix}/{packagePath[len(packagePrefix) + 1:]}"
+  return None
+
+def componentInstallPaths(comFolderName):
+  return [ ( "admin", f"administrator/components/{comFolderName}" ), ( "site", f"components/{comFolderName}" ), ( "api", f"api/components/{comFolderName}" ) ]
+
+def pluginInstallPaths(pluginGroup, pluginElement):
+  return [ ( "", f"plugins/{pluginGroup}/{pluginElement}" ) ]
+
+# A php file returning [ class name => path relative to the Joomla root ] for the given index
+def renderPhpClassMap(classIndex):
+  classLines = "\n".join(f"    '{entry['class'].replace(chr(92), chr(92) * 2)}' => '{entry['installedPath']}'," for entry in classIndex)
+  return f"""<?php
+defined('_JEXEC') or die;
+
+// Generated by joomla-tools, class name => path relative to JPATH_ROOT. Regenerated with the package, do not edit by hand.
+return [
+{classLines}
+];
+"""
+
+if __name__ == "__main__":
+  if ( len(sys.argv) != 2 ):
+    print("usage: ./phpClassIndex.py <package folder>")
+    sys.exit(1)
+  print(json.dumps(indexPhpClasses(sys.argv[1], [ ( "", "." ) ]), indent = 2))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# OPcache preload script generation. The makers write a preload.json manifest (the installed php files of one
+# extension) and a preload.php compiling them, this script merges the manifests of several extensions into one
+# preload.php since php.ini takes a single opcache.preload file:
+#   ./phpPreload.py com_foo_preload/preload.json plg_bar_preload/preload.json --output=/var/www/preload.php
+# php.ini then needs opcache.preload=/var/www/preload.php and opcache.preload_user=<the php-fpm user>.
+# The files are compiled with opcache_compile_file(), nothing is executed. A class is linked (and so fully preloaded)
+# only when its parent class and interfaces are preloaded as well, the others are still kept compiled in shared memory.
+import json, argparse
+
+# Traits and interfaces first, classes using them can only be linked when they are already compiled
+kindOrder = { "trait": 0, "interface": 1, "class": 2 }
+
+def preloadManifest(extensionName, classIndex):
+  files = []
+  for entry in sorted(classIndex, key = lambda entry: ( kindOrder.get(entry["kind"], 2), entry["installedPath"] )):
+    if ( entry["installedPath"] not in files ):
+      files.append(entry["installedPath"])
+  return { "extensions": [ extensionName ], "files": files }
+
+def mergePreloadManifests(manifests):
+  merged = { "extensions": [], "files": [] }
+  for manifest in manifests:
+    merged["extensions"] += [ name for name in manifest["extensions"] if name not in merged["extensions"] ]
+    merged["files"] += [ path for path in manifest["files"] if path not in merged["files"] ]
+  return merged
+
+def renderPreloadScript(manifest):
+  fileLines = "\n".join(f"  '{path}'," for path in manifest["files"])
+  return f"""<?php
+/**
+ * OPcache preload script for {", ".join(manifest["extensions"])}, generated by joomla-tools.
+ * php.ini: opcache.preload=/path/to/preload.php and opcache.preload_user=<the php-fpm user>
+ * The Joomla root is read from the JOOMLA_ROOT environment variable, falling back to the folder of this file.
+ * Merge several extensions' preload.json with ./phpPreload.py, php.ini takes a single preload script.
+ */
+$joomlaRoot = rtrim(getenv('JOOMLA_ROOT') ?: __DIR__, '/');
+$preloadFiles = [
+{fileLines}
+];
+
+foreach ($preloadFiles as $preloadFile)
+{{
+  $preloadPath = $joomlaRoot . '/' . $preloadFile;
+  if (is_file($preloadPath))
+  {{
+    opcache_compile_file($preloadPath);
+  }}
+  else
+  {{
+    error_log('preload: ' . $preloadPath . ' not found, is JOOMLA_ROOT set?');
+  }}
+}}
+"""
+
+# Writes preload.php and preload.json into outFolder
+def writePreloadFiles(outFolder, extensionName, classIndex):
+  manifest = preloadManifest(extensionName, classIndex)
+  with open(f"{outFolder}/preload.json", "wt", encoding = "utf-8") as manifestHandle:
+    manifestHandle.write(json.dumps(manifest, indent = 2) + "\n")
+  with open(f"{outFolder}/preload.php", "wt", encoding = "utf-8") as preloadHandle:
+    preloadHandle.write(renderPreloadScript(manifest))
+  return manifest
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description='Merges the preload.json manifests written by componentMaker.py / pluginMaker.py into one OPcache preload script.', allow_abbrev=False)
+  parser.add_argument('manifests', nargs='+', metavar='preload.json', help="""The preload.json manifests to merge, in preload order.""")
+  parser.add_argument('--output', required=False, default="preload.php", metavar='e.g. --output="/var/www/preload.php"',
+                      help="""OPTIONAL: Where to write the merged preload script. Defaults to ./preload.php.""")
+  parser.add_argument('--output-manifest', required=False, metavar='e.g. --output-manifest="./preload.json"',
+                      help="""OPTIONAL: Also write the merged manifest, so it can be merged again later.""")
+  args = parser.parse_args()
+  manifests = []
+  for manifestPath in args.manifests:
+    with open(manifestPath, "rt", encoding = "utf-8") as manifestHandle:
+      manifests.append(json.load(manifestHandle))
+  mergedManifest = mergePreloadManifests(manifests)
+  with open(args.output, "wt", encoding = "utf-8") as preloadHandle:
+    preloadHandle.write(renderPreloadScript(mergedManifest))
+  if ( args.output_manifest is not None ):
+    with open(args.output_manifest, "wt", encoding = "utf-8") as manifestHandle:
+      manifestHandle.write(json.dumps(mergedManifest, indent = 2) + "\n")
+  print(f"Wrote {args.output}: {len(mergedManifest['files'])} files of {', '.join(mergedManifest['extensions'])}")
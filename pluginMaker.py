@@ -2,7 +2,13 @@
 
 # You'll need the sh library for this script to function properly.
 # pip3 install sh
-import os, sh, sys, argparse
+import os, re, sh, sys, html, json, argparse, ipaddress
+from tableSpec import TableSpec
+from seedData import writeSeedFile
+from schemaMigration import SchemaMigration
+from phpPreload import writePreloadFiles
+from phpClassIndex import indexPhpClasses, pluginInstallPaths
+from pluginTemplatePacks import renderPluginPhpFile
 
 class PluginMaker:
   def __init__(self):
@@ -64,7 +70,63 @@ Usage Example in Bash/sh/zsh:
     parser.add_argument('--plugin-version',    required=True,   metavar='e.g. --plugin-version="0.0.1"',
                         help="""The plugin's version string""")
     parser.add_argument('--plugin-meta',       required=False,  metavar='e.g. --plugin-meta="webservices-granular"',
-                        help="""OPTIONAL: A string to enable special code generation or other feature flags, currently accepted values are: webservices-granular""")
+                        help="""OPTIONAL: A string to enable special code generation or other feature flags, currently accepted values are: webservices-granular, page-cache (with --plugin-type="system")""")
+    parser.add_argument('--page-cache-include', required=False,  action='append', metavar='e.g. --page-cache-include="^/blog/"',
+                        help="""OPTIONAL: Used with --plugin-meta="page-cache". A PCRE pattern matched against the request path and query, only matching pages are cached. Repeat the flag for more patterns, every page is a candidate when none is given.""")
+    parser.add_argument('--page-cache-exclude', required=False,  action='append', metavar='e.g. --page-cache-exclude="^/cart"',
+                        help="""OPTIONAL: Used with --plugin-meta="page-cache". A PCRE pattern of pages never cached, excludes win over includes. Repeat the flag for more patterns.""")
+    parser.add_argument('--page-cache-ttl',     required=False,  type=int, default=300, metavar='e.g. --page-cache-ttl=300',
+                        help="""OPTIONAL: Used with --plugin-meta="page-cache". Seconds a cached page is served for. Defaults to 300.""")
+    parser.add_argument('--page-cache-menu-ttl', required=False, action='append', metavar='e.g. --page-cache-menu-ttl="101=3600"',
+                        help="""OPTIONAL: Used with --plugin-meta="page-cache". A menu item id = seconds override of --page-cache-ttl, 0 never caches that menu item. Repeat the flag for more menu items.""")
+    parser.add_argument('--content-marker',    required=False,  metavar='e.g. --content-marker="{gallery"',
+                        help="""OPTIONAL: Used with --plugin-type="content". The opening of the {marker attribute="value"} tags the content plugin replaces, texts without it are skipped with a single strpos(). Defaults to "{<plugin name lowercase without spaces>".""")
+    parser.add_argument('--content-cache-lifetime', required=False, type=int, default=1440, metavar='e.g. --content-cache-lifetime=1440',
+                        help="""OPTIONAL: Used with --plugin-type="content". Minutes a rendered text is kept, editing the article or the plugin params renders it again anyway. Defaults to 1440, 0 turns the render cache off.""")
+    parser.add_argument('--finder-component',  required=False,  metavar='e.g. --finder-component="com_generichelloworld"',
+                        help="""Used with --plugin-type="finder" (and then REQUIRED). The component owning the indexed table, its table name prefix and item urls (index.php?option=<component>&view=<table>&id=<pk>).""")
+    parser.add_argument('--finder-table',      required=False,  metavar='e.g. --finder-table="storage_table_1"',
+                        help="""OPTIONAL: Used with --plugin-type="finder". The --table-spec table Smart Search indexes. Defaults to the spec's first table.""")
+    parser.add_argument('--finder-title-column', required=False, metavar='e.g. --finder-title-column="name"',
+                        help="""OPTIONAL: Used with --plugin-type="finder". The column indexed as the item title, the other text columns are indexed as its body. Defaults to "title" or else "name".""")
+    parser.add_argument('--finder-modified-column', required=False, default="modified", metavar='e.g. --finder-modified-column="modified"',
+                        help="""OPTIONAL: Used with --plugin-type="finder". The (UTC) last modified column, an index run only reads rows modified since the previous one. Defaults to "modified", without it every run reads every row.""")
+    parser.add_argument('--finder-batch-size', required=False,  type=int, default=100, metavar='e.g. --finder-batch-size=100',
+                        help="""OPTIONAL: Used with --plugin-type="finder". Rows read per keyset batch (Smart Search's own batch size still caps it). Defaults to 100.""")
+    parser.add_argument('--task-queue-component', required=False, metavar='e.g. --task-queue-component="com_generichelloworld"',
+                        help="""Used with --plugin-type="task" (it or --task-partition-spec is then REQUIRED). The component whose write-behind queue table (componentMaker.py --api-write-behind-queue) the generated scheduler task drains.""")
+    parser.add_argument('--task-queue-batch-size', required=False, type=int, default=50, metavar='e.g. --task-queue-batch-size=50',
+                        help="""OPTIONAL: Used with --plugin-type="task". Jobs claimed per batch, the task keeps claiming batches until the queue is empty or its time limit is up. Defaults to 50.""")
+    parser.add_argument('--task-queue-max-attempts', required=False, type=int, default=5, metavar='e.g. --task-queue-max-attempts=5',
+                        help="""OPTIONAL: Used with --plugin-type="task". Runs of a failing job before it is marked failed for good (state 3, kept for inspection). Defaults to 5.""")
+    parser.add_argument('--task-queue-backoff', required=False, type=int, default=30, metavar='e.g. --task-queue-backoff=30',
+                        help="""OPTIONAL: Used with --plugin-type="task". Seconds before the first retry of a failed job, doubled on every further failure (capped at an hour, with jitter). Defaults to 30.""")
+    parser.add_argument('--task-queue-time-limit', required=False, type=int, default=25, metavar='e.g. --task-queue-time-limit=25',
+                        help="""OPTIONAL: Used with --plugin-type="task". Seconds one task run keeps draining, keep it under the scheduler's and php's own limits. Defaults to 25.""")
+    parser.add_argument('--task-partition-spec', required=False, metavar='e.g. --task-partition-spec="./tables.json"',
+                        help="""OPTIONAL: Used with --plugin-type="task". A table spec declaring "partitioning" for some tables, the task then gets a routine adding each table's future partitions ahead of time and dropping those past its retention.""")
+    parser.add_argument('--task-partition-table-prefix', required=False, metavar='e.g. --task-partition-table-prefix="#__generichelloworld_"',
+                        help="""OPTIONAL: Used with --task-partition-spec. The prefix the extension owning the tables puts before every spec table name. Defaults to that of --task-queue-component.""")
+    parser.add_argument('--plugin-webservices-batch-route', required=False, default=False, action='store_true',
+                        help="""OPTIONAL: Used with --plugin-type="webservices". Adds a POST v1/<component>/batch route to the BatchController generated by componentMaker.py --api-batch-controller, so clients can send many calls in one round trip.""")
+    parser.add_argument('--plugin-webservices-metrics-route', required=False, default=False, action='store_true',
+                        help="""OPTIONAL: Used with --plugin-type="webservices" (either design). Registers GET v1/<component>/metrics for the MetricsController (Prometheus text format) generated by componentMaker.py --api-metrics. Not public, the scraper sends an API token.""")
+    parser.add_argument('--plugin-webservices-rate-limit', required=False, metavar='e.g. --plugin-webservices-rate-limit="120/60"',
+                        help="""OPTIONAL: Used with --plugin-type="webservices" (either design). A token bucket rate limit of REQUESTS/SECONDS per client IP (REMOTE_ADDR), checked in onBeforeApiRoute before any controller or query runs. Over-limit requests get a 429 with a Retry-After. Buckets live in APCu, or in files under the cache folder without it. Behind a reverse proxy every client has the proxy's REMOTE_ADDR and shares one bucket, unless the proxy is passed to --plugin-webservices-rate-limit-trusted-proxy.""")
+    parser.add_argument('--plugin-webservices-rate-limit-trusted-proxy', required=False, action='append', metavar='e.g. --plugin-webservices-rate-limit-trusted-proxy="10.0.0.0/8"',
+                        help="""OPTIONAL: Used with --plugin-webservices-rate-limit. An IP or CIDR range of a reverse proxy in front of the site. When REMOTE_ADDR is one of them the client IP is read from X-Forwarded-For instead, the right-most address that is not a trusted proxy. Repeat the flag for more proxies.""")
+    parser.add_argument('--plugin-webservices-rate-limit-route', required=False, action='append', metavar='e.g. --plugin-webservices-rate-limit-route="POST v1/generichelloworld/batch=10/60"',
+                        help="""OPTIONAL: Used with --plugin-webservices-rate-limit. A "[METHOD ]path prefix=REQUESTS/SECONDS" limit of the routes whose path (after /api/index.php/) starts with the prefix, with a bucket of its own. Repeat the flag for more routes, the first matching one applies and --plugin-webservices-rate-limit covers the rest.""")
+    parser.add_argument('--plugin-template-packs', required=False, action='append', metavar='e.g. --plugin-template-packs="./myTemplatePacks"',
+                        help="""OPTIONAL: A folder of plugin template packs (<plugin type>.py files defining renderPluginPhpFile(maker, plgClassName), see pluginTemplatePacks.py) used before the bundled pluginTemplates/ ones. Repeat the flag for more folders, earlier folders win.""")
+    parser.add_argument('--plugin-subscriber', required=False,  default=False, action='store_true',
+                        help="""OPTIONAL: Generates the plugin as a Joomla 4 SubscriberInterface implementation declaring its listeners in getSubscribedEvents(), instead of a legacy plugin whose on* methods Joomla finds by reflection on every request. The task plugin is always generated this way.""")
+    parser.add_argument('--plugin-namespaced', required=False,  default=False, action='store_true',
+                        help="""OPTIONAL: Generates the namespaced Joomla 4 plugin layout: services/provider.php building the plugin through the DI container and the plugin class in src/Extension/<PluginName>.php (autoloaded from the manifest's <namespace>), instead of the legacy <plugin>.php file. Best combined with --plugin-subscriber.""")
+    parser.add_argument('--emit-load-test',    required=False,  default=False, action='store_true',
+                        help="""OPTIONAL: Used with --plugin-type="webservices". Writes loadTest.py (an asyncio load test harness reporting latency percentiles & throughput), its offline stub server and a loadTestConfig.json holding the plugin's routes into <plugin folder>_loadtest/ next to the package.""")
+    parser.add_argument('--emit-preload',      required=False,  default=False, action='store_true',
+                        help="""OPTIONAL: Writes an OPcache preload.php compiling the plugin's classes at their installed paths, with its preload.json manifest and phpPreload.py (which merges the manifests of several extensions into one preload script) into <plugin folder>_preload/ next to the package. The Joomla root is read from the JOOMLA_ROOT environment variable.""")
     parser.add_argument('--plugin-webservices-component-name',       required=False,  metavar='e.g. --plugin-webservices-component-name="com_generichelloworld"',
                         help="""CONDITIONALLY OPTIONAL: The name of the J! 4 component that will be used to handle the plugin's webservices. If --plugin-type is 'webservices', this argument is required.""")
     parser.add_argument('--initial-view-name', required=False,  metavar='e.g. --initial-view-name="CanPluginsEvenHaveViews"',
@@ -73,6 +135,22 @@ Usage Example in Bash/sh/zsh:
                         help="""OPTIONAL: If the user supplies either a single name or a list of comma separated names. This option creates folders from those names and updates the manifest file accordingly.""")
     parser.add_argument('--add-sql-support',   required=False,  default=False, action='store_true',
                         help="""OPTIONAL: This is a flag that if passed as --add-sql-support will create an sql directory with standard install/uninstall/update sql files and manifest xml hooks.""")
+    parser.add_argument('--table-spec',        required=False,  metavar='e.g. --table-spec="./tables.json"',
+                        help="""OPTIONAL: Used with --add-sql-support. Path to a JSON table schema spec (see tableSpec.py) declaring the plugin's tables, their columns and the lookups (equality, range, ordering) the plugin performs. The install SQL then gets matching composite/covering indexes and the spec is linted for lookups without a supporting index. Defaults to the illustrative storage_table_1.""")
+    parser.add_argument('--table-spec-previous', required=False, metavar='e.g. --table-spec-previous="./tables-1.0.0.json"',
+                        help="""OPTIONAL: Used with --add-sql-support. Path to the table spec the previous plugin version was generated from. The update SQL is then generated from the diff of the two specs as online-safe ALTERs (explicit ALGORITHM/LOCK, changes which copy the table or block writes are marked with a WARNING) instead of the illustrative ALTER.""")
+    parser.add_argument('--seed-rows',         required=False,  type=int, metavar='e.g. --seed-rows=10000000',
+                        help="""OPTIONAL: Used with --add-sql-support. Writes a bulk seed SQL file of this many synthetic rows (following the "seed" distributions of the table spec columns) into <plugin folder>_seed/ next to the package, for load testing. Mutually exclusive with --seed-csv.""")
+    parser.add_argument('--seed-csv',          required=False,  metavar='e.g. --seed-csv="./rows.csv"',
+                        help="""OPTIONAL: Like --seed-rows but streams the rows from a CSV file whose header row names the columns.""")
+    parser.add_argument('--seed-table',        required=False,  metavar='e.g. --seed-table="storage_table_1"',
+                        help="""OPTIONAL: The table spec table to seed. Defaults to the first table.""")
+    parser.add_argument('--seed-max-allowed-packet', required=False, type=int, default=4194304, metavar='e.g. --seed-max-allowed-packet=67108864',
+                        help="""OPTIONAL: The target server's max_allowed_packet in bytes, no seed INSERT will exceed it. Defaults to 4194304 (4MB).""")
+    parser.add_argument('--seed-defer-indexes', required=False, default=False, action='store_true',
+                        help="""OPTIONAL: Drop the seeded table's secondary indexes before loading and rebuild them once afterwards.""")
+    parser.add_argument('--seed-db-prefix',    required=False,  default="#__", metavar='e.g. --seed-db-prefix="jos_"',
+                        help="""OPTIONAL: The database table prefix written into the seed file. Defaults to #__, pass your site's real prefix when loading the file with the mysql client.""")
     # The following commented out declarations are for illustration purposes.
     # parser.add_argument('-a', '--author-name',      required=True, help="""The code author's name""")
     # positional arg declaration parser.add_argument('foo', metavar='N', type=int, nargs='+', help='an integer for the accumulator')
@@ -93,6 +171,15 @@ Usage Example in Bash/sh/zsh:
     else:
       self.plgType = self.args.plugin_type_custom
 
+    # Our own template packs, searched before the bundled ones (--plugin-template-packs)
+    self.templatePackFolders = self.args.plugin_template_packs or []
+    for templatePackFolder in self.templatePackFolders:
+      if ( not os.path.isdir(templatePackFolder) ):
+        raise Exception(f"""--plugin-template-packs "{templatePackFolder}" is not a folder.""")
+
+    # Listeners declared in getSubscribedEvents() instead of discovered by reflection (--plugin-subscriber)
+    self.plgSubscriber = self.args.plugin_subscriber
+
     # Add plugin meta flag if set
     if ( self.args.plugin_meta is not None ):
       self.plgMeta = self.args.plugin_meta
@@ -112,6 +199,89 @@ Would result in the value: "com_generichelloworld" being passed to --plugin-webs
 e.g. --plugin-type="webservices" --plugin-webservices-component-name="com_generichelloworld"\n """)
 
 
+    # Route to the component's BatchController (componentMaker.py --api-batch-controller)
+    self.plgWebSvcBatchRoute = self.args.plugin_webservices_batch_route
+    if ( self.plgWebSvcBatchRoute and self.plgType != "webservices" ):
+      raise Exception("""--plugin-webservices-batch-route was provided but --plugin-type is not 'webservices'.""")
+    self.plgWebSvcMetricsRoute = self.args.plugin_webservices_metrics_route
+    if ( self.plgWebSvcMetricsRoute and self.plgType != "webservices" ):
+      raise Exception("""--plugin-webservices-metrics-route was provided but --plugin-type is not 'webservices'.""")
+
+    # Token bucket rate limits checked in onBeforeApiRoute, ( method or "*", path prefix, bucket size, refill seconds ), the catch-all last
+    self.rateLimitRules = None
+    self.rateLimitTrustedProxies = []
+    if ( self.args.plugin_webservices_rate_limit is not None ):
+      if ( self.plgType != "webservices" ):
+        raise Exception("""--plugin-webservices-rate-limit was provided but --plugin-type is not 'webservices'.""")
+      self.rateLimitRules = []
+      for routeLimit in self.args.plugin_webservices_rate_limit_route or []:
+        routeMatch = re.fullmatch(r"\s*(?:(GET|POST|PUT|PATCH|DELETE)\s+)?/?([\w./-]*)\s*=\s*(.+)", routeLimit, re.I)
+        if ( routeMatch is None ):
+          raise Exception(f"""--plugin-webservices-rate-limit-route takes "[METHOD ]path prefix=REQUESTS/SECONDS" e.g. "POST v1/generichelloworld/batch=10/60", "{routeLimit}" is not one.""")
+        self.rateLimitRules.append(( (routeMatch.group(1) or "*").upper(), routeMatch.group(2) ) + self.parseRateLimit(routeMatch.group(3)))
+      self.rateLimitRules.append(( "*", "" ) + self.parseRateLimit(self.args.plugin_webservices_rate_limit))
+      for trustedProxy in self.args.plugin_webservices_rate_limit_trusted_proxy or []:
+        try:
+          ipaddress.ip_network(trustedProxy.strip(), strict = False)
+        except ValueError:
+          raise Exception(f"""--plugin-webservices-rate-limit-trusted-proxy takes an IP or a CIDR range e.g. "10.0.0.0/8", "{trustedProxy}" is not one.""")
+      self.rateLimitTrustedProxies = [ trustedProxy.strip() for trustedProxy in self.args.plugin_webservices_rate_limit_trusted_proxy or [] ]
+    elif ( self.args.plugin_webservices_rate_limit_route is not None ):
+      raise Exception("""--plugin-webservices-rate-limit-route limits single routes beyond the catch-all limit, please also pass --plugin-webservices-rate-limit.""")
+    elif ( self.args.plugin_webservices_rate_limit_trusted_proxy is not None ):
+      raise Exception("""--plugin-webservices-rate-limit-trusted-proxy picks the client IP of the rate limiter, please also pass --plugin-webservices-rate-limit.""")
+
+
+    # Guest full page cache rules (--plugin-meta="page-cache"), rendered as the plugin's default params
+    self.pageCacheRules = None
+    if ( self.plgMeta == "page-cache" ):
+      if ( self.plgType != "system" ):
+        raise Exception("""--plugin-meta="page-cache" generates a system plugin, please use it with --plugin-type="system".""")
+      if ( self.args.page_cache_ttl < 0 ):
+        raise Exception("""--page-cache-ttl must be 0 or more seconds.""")
+      menuTtls = []
+      for menuTtl in self.args.page_cache_menu_ttl or []:
+        menuItemId, _, seconds = menuTtl.partition("=")
+        if ( not menuItemId.strip().isdigit() or not seconds.strip().isdigit() ):
+          raise Exception(f"""--page-cache-menu-ttl takes <menu item id>=<seconds> e.g. "101=3600", "{menuTtl}" is not one.""")
+        menuTtls.append(( int(menuItemId), int(seconds) ))
+      for pattern in ( self.args.page_cache_include or [] ) + ( self.args.page_cache_exclude or [] ):
+        try:
+          re.compile(pattern)
+        except re.error as patternError:
+          print(f"WARNING: the page cache pattern {pattern!r} does not compile as a regular expression ({patternError}), PHP will reject it too.")
+      self.pageCacheRules = { "include": self.args.page_cache_include or [], "exclude": self.args.page_cache_exclude or [],
+                              "ttl": self.args.page_cache_ttl, "menuTtls": menuTtls }
+    elif ( any(( self.args.page_cache_include, self.args.page_cache_exclude, self.args.page_cache_menu_ttl )) ):
+      raise Exception("""The --page-cache-* rules configure the page cache plugin, please also pass --plugin-type="system" --plugin-meta="page-cache".""")
+
+    # Write-behind queue consumer (--plugin-type="task"), rendered as the task's default params
+    self.taskQueueRules = None
+    self.taskPartitionRules = None
+    if ( self.plgType == "task" and self.args.task_partition_spec is not None ):
+      if ( self.args.task_partition_table_prefix is None and self.args.task_queue_component is None ):
+        raise Exception("""--task-partition-spec needs the prefix of its tables, please pass e.g. --task-partition-table-prefix="#__generichelloworld_".""")
+      partitionTablePrefix = self.args.task_partition_table_prefix or f"#__{self.args.task_queue_component.lower()[len('com_'):]}_"
+      partitionSpec = TableSpec.fromFile(self.args.task_partition_spec)
+      if ( len(partitionSpec.partitionedTables()) == 0 ):
+        raise Exception(f"""No table of {self.args.task_partition_spec} declares "partitioning", there are no partitions to maintain.""")
+      self.taskPartitionRules = [ dict(table["partitioning"], table = f"{partitionTablePrefix}{table['name']}") for table in partitionSpec.partitionedTables() ]
+    elif ( self.args.task_partition_spec is not None or self.args.task_partition_table_prefix is not None ):
+      raise Exception("""--task-partition-spec configures the partition maintenance routine of the task plugin, please pass it with --plugin-type="task".""")
+    if ( self.plgType == "task" and ( self.args.task_queue_component is not None or self.taskPartitionRules is None ) ):
+      if ( self.args.task_queue_component is None or not self.args.task_queue_component.lower().startswith("com_") ):
+        raise Exception("""--plugin-type="task" generates the scheduler task draining a component's write-behind queue, please pass the component e.g. --task-queue-component="com_generichelloworld" (generated with componentMaker.py --api-write-behind-queue), or a --task-partition-spec to maintain.""")
+      for flagName in ( "batch_size", "max_attempts", "backoff", "time_limit" ):
+        if ( getattr(self.args, f"task_queue_{flagName}") < 1 ):
+          raise Exception(f"""--task-queue-{flagName.replace("_", "-")} must be 1 or more.""")
+      self.taskQueueRules = { "table": f"#__{self.args.task_queue_component.lower()[len('com_'):]}_queue", "batchSize": self.args.task_queue_batch_size,
+                              "maxAttempts": self.args.task_queue_max_attempts, "backoff": self.args.task_queue_backoff, "timeLimit": self.args.task_queue_time_limit }
+    elif ( self.args.task_queue_component is not None ):
+      raise Exception("""--task-queue-component configures the write-behind queue task plugin, please also pass --plugin-type="task".""")
+
+    if ( self.args.emit_load_test and self.plgType != "webservices" ):
+      raise Exception("""--emit-load-test load tests the webservices routes of the plugin, please use it with --plugin-type="webservices".""")
+
     # Plugin specific global details
     self.plgName = self.args.plugin_name
     self.plgNameJoomla = self.plgName.lower().replace(" ","")
@@ -120,6 +290,29 @@ e.g. --plugin-type="webservices" --plugin-webservices-component-name="com_generi
     self.plgManifestNameField = f"plg_{self.plgType}_{self.plgNameJoomla}"
     self.plgDesc = self.args.plugin_desc
 
+    # Namespaced plugin layout (--plugin-namespaced): <vendor>\Plugin\<Type>\<Name>\Extension\<Name> built by services/provider.php
+    self.plgNamespaced = self.args.plugin_namespaced
+    self.plgTypeInNamespaces = "".join(part.capitalize() for part in re.split(r"[-_]", self.plgType))
+
+    # Content plugin trigger marker & render cache (--plugin-type="content"), rendered as the plugin's default params
+    self.contentRules = None
+    if ( self.plgType == "content" ):
+      contentMarker = self.args.content_marker if self.args.content_marker is not None else f"{{{self.plgNameJoomla}"
+      if ( not re.fullmatch(r"\{[\w-]+", contentMarker) ):
+        raise Exception(f"""--content-marker is the opening of a {{marker attribute="value"}} tag e.g. "{{gallery", "{contentMarker}" is not one.""")
+      if ( self.args.content_cache_lifetime < 0 ):
+        raise Exception("""--content-cache-lifetime must be 0 or more minutes.""")
+      self.contentRules = { "marker": contentMarker, "cacheLifetime": self.args.content_cache_lifetime }
+    elif ( self.args.content_marker is not None ):
+      raise Exception("""--content-marker configures the content plugin, please also pass --plugin-type="content".""")
+
+    # Smart Search indexer adapter of a --table-spec table (--plugin-type="finder")
+    self.finderRules = None
+    if ( self.plgType == "finder" ):
+      self.finderRules = self.prepareFinderRules()
+    elif ( self.args.finder_component is not None or self.args.finder_table is not None ):
+      raise Exception("""--finder-component and --finder-table configure the Smart Search indexer plugin, please also pass --plugin-type="finder".""")
+
 
     # This pertains to the php namespace configuration
     self.vendorName = self.args.vendor_name
@@ -164,6 +357,14 @@ e.g. --plugin-type="webservices" --plugin-webservices-component-name="com_generi
       self.sqlUpdateFilename = f"{self.plgVersion}.sql"
       # This is simply the first table's name for illustrative purposes
       self.initialTableName = f"{self.plgManifestNameField}_storage_table_1"
+      # Every table is prefixed with the plugin's manifest name, a table spec (if given) replaces the illustrative table
+      self.tablePrefix = f"#__{self.plgManifestNameField}_"
+      self.tableSpec = TableSpec.fromFile(self.args.table_spec) if self.args.table_spec is not None else TableSpec.default("storage_table_1")
+      self.tableSpec.printLintWarnings()
+      self.schemaMigration = None
+      if ( self.args.table_spec_previous is not None ):
+        self.schemaMigration = SchemaMigration(TableSpec.fromFile(self.args.table_spec_previous), self.tableSpec, self.tablePrefix)
+        self.schemaMigration.printWarnings()
       self.sqlDirPath = f"{self.plgPackageBaseFolder}/{self.sqlDirName}"
       self.sqlDirNameManifestPartial = f"<folder>{self.sqlDirName}</folder>"
       self.sqlHooksInManifestPartial = f"""
@@ -186,6 +387,7 @@ e.g. --plugin-type="webservices" --plugin-webservices-component-name="com_generi
       self.setupSqlInstallFile()
       self.setupSqlUninstallFile()
       self.setupSqlUpdateFile()
+      self.setupSeedDataFile()
     else:
       self.sqlDirNameManifestPartial = ""
       self.sqlHooksInManifestPartial = ""
@@ -270,139 +472,307 @@ e.g. --plugin-type="webservices" --plugin-webservices-component-name="com_generi
     # Create the base plugin folder
     self.createFile(assetType = "d", targetPath = self.plgPackageBaseFolder)
 
-  # This method handles preparation of the MANY types of plugin php files' contents
-  # For now we'll stick to handling the webservices type, but build handling logic to
-  # dynamically substitute plugin file contents when other types are introduced.
+  # The plugin php file comes from the template pack of the plugin type, only that pack is imported (see pluginTemplatePacks.py)
   def preparePluginPhpFileContents(self):
-    pluginPhpFileContents = ""
     plgClassName = f"Plg{self.plgType.capitalize()}{self.plgNameJoomla.capitalize()}"
-    # Handle templates for core types.
-    if ( self.args.plugin_type is not None ):
-      print(self.plgType)
-
-      # Start IF/ELIF cascade to handle template string for each core type and meta variant if applicable.
-      # Note: This method MUST `return pluginPhpFileContents` after each if/elif in order to function properly
-      if ( self.plgType == "webservices" and self.plgMeta != "webservices-granular" ):
-        pluginPhpFileContents = rf"""
-        <?php
-defined('_JEXEC') or die;
-
-use Joomla\CMS\Plugin\CMSPlugin;
-use Joomla\CMS\Router\ApiRouter;
-
-class {plgClassName} extends CMSPlugin
-{{
-	protected $autoloadLanguage = true;
-	public function onBeforeApiRoute(&$router)
-	{{
-		$router->createCRUDRoutes(
-			'v1/<endpointString>', /* An arbitrary route endpoint string */
-			'<ControllerName>', /* The controller file's <CONTROLLER_NAME> segment in <SITEROOT>/api/components/{self.plgWebSvcComName}/src/controller/<CONTROLLER_NAME>Controller.php */
-			['component' => '{self.plgWebSvcComName}']
-		);
-		$router->createCRUDRoutes(
-			'v1/<endpointString>/categories',
-			'categories',
-			['component' => 'com_categories', 'extension' => '{self.plgWebSvcComName}']
-		);
-	}}
-}}
-        """[9:]
-        return pluginPhpFileContents
-
-      elif ( self.plgType == "webservices" and self.plgMeta == "webservices-granular" ):
-        print("Executing case 2 (granular Joomla webservices)")
-        pluginPhpFileContents = rf"""
-        <?php
-defined('_JEXEC') or die;
-use Joomla\CMS\Plugin\CMSPlugin;
-use Joomla\Router\Route;
-use Joomla\CMS\Log\Log;
-
-class {plgClassName} extends CMSPlugin
-{{
-  protected $autoloadLanguage = true;
-
-  public function onBeforeApiRoute(&$router)
-  {{
-    // A nice granular way to do it.
-    // new Route(['HTTP_METHOD'],  'arbitrary/pattern/string',                     '<CONTROLLER_NAME>.<PUBLIC_METHOD_NAME>',               [], $defaults)
-    // Obviously substitute the COMPONENTNAME (lowercase no spaces), <CONTROLLER_NAME> as lowercase, & PUBLIC_METHOD_NAME as camelcase.
-    // controllers are to be placed in [site_root]/api/components/{self.plgWebSvcComName}/src/Controllers/<CONTROLLER_NAME>Controller.php
-
-    // An 'Airport' component is assumed for the purposes of illustration, please modify this file to match your actual controller class names.
-    // So the 'hangars' controller below would in fact be located at:  [site_root]/api/components/{self.plgWebSvcComName}/src/Controllers/HangarsController.php
-    // inside of it would be a public method called getHangarsByAirline() etc
-
-    // An obvious example for ease of comprehension
-    $defaults    = array_merge(['public' => false], ['component' => '{self.plgWebSvcComName}']);
-    $routes = [
-      /* My Useful GET routes */
-      new Route(['GET'],   'v1/airport/hangars/by/airline/:airLineName',     'hangars.getHangarsByAirline',                ['airLineName'    => '(filter.+validation.+regex)'], $defaults),
-      /* No filtration regex allows ALL patterns to pass through into Jinput on the controller side. */
-      new Route(['GET'],  'v1/airport/hangar/by/id/:id',                          'hangars.getHangarById',                 ['id' => '(\d{{1,9}})'], $defaults),
-      /* No filtration regex allows ALL patterns to pass through into Jinput on the controller side. */
-      new Route(['GET'],  'v1/airport/lounges/by/airline/:airLineName',    'lounges.getLoungesByAirline',           [], $defaults),
-      /* My Useful POST routes */
+    if ( self.plgNamespaced ):
+      plgClassName = self.plgNameInNamespaces
+    return renderPluginPhpFile(self, self.plgType, plgClassName, self.templatePackFolders)
+
+  # --plugin-subscriber: the plugin implements SubscriberInterface, Joomla registers the listeners of getSubscribedEvents()
+  # instead of reflecting over every public method of the plugin class on each request. The partials below are empty
+  # (or the legacy signature) without it.
+  def subscriberUsePartial(self, usesEvent = True):
+    if ( not self.plgSubscriber ):
+      return ""
+    return ( "\nuse Joomla\\Event\\Event;" if usesEvent else "" ) + "\nuse Joomla\\Event\\SubscriberInterface;"
+
+  def subscriberImplementsPartial(self):
+    return " implements SubscriberInterface" if self.plgSubscriber else ""
+
+  def subscribedEventsPartial(self, eventMap, indent, comment = None, blankLineAfter = False):
+    if ( not self.plgSubscriber ):
+      return ""
+    nameWidth = max(( len(eventName) + 2 for eventName in eventMap ), default = 0)
+    eventLines = "".join(f"\n{indent * 3}{repr(eventName).ljust(nameWidth)} => {repr(methodName)}," for eventName, methodName in eventMap.items())
+    commentLine = f"\n{indent * 2}// {comment}" if comment else ""
+    return f"""
+
+{indent}public static function getSubscribedEvents(): array
+{indent}{{{commentLine}
+{indent * 2}return [{eventLines}{f"{chr(10)}{indent * 2}" if eventLines else ""}];
+{indent}}}""" + ( "\n" if blankLineAfter else "" )
+
+  # "REQUESTS/SECONDS" -> ( bucket size, seconds to refill it )
+  def parseRateLimit(self, rateLimit):
+    limitMatch = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", rateLimit)
+    if ( limitMatch is None or int(limitMatch.group(1)) < 1 or int(limitMatch.group(2)) < 1 ):
+      raise Exception(f"""A rate limit is REQUESTS/SECONDS, both 1 or more e.g. "120/60", "{rateLimit}" is not one.""")
+    return ( int(limitMatch.group(1)), int(limitMatch.group(2)) )
+
+  # A listener's signature and opening brace, with --plugin-subscriber it takes the Event and unpacks its arguments
+  # (positional in Joomla 4, array_values() keeps it working with the named arguments of the Joomla 5 event classes)
+  def listenerSignature(self, methodName, legacyParams, eventArguments, indent, returnType = ""):
+    if ( not self.plgSubscriber ):
+      return f"public function {methodName}({legacyParams}){returnType}\n{indent}{{"
+    unpackLine = f"\n{indent * 2}[{', '.join(eventArguments)}] = array_values($event->getArguments());" if eventArguments else ""
+    return f"public function {methodName}(Event $event){returnType}\n{indent}{{{unpackLine}"
+
+  # The indexed table, its key, title, body and modified columns as resolved from the table spec and the --finder-* flags
+  def prepareFinderRules(self):
+    if ( self.args.finder_component is None or not self.args.finder_component.lower().startswith("com_") ):
+      raise Exception("""--plugin-type="finder" indexes a component's table, please pass the component e.g. --finder-component="com_generichelloworld" (and its --table-spec).""")
+    if ( self.args.finder_batch_size < 1 ):
+      raise Exception("""--finder-batch-size must be 1 or more.""")
+    finderComponent = self.args.finder_component.lower()
+    finderSpec = TableSpec.fromFile(self.args.table_spec) if self.args.table_spec is not None else TableSpec.default("storage_table_1")
+    finderTables = [ table for table in finderSpec.tables if self.args.finder_table is None or table["name"] == self.args.finder_table ]
+    if ( len(finderTables) == 0 ):
+      raise Exception(f"""--finder-table "{self.args.finder_table}" is not a table of the table spec {finderSpec.source}.""")
+    finderTable = finderTables[0]
+    columnNames = [ column["name"] for column in finderTable["columns"] ]
+    if ( len(finderTable["primaryKey"]) != 1 or not finderSpec.isIntegerColumn(finderSpec.column(finderTable, finderTable["primaryKey"][0])) ):
+      raise Exception(f"""Table "{finderTable['name']}" needs a single integer primary key column, the indexer pages through it with keyset queries.""")
+    keyColumn = finderTable["primaryKey"][0]
+    titleColumn = self.args.finder_title_column or next(( name for name in ( "title", "name" ) if name in columnNames ), None)
+    if ( titleColumn not in columnNames ):
+      raise Exception(f"""Table "{finderTable['name']}" has no {'"' + titleColumn + '"' if titleColumn else "title or name"} column, please pass the column indexed as the title with --finder-title-column.""")
+    modifiedColumn = self.args.finder_modified_column if self.args.finder_modified_column in columnNames else None
+    if ( modifiedColumn is None ):
+      print(f"WARNING: table {finderTable['name']} has no {self.args.finder_modified_column} column, every Smart Search index run will read every row (unchanged rows are still not re-indexed).")
+    textTypes = ( "CHAR", "VARCHAR", "TINYTEXT", "TEXT", "MEDIUMTEXT", "LONGTEXT" )
+    bodyColumns = [ column["name"] for column in finderTable["columns"]
+                    if column["type"].split("(")[0].strip() in textTypes and column["name"] not in ( keyColumn, titleColumn, modifiedColumn ) ]
+    return { "component": finderComponent, "table": f"#__{finderComponent[len('com_'):]}_{finderTable['name']}", "view": finderTable["name"].lower(),
+             "typeTitle": finderSpec.tableClassName(finderTable), "keyColumn": keyColumn, "titleColumn": titleColumn,
+             "bodyColumns": bodyColumns, "modifiedColumn": modifiedColumn, "batchSize": self.args.finder_batch_size }
+
+  # The granular webservices route table as data, rendered into the plugin and into the load test config (--emit-load-test)
+  def webSvcGranularRoutes(self):
+    webSvcRoutes = [
+      { "comment": "/* My Useful GET routes */",
+        "methods": [ "GET" ], "pattern": "v1/airport/hangars/by/airline/:airLineName", "handler": "hangars.getHangarsByAirline", "rules": { "airLineName": "(filter.+validation.+regex)" } },
+      { "comment": "/* No filtration regex allows ALL patterns to pass through into Jinput on the controller side. */",
+        "methods": [ "GET" ], "pattern": "v1/airport/hangar/by/id/:id", "handler": "hangars.getHangarById", "rules": { "id": r"(\d{1,9})" } },
+      { "comment": "/* No filtration regex allows ALL patterns to pass through into Jinput on the controller side. */",
+        "methods": [ "GET" ], "pattern": "v1/airport/lounges/by/airline/:airLineName", "handler": "lounges.getLoungesByAirline", "rules": {} },
+      { "comment": """/* My Useful POST routes */
       /*
       * If no url parameter is specified then no checking is necessary!
       * Note: same rules apply as for GET routes above if you DID want to have parameters).
       *
       * In the POST example below you need to grab the POST body via: $req = json_decode( $this->input->json->getRaw() ); on the controller side
       * If you want an associative array use: $req = json_decode( $this->input->json->getRaw(), true ); on the controller side
-      */
-      new Route(['POST'],  'v1/airport/purchase/ticket',                     'tickets.purchaseTicket',               [], $defaults)
-    ];
-    // Finally, register all specified routes with Joomla's webservices router.
-    $router->addRoutes($routes);
-  }}
-}}
-        """[9:]
-        return pluginPhpFileContents
-
-      elif ( self.plgType == "user" ):
-        pluginPhpFileContents = f"""
-        <?php
-defined('_JEXEC') or die;
+      */""",
+        "methods": [ "POST" ], "pattern": "v1/airport/purchase/ticket", "handler": "tickets.purchaseTicket", "rules": {} },
+    ]
+    if ( self.plgWebSvcBatchRoute ):
+      webSvcRoutes.append({ "comment": "/* Many controller.method calls in one round trip, see dispatchBatch() in the component's BatchController */",
+                            "methods": [ "POST" ], "pattern": f"v1/{self.plgWebSvcComName.replace('com_', '', 1)}/batch", "handler": "batch.dispatchBatch", "rules": {} })
+    if ( self.plgWebSvcMetricsRoute ):
+      webSvcRoutes.append({ "comment": "/* Per route request, error & latency counters in the Prometheus text format, see the component's MetricsController */",
+                            "methods": [ "GET" ], "pattern": f"v1/{self.plgWebSvcComName.replace('com_', '', 1)}/metrics", "handler": "metrics.prometheus", "rules": {} })
+    return webSvcRoutes
+
+  def renderWebSvcGranularRoutes(self, webSvcRoutes):
+    routeLines = []
+    for idx, route in enumerate(webSvcRoutes):
+      methods = "[" + ", ".join(f"'{method}'" for method in route["methods"]) + "],"
+      rules = "[" + ", ".join(f"'{name}' => '{rule}'" for name, rule in route["rules"].items()) + "]"
+      if ( route.get("comment") ):
+        routeLines.append(f"      {route['comment']}")
+      routeLines.append(f"      new Route({methods:<10} {repr(route['pattern']) + ',':<52} {repr(route['handler']) + ',':<42} {rules}, $defaults)" + ("," if idx < len(webSvcRoutes) - 1 else ""))
+    return "\n".join(routeLines)
+
+  # The routes the plugin registers, as loadTest.py routes (paths under the api application, url parameters templated)
+  def webSvcLoadTestRoutes(self):
+    loadTestRoutes = []
+    if ( self.plgMeta == "webservices-granular" ):
+      for route in self.webSvcGranularRoutes():
+        if ( route["handler"] == "metrics.prometheus" ):
+          continue
+        path = "/api/index.php/" + route["pattern"]
+        for name, rule in route["rules"].items():
+          path = path.replace(f":{name}", "{{randInt:1:1000}}" if "\\d" in rule else "{{randStr:8}}")
+        path = re.sub(r"(?<=/):(\w+)", "{{randStr:8}}", path)
+        for method in route["methods"]:
+          loadTestRoutes.append({ "name": route["handler"], "method": method, "path": path, "weight": 1, "body": {} if method in ( "POST", "PUT", "PATCH" ) else None })
+    else:
+      loadTestRoutes += [
+        { "name": "<ControllerName>.displayList", "method": "GET", "path": "/api/index.php/v1/<endpointString>", "weight": 3, "body": None },
+        { "name": "<ControllerName>.displayItem", "method": "GET", "path": "/api/index.php/v1/<endpointString>/{{randInt:1:1000}}", "weight": 3, "body": None },
+        { "name": "categories.displayList", "method": "GET", "path": "/api/index.php/v1/<endpointString>/categories", "weight": 1, "body": None },
+      ]
+      if ( self.plgWebSvcBatchRoute ):
+        loadTestRoutes.append({ "name": "batch.dispatchBatch", "method": "POST", "path": f"/api/index.php/v1/{self.plgWebSvcComName.replace('com_', '', 1)}/batch", "weight": 1, "body": None })
+    for route in loadTestRoutes:
+      if ( route["name"] == "batch.dispatchBatch" ):
+        route["body"] = { "requests": [ { "id": "1", "controller": "<controller>", "method": "<method>", "params": {} } ] }
+    return loadTestRoutes
+
+  # Copy loadTest.py & its stub server next to the plugin together with a loadTestConfig.json of the plugin's routes
+  def setupLoadTestFolder(self):
+    if ( not self.args.emit_load_test ):
+      return
+    loadTestFolder = f"{self.currDir}/{self.plgFolderName}_loadtest"
+    self.createFile(assetType = "d", targetPath = loadTestFolder)
+    toolsFolder = os.path.dirname(os.path.realpath(__file__))
+    for scriptName in ( "loadTest.py", "loadTestStubServer.py" ):
+      with open(f"{toolsFolder}/{scriptName}", "rt") as scriptHandle:
+        self.createFile(assetType = "f", targetPath = f"{loadTestFolder}/{scriptName}", fileContents = scriptHandle.read())
+    loadTestConfig = { "baseUrl": "http://localhost", "headers": { "X-Joomla-Token": "<api token>" },
+                       "concurrency": 10, "durationSeconds": 30, "timeoutSeconds": 10, "routes": self.webSvcLoadTestRoutes() }
+    self.createFile(assetType = "f", targetPath = f"{loadTestFolder}/loadTestConfig.json", fileContents = json.dumps(loadTestConfig, indent = 2) + "\n")
+
+  # Write the OPcache preload script of the plugin's classes (and the tool merging it with other extensions') next to the package
+  def setupPreloadFolder(self):
+    if ( not self.args.emit_preload ):
+      return
+    preloadFolder = f"{self.currDir}/{self.plgFolderName}_preload"
+    self.createFile(assetType = "d", targetPath = preloadFolder)
+    classIndex = indexPhpClasses(self.plgPackageBaseFolder, pluginInstallPaths(self.plgType, self.plgNameJoomla))
+    preloadManifest = writePreloadFiles(preloadFolder, self.plgManifestNameField, classIndex)
+    toolsFolder = os.path.dirname(os.path.realpath(__file__))
+    with open(f"{toolsFolder}/phpPreload.py", "rt") as scriptHandle:
+      self.createFile(assetType = "f", targetPath = f"{preloadFolder}/phpPreload.py", fileContents = scriptHandle.read())
+    print(f"Wrote {preloadFolder}/preload.php preloading {len(preloadManifest['files'])} files")
 
-use Joomla\CMS\Plugin\CMSPlugin;
-class {plgClassName} extends CMSPlugin
-{{
-	protected $autoloadLanguage = true;
-  public function PLEASE_IMPLEMENT_ME()
-  {{
-    // Please implement whatever is found inside plugin of type '{self.plgType}';
-  }}
-}}
-        """[9:]
-        return pluginPhpFileContents
+  def setupPluginPhpFile(self):
+    if ( self.plgNamespaced ):
+      self.setupNamespacedPluginPhpFiles()
+      return
+    # Create the plugin php file container
+    pluginPhpFile = f"{self.plgPackageBaseFolder}/{self.plgNameJoomla}.php"
+    self.createFile( assetType = "f", targetPath = pluginPhpFile, fileContents = self.preparePluginPhpFileContents() )
 
-    if ( self.args.plugin_type_custom is not None ):
-      pluginPhpFileContents = f"""
-      <?php
+  def pluginNamespace(self):
+    return f"{self.vendorName}\\Plugin\\{self.plgTypeInNamespaces}\\{self.plgNameInNamespaces}"
+
+  # The plugin class moves to src/Extension/<Name>.php under the plugin's namespace (which has to be the file's first
+  # statement, so the _JEXEC check follows it) and services/provider.php builds it. Joomla includes the provider when
+  # the plugin's group is imported, the class file is only autoloaded once the container's factory closure runs.
+  def setupNamespacedPluginPhpFiles(self):
+    self.createFile(assetType = "d", targetPath = f"{self.plgPackageBaseFolder}/services")
+    self.createFile(assetType = "d", targetPath = f"{self.plgPackageBaseFolder}/src")
+    self.createFile(assetType = "d", targetPath = f"{self.plgPackageBaseFolder}/src/Extension")
+    extensionPhpFileContents = ( self.preparePluginPhpFileContents() or "" ).replace("<?php\ndefined('_JEXEC') or die;\n", f"""<?php
+namespace {self.pluginNamespace()}\\Extension;
+
+\\defined('_JEXEC') or die;
+""", 1)
+    self.createFile(assetType = "f", targetPath = f"{self.plgPackageBaseFolder}/src/Extension/{self.plgNameInNamespaces}.php", fileContents = extensionPhpFileContents)
+    #################################### START Plugin services provider.php ###################################
+    servicesProviderPhpFileContents = f"""
+    <?php
 defined('_JEXEC') or die;
 
-use Joomla\CMS\Plugin\CMSPlugin;
-class {plgClassName} extends CMSPlugin
+use Joomla\CMS\Extension\PluginInterface;
+use Joomla\CMS\Factory;
+use Joomla\CMS\Plugin\PluginHelper;
+use Joomla\DI\Container;
+use Joomla\DI\ServiceProviderInterface;
+use Joomla\Event\DispatcherInterface;
+use {self.pluginNamespace()}\\Extension\\{self.plgNameInNamespaces};
+
+return new class implements ServiceProviderInterface
 {{
-	protected $autoloadLanguage = true;
-  public function PLEASE_IMPLEMENT_ME()
+  public function register(Container $container): void
   {{
-    // Please implement whatever is found inside plugin of type '{self.plgType}';
+    // Only a factory is registered here, the plugin (and anything it loads) is built when Joomla asks the container for it
+    $container->set(
+      PluginInterface::class,
+      function (Container $container)
+      {{
+        $plugin = new {self.plgNameInNamespaces}(
+          $container->get(DispatcherInterface::class),
+          (array) PluginHelper::getPlugin('{self.plgType}', '{self.plgNameJoomla}')
+        );
+        $plugin->setApplication(Factory::getApplication());
+
+        return $plugin;
+      }}
+    );
   }}
-}}
-        """[7:]
-      return pluginPhpFileContents
+}};
+    """[5:]
+    ##################################### END Plugin services provider.php ####################################
+    self.createFile(assetType = "f", targetPath = f"{self.plgPackageBaseFolder}/services/provider.php", fileContents = servicesProviderPhpFileContents)
 
-  def setupPluginPhpFile(self):
-    # Create the plugin php file container
-    pluginPhpFile = f"{self.plgPackageBaseFolder}/{self.plgNameJoomla}.php"
-    self.createFile( assetType = "f", targetPath = pluginPhpFile, fileContents = self.preparePluginPhpFileContents() )
+  # The manifest's <namespace> and plugin entry point: services/ + src/ for namespaced plugins, else the <plugin>.php file
+  def preparePluginFilesManifestPartials(self):
+    if ( not self.plgNamespaced ):
+      return ( "", f"""<filename plugin="{self.plgNameJoomla}">{self.plgNameJoomla}.php</filename>""" )
+    return ( f"""
+        <namespace path="src">{self.pluginNamespace()}</namespace>""", f"""<folder plugin="{self.plgNameJoomla}">services</folder>
+          <folder>src</folder>""" )
 
 
+  # The task's params form (forms/drain.xml) of the write-behind queue task plugin, its defaults are the --task-queue-* flags
+  def setupTaskFormsFile(self):
+    if ( self.taskQueueRules is None ):
+      return
+    formsFolder = f"{self.plgPackageBaseFolder}/forms"
+    self.createFile(assetType = "d", targetPath = formsFolder)
+    taskFormContents = f"""
+    <?xml version="1.0" encoding="utf-8"?>
+    <form>
+        <fields name="params">
+            <fieldset name="task_params">
+                <field name="batch_size" type="number" default="{self.taskQueueRules['batchSize']}" min="1" filter="int" label="Jobs per batch" />
+                <field name="max_attempts" type="number" default="{self.taskQueueRules['maxAttempts']}" min="1" filter="int" label="Attempts before a job is marked failed" />
+                <field name="backoff" type="number" default="{self.taskQueueRules['backoff']}" min="1" filter="int" label="First retry delay (seconds)" description="Doubled on every further failure, capped at an hour" />
+                <field name="time_limit" type="number" default="{self.taskQueueRules['timeLimit']}" min="1" filter="int" label="Time limit per run (seconds)" />
+            </fieldset>
+        </fields>
+    </form>
+    """[5:]
+    self.createFile(assetType = "f", targetPath = f"{formsFolder}/drain.xml", fileContents = taskFormContents)
+
+  # The routine's title and description strings the scheduler lists, empty for templates without routines
+  def prepareTaskLanguageStringsPartial(self):
+    taskLanguageStrings = ""
+    if ( self.taskQueueRules is not None ):
+      langConstPrefix = f"PLG_TASK_{self.plgNameJoomla.upper()}_DRAIN"
+      taskLanguageStrings += f"""{langConstPrefix}_TITLE="Drain the {self.taskQueueRules['table']} queue"
+    {langConstPrefix}_DESC="Runs the jobs queued with ApiTools::enqueue(), retrying failed jobs with a growing delay."
+    """
+    if ( self.taskPartitionRules is not None ):
+      langConstPrefix = f"PLG_TASK_{self.plgNameJoomla.upper()}_PARTITIONS"
+      taskLanguageStrings += f"""{langConstPrefix}_TITLE="Maintain the partitions of {', '.join(rules['table'] for rules in self.taskPartitionRules)}"
+    {langConstPrefix}_DESC="Adds the partitions of the coming periods ahead of time and drops those past their retention."
+    """
+    return taskLanguageStrings
+
+  # The <config> block holding the plugin's params, empty for templates without params
+  def preparePluginConfigManifestPartial(self):
+    if ( self.contentRules is not None ):
+      return f"""
+        <config>
+            <fields name="params">
+                <fieldset name="basic">
+                    <field name="cache_lifetime" type="number" default="{self.contentRules['cacheLifetime']}" min="0" label="Render cache lifetime (minutes)" description="Editing an article or these params renders it again anyway, 0 turns the cache off" />
+                </fieldset>
+            </fields>
+        </config>"""
+    if ( self.pageCacheRules is None ):
+      return ""
+    multiLineDefault = lambda lines: html.escape("\n".join(lines), quote = True).replace("\n", "&#10;")
+    return f"""
+        <config>
+            <fields name="params">
+                <fieldset name="basic">
+                    <field name="ttl" type="number" default="{self.pageCacheRules['ttl']}" min="0" label="Cache lifetime (seconds)" />
+                    <field name="menu_ttls" type="textarea" rows="5" default="{multiLineDefault(f'{menuItemId}={seconds}' for menuItemId, seconds in self.pageCacheRules['menuTtls'])}" label="Per menu item lifetimes" description="One menu item id=seconds per line, 0 never caches that menu item" />
+                    <field name="include_patterns" type="textarea" rows="5" default="{multiLineDefault(self.pageCacheRules['include'])}" label="Cached pages" description="One PCRE pattern (without delimiters) per line matched against the path and query, empty caches every page" />
+                    <field name="exclude_patterns" type="textarea" rows="5" default="{multiLineDefault(self.pageCacheRules['exclude'])}" label="Never cached pages" description="One PCRE pattern (without delimiters) per line, excludes win over includes" />
+                </fieldset>
+            </fields>
+        </config>"""
+
   def setupPluginManifestFile(self):
     # Create the plugin manifest xml file container
     pluginManifestFile = f"{self.plgPackageBaseFolder}/{self.plgNameJoomla}.xml"
+    namespaceManifestPartial, pluginEntryManifestPartial = self.preparePluginFilesManifestPartials()
     ##########################################################################################################
     ##########################################################################################################
     ######################################## START Plugin Manifest XML #######################################
@@ -419,12 +789,12 @@ class {plgClassName} extends CMSPlugin
         <copyright>{self.plgCopyRightHolder}</copyright>
         <license>{self.plgLicenseType}</license>
         <version>{self.plgVersion}</version>
-        <description>{self.plgDesc}</description>
+        <description>{self.plgDesc}</description>{namespaceManifestPartial}
         <files>
-          <filename plugin="{self.plgNameJoomla}">{self.plgNameJoomla}.php</filename>
+          {pluginEntryManifestPartial}
           <folder>language</folder>
           {self.optFolderNameManifestPartial}
-          {self.sqlDirNameManifestPartial}
+          {self.sqlDirNameManifestPartial}{'<folder>forms</folder>' if self.taskQueueRules is not None else ''}
         </files>
 
         <!-- While this construct works in components, it appears to cause failure messages in plugin installations
@@ -436,7 +806,7 @@ class {plgClassName} extends CMSPlugin
         </languages>
         -->
 
-        {self.sqlHooksInManifestPartial}
+        {self.sqlHooksInManifestPartial}{self.preparePluginConfigManifestPartial()}
 
     </extension>
     """[5:]
@@ -459,7 +829,7 @@ class {plgClassName} extends CMSPlugin
     ; Copyright (C)  {self.plgCreationYear} {self.plgCopyRightHolder}. All Rights Reserved.
 
     PLG_HELLOWORLD_MSG_HELLO_WORLD="Hello World (i8n translation string)!"
-    """[5:]
+    """[5:] + self.prepareTaskLanguageStringsPartial()
     ##################################### END Admin i8n language strings ####################################
     self.createFile(assetType = "f", targetPath = languageLangLocalCodeIniFile, fileContents = languageLangLocalCodeIniFileContents)
 
@@ -472,7 +842,7 @@ class {plgClassName} extends CMSPlugin
 
     PLG_HELLOWORLD_SYS_HELLO_WORLD_TITLE="Hello World (i8n translation string)!"
     PLG_HELLOWORLD_SYS_HELLO_WORLD_DESC="My first Joomla! 4 Plugin!"
-    """[5:]
+    """[5:] + self.prepareTaskLanguageStringsPartial()
     ##################################### END Admin i8n language strings ####################################
     self.createFile(assetType = "f", targetPath = languageLangLocalCodeSysIniFile, fileContents = languageLangLocalCodeSysIniFileContents)
 
@@ -497,35 +867,17 @@ class {plgClassName} extends CMSPlugin
     # Create the Install SQL file (only runs upon installation (not updates i.e. install over existing installation))
     sqlInstallFile = f"{self.sqlAssetFolder}/{self.sqlInstallFilename}"
     #################################### START Install SQL ###################################
-    sqlInstallFileContents = f"""
-    DROP TABLE IF EXISTS `#__{self.initialTableName}`;
-
-    CREATE TABLE `#__{self.initialTableName}`(
-        `id` SERIAL NOT NULL COMMENT "The auto-increment pk of this i.e. {self.initialTableName} table",
-        `name` VARCHAR(255) NOT NULL COMMENT "Required (can't be null) name field",
-        `address` VARCHAR(255) NULL COMMENT "Example 'Address' field of {self.initialTableName} if no value provided, will be NULL",
-        `city` VARCHAR(128) NULL COMMENT "Example 'City' field of {self.initialTableName} if no value provided, will be NULL",
-        `state` VARCHAR(128) NULL COMMENT "Example 'State' field of {self.initialTableName} if no value provided, will be NULL",
-        `zip_postcode` MEDIUMINT NULL COMMENT "Example 'Postal code' field of {self.initialTableName} if no value provided, will be NULL",
-        PRIMARY KEY(`id`)
-    ) ENGINE = InnoDB;
-
-    /* Testing insertion into our newly created table */
-    INSERT INTO `#__{self.initialTableName}` (`name`) VALUES
-        ("Example.com"),
-        ("Foo Bar Bat");
-    """[5:]
+    sqlInstallFileContents = self.tableSpec.renderInstallSql(self.tablePrefix)
     ##################################### END Install SQL ####################################
     self.createFile(assetType = "f", targetPath = sqlInstallFile, fileContents = sqlInstallFileContents)
+    if ( len(self.tableSpec.partitionedTables()) > 0 ):
+      print(f"""NOTE: partitioned tables need their partition maintenance task, generate it with ./pluginMaker.py --plugin-type="task" --task-partition-spec="{self.args.table_spec}" --task-partition-table-prefix="{self.tablePrefix}\"""")
 
   def setupSqlUninstallFile(self):
     # Create the Uninstall SQL file (only runs upon Uninstallation (not updates i.e. Install over existing innstallation))
     sqlUninstallFile = f"{self.sqlAssetFolder}/{self.sqlUninstallFilename}"
     #################################### START Uninstall SQL ###################################
-    sqlUninstallFileContents = f"""
-    DROP TABLE IF EXISTS `#__{self.initialTableName}`;
-
-    """[5:]
+    sqlUninstallFileContents = self.tableSpec.renderUninstallSql(self.tablePrefix)
     ##################################### END Uninstall SQL ####################################
     self.createFile(assetType = "f", targetPath = sqlUninstallFile, fileContents = sqlUninstallFileContents)
 
@@ -533,14 +885,33 @@ class {plgClassName} extends CMSPlugin
     # Create the Update SQL file (only runs upon update (An update is an install over existing innstallation))
     sqlUpdateFile = f"{self.sqlAssetUpdatesFolder}/{self.sqlUpdateFilename}"
     #################################### START Update SQL ###################################
+    updateTable = self.tableSpec.tables[0]
     sqlUpdateFileContents = f"""
-    ALTER TABLE `#__{self.initialTableName}` ADD `new_field_from_update` TEXT NULL DEFAULT NULL AFTER `zip_postcode`,
+    ALTER TABLE `{self.tablePrefix}{updateTable['name']}` ADD `new_field_from_update` TEXT NULL DEFAULT NULL AFTER `{updateTable['columns'][-1]['name']}`,
     ADD FULLTEXT `idx_new_field_from_update` (`new_field_from_update`);
     """[5:]
+    if ( self.schemaMigration is not None ):
+      sqlUpdateFileContents = self.schemaMigration.renderUpdateSql(f"Update to {self.plgVersion} from the table spec {self.args.table_spec_previous}")
     ##################################### END Update SQL ####################################
     self.createFile(assetType = "f", targetPath = sqlUpdateFile, fileContents = sqlUpdateFileContents)
 
 
+  def setupSeedDataFile(self):
+    # Create the bulk seed SQL file next to (not inside) the package, it is loaded by hand with the mysql client for load testing
+    if ( self.args.seed_rows is None and self.args.seed_csv is None ):
+      return
+    if ( self.args.seed_rows is not None and self.args.seed_csv is not None ):
+      raise Exception("""--seed-rows and --seed-csv are mutually exclusive, please pass only one of them.""")
+    seedTableName = self.args.seed_table if self.args.seed_table is not None else self.tableSpec.tables[0]["name"]
+    seedFolder = f"{self.currDir}/{self.plgFolderName}_seed"
+    seedFile = f"{seedFolder}/{seedTableName}.seed.sql"
+    self.createFile(assetType = "d", targetPath = seedFolder)
+    seededRows = writeSeedFile(self.tableSpec, seedTableName, f"{self.args.seed_db_prefix}{self.plgManifestNameField}_{seedTableName}", seedFile,
+                               rowCount = self.args.seed_rows, csvPath = self.args.seed_csv, maxAllowedPacket = self.args.seed_max_allowed_packet,
+                               deferIndexes = self.args.seed_defer_indexes, packetFlagName = "--seed-max-allowed-packet")
+    print( f"Created file: {seedFile}, with {seededRows} seed rows" )
+
+
   # # Create the Update SQL file (only runs upon Update (not Installs i.e. Installs over existing installation))
   # adminSqlUpdateFile = f"{self.sqlAssetUpdatesFolder}/{self.plgVersion}.sql"
   # #################################### START Update SQL ###################################
@@ -582,7 +953,10 @@ class {plgClassName} extends CMSPlugin
     self.handleSqlSupport()
     self.handleOptionalFolders()
     self.setupPluginPhpFile()
+    self.setupTaskFormsFile()
     self.setupPluginManifestFile()
+    self.setupLoadTestFolder()
+    self.setupPreloadFolder()
     self.finishAndCreateInstallable()
 
 PM = PluginMaker()
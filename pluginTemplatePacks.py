@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+# Registry of the template packs pluginMaker.py renders plugin php files with. A pack is a python file named after the
+# plugin type ("media-action" -> media_action.py) defining renderPluginPhpFile(maker, plgClassName), which returns the
+# plugin php file or None to fall back to the stub pack (_stub.py). Packs are looked up in the --plugin-template-packs
+# folders first, so a folder of our own packs overrides or adds types without forking, then in the bundled
+# pluginTemplates/ folder. Finding a pack only checks for its file, a pack is imported when its type is generated.
+#   ./pluginTemplatePacks.py [pack folder ...]
+import os, sys, importlib.util
+
+bundledPackFolder = os.path.join(os.path.dirname(os.path.realpath(__file__)), "pluginTemplates")
+stubPackName = "_stub"
+
+# Imported packs by real path, a pack is executed once per run
+loadedPacks = {}
+
+def packFileName(pluginType):
+  return pluginType.replace("-", "_") + ".py"
+
+def findTemplatePack(pluginType, packFolders = ()):
+  for packFolder in list(packFolders) + [ bundledPackFolder ]:
+    packPath = os.path.join(packFolder, packFileName(pluginType))
+    if ( os.path.isfile(packPath) ):
+      return packPath
+  return None
+
+def loadTemplatePack(packPath):
+  packPath = os.path.realpath(packPath)
+  if ( packPath not in loadedPacks ):
+    packName = os.path.splitext(os.path.basename(packPath))[0]
+    packSpec = importlib.util.spec_from_file_location(f"pluginTemplatePack_{packName}", packPath)
+    pack = importlib.util.module_from_spec(packSpec)
+    packSpec.loader.exec_module(pack)
+    if ( not callable(getattr(pack, "renderPluginPhpFile", None)) ):
+      raise Exception(f"""The plugin template pack {packPath} must define renderPluginPhpFile(maker, plgClassName).""")
+    loadedPacks[packPath] = pack
+  return loadedPacks[packPath]
+
+def renderPluginPhpFile(maker, pluginType, plgClassName, packFolders = ()):
+  packPath = findTemplatePack(pluginType, packFolders)
+  pluginPhpFileContents = loadTemplatePack(packPath).renderPluginPhpFile(maker, plgClassName) if packPath is not None else None
+  if ( pluginPhpFileContents is None ):
+    pluginPhpFileContents = loadTemplatePack(os.path.join(bundledPackFolder, f"{stubPackName}.py")).renderPluginPhpFile(maker, plgClassName)
+  return pluginPhpFileContents
+
+# Pack name -> path of every pack the folders provide (earlier folders win), without importing any of them
+def availableTemplatePacks(packFolders = ()):
+  templatePacks = {}
+  for packFolder in list(packFolders) + [ bundledPackFolder ]:
+    for fileName in sorted(os.listdir(packFolder)):
+      packName = os.path.splitext(fileName)[0]
+      if ( fileName.endswith(".py") and packName != stubPackName and packName not in templatePacks ):
+        templatePacks[packName] = os.path.join(packFolder, fileName)
+  return templatePacks
+
+if __name__ == "__main__":
+  for packName, packPath in availableTemplatePacks(sys.argv[1:]).items():
+    print(f"{packName:<24} {packPath}")
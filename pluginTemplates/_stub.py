@@ -0,0 +1,18 @@
+# Template pack of every plugin type without a pack of its own (and of packs returning None), see pluginTemplatePacks.py.
+# renderPluginPhpFile() returns the plugin php file with the plugin class named plgClassName.
+
+def renderPluginPhpFile(maker, plgClassName):
+  pluginPhpFileContents = f"""
+        <?php
+defined('_JEXEC') or die;
+
+use Joomla\CMS\Plugin\CMSPlugin;{maker.subscriberUsePartial()}
+class {plgClassName} extends CMSPlugin{maker.subscriberImplementsPartial()}
+{{
+	protected $autoloadLanguage = true;{maker.subscribedEventsPartial({}, "  ", "Map every event the plugin handles to its method e.g. 'onUserAfterSave' => 'PLEASE_IMPLEMENT_ME'", blankLineAfter = True)}
+  {maker.listenerSignature("PLEASE_IMPLEMENT_ME", "", [], "  ")}
+    // Please implement whatever is found inside plugin of type '{maker.plgType}';
+  }}
+}}
+        """[9:]
+  return pluginPhpFileContents
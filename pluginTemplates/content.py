@@ -0,0 +1,106 @@
+# Template pack of --plugin-type="content", see pluginTemplatePacks.py.
+# It is only imported when that type is generated, renderPluginPhpFile() returns the plugin php file.
+
+def renderPluginPhpFile(maker, plgClassName):
+  pluginPhpFileContents = rf"""
+        <?php
+defined('_JEXEC') or die;
+
+use Joomla\CMS\Cache\CacheControllerFactoryInterface;
+use Joomla\CMS\Factory;
+use Joomla\CMS\Plugin\CMSPlugin;{maker.subscriberUsePartial()}
+
+/**
+ * Replaces {maker.contentRules['marker']} attribute="value"}} tags in content. onContentPrepare runs for every article of every
+ * render (a category blog page runs it once per intro), so texts without the marker are skipped with a strpos()
+ * before any regex work, and rendered texts are cached by context, article id, modified time and plugin params.
+ * renderTag() must only depend on its attributes, the cached text is shared by every visitor.
+ */
+class {plgClassName} extends CMSPlugin{maker.subscriberImplementsPartial()}
+{{
+  private const MARKER = '{maker.contentRules['marker']}';
+
+  protected $autoloadLanguage = true;{maker.subscribedEventsPartial({ "onContentPrepare": "onContentPrepare" }, "  ")}
+
+  /**
+   * Texts rendered during this request, an article shown twice (e.g. in a module and the component) is rendered once
+   *
+   * @var  array
+   */
+  private static $rendered = [];
+
+  {maker.listenerSignature("onContentPrepare", "$context, &$article, &$params, $page = 0", [ "$context", "$article" ], "  ")}
+    if (!isset($article->text) || strpos($article->text, self::MARKER) === false)
+    {{
+      return;
+    }}
+    $cacheId = $this->cacheId($context, $article);
+    if ($cacheId === null)
+    {{
+      $article->text = $this->render($article->text);
+      return;
+    }}
+    if (!isset(self::$rendered[$cacheId]))
+    {{
+      $cache = $this->renderCache();
+      $renderedText = $cache ? $cache->get($cacheId) : false;
+      if (!is_string($renderedText))
+      {{
+        $renderedText = $this->render($article->text);
+        if ($cache)
+        {{
+          $cache->store($renderedText, $cacheId);
+        }}
+      }}
+      self::$rendered[$cacheId] = $renderedText;
+    }}
+    $article->text = self::$rendered[$cacheId];
+  }}
+
+  private function render($text)
+  {{
+    $pattern = '/' . preg_quote(self::MARKER, '/') . '(?:\s+([^}}]*))?\}}/';
+    return preg_replace_callback($pattern, function ($tag)
+    {{
+      $attributes = [];
+      preg_match_all('/([\w-]+)\s*=\s*"([^"]*)"/', $tag[1] ?? '', $pairs, PREG_SET_ORDER);
+      foreach ($pairs as $pair)
+      {{
+        $attributes[$pair[1]] = $pair[2];
+      }}
+      return $this->renderTag($attributes);
+    }}, $text);
+  }}
+
+  private function renderTag(array $attributes)
+  {{
+    // Please implement what a {maker.contentRules['marker']}}} tag renders to, e.g. load a layout with $attributes
+    return '<span class="{maker.plgNameJoomla}">' . htmlspecialchars(json_encode($attributes), ENT_QUOTES, 'UTF-8') . '</span>';
+  }}
+
+  /**
+   * The render cache id, null when the text has no stable identity (no id or modified time) and is always rendered.
+   * The text's own hash tells apart the intro and the full text of an article, and texts an earlier plugin changed.
+   */
+  private function cacheId($context, $article)
+  {{
+    if (empty($article->id) || empty($article->modified))
+    {{
+      return null;
+    }}
+    return md5(implode('|', [$context, (int) $article->id, $article->modified, md5($article->text), $this->params->toString()]));
+  }}
+
+  private function renderCache()
+  {{
+    $lifetime = (int) $this->params->get('cache_lifetime', {maker.contentRules['cacheLifetime']});
+    if ($lifetime <= 0)
+    {{
+      return null;
+    }}
+    return Factory::getContainer()->get(CacheControllerFactoryInterface::class)
+      ->createCacheController('output', ['defaultgroup' => '{maker.plgManifestNameField}', 'caching' => true, 'lifetime' => $lifetime]);
+  }}
+}}
+        """[9:]
+  return pluginPhpFileContents
@@ -0,0 +1,258 @@
+# Template pack of --plugin-type="finder" (a Smart Search indexer of a --table-spec table), see pluginTemplatePacks.py.
+# It is only imported when that type is generated, renderPluginPhpFile() returns the plugin php file.
+
+def renderPluginPhpFile(maker, plgClassName):
+  finder = maker.finderRules
+  # Adapter's own listeners take no arguments, they ignore the Event they are called with
+  finderEvents = { eventName: eventName for eventName in ( "onBeforeIndex", "onStartIndex", "onBuildIndex", "onFinderGarbageCollection", "onFinderAfterDelete", "onFinderAfterSave" ) }
+  bodySelectPartial = ""
+  bodyInstructionsPartial = ""
+  if ( len(finder["bodyColumns"]) > 0 ):
+    bodySelectPartial = f"""
+      ->select($db->quoteName([{", ".join(f"'a.{name}'" for name in finder["bodyColumns"])}], [{", ".join(f"'{name}'" for name in finder["bodyColumns"])}]))"""
+    bodyInstructionsPartial = "".join(f"""
+    $item->addInstruction(Indexer::TEXT_CONTEXT, '{name}');""" for name in finder["bodyColumns"])
+  modifiedSelectPartial = ""
+  sinceStatePartial = ""
+  sinceFilterPartial = ""
+  if ( finder["modifiedColumn"] is not None ):
+    modifiedSelectPartial = f"""
+      ->select($db->quoteName('a.{finder["modifiedColumn"]}', 'modified'))"""
+    sinceStatePartial = """
+    $iState->pluginState[$this->context]['since'] = $this->lastIndexDate();"""
+    sinceFilterPartial = f"""
+    $since = Indexer::getState()->pluginState[$this->context]['since'] ?? null;
+    if ($since !== null)
+    {{
+      // Only rows changed since the previous run, rows without a modified time are always read
+      $query->where('(' . $this->db->quoteName('a.{finder["modifiedColumn"]}') . ' > :since OR ' . $this->db->quoteName('a.{finder["modifiedColumn"]}') . ' IS NULL)')
+        ->bind(':since', $since);
+    }}"""
+  pluginPhpFileContents = rf"""
+        <?php
+defined('_JEXEC') or die;
+
+use Joomla\CMS\Component\ComponentHelper;
+use Joomla\Component\Finder\Administrator\Indexer\Adapter;
+use Joomla\Component\Finder\Administrator\Indexer\Indexer;
+use Joomla\Component\Finder\Administrator\Indexer\Result;
+use Joomla\Database\DatabaseQuery;
+use Joomla\Database\ParameterType;
+use Joomla\Utilities\ArrayHelper;{maker.subscriberUsePartial()}
+
+/**
+ * Smart Search indexer of {finder['table']}. Batches are read with keyset queries on {finder['keyColumn']} instead of
+ * Adapter's LIMIT offset paging, which rereads every skipped row. A run only reads rows modified since the previous
+ * one (see lastIndexDate()) and first removes the links of rows deleted in the meantime.
+ */
+class {plgClassName} extends Adapter{maker.subscriberImplementsPartial()}
+{{
+  protected $context = '{finder['typeTitle']}';
+
+  protected $extension = '{finder['component']}';
+
+  protected $layout = '{finder['view']}';
+
+  protected $type_title = '{finder['typeTitle']}';
+
+  protected $table = '{finder['table']}';
+
+  protected $autoloadLanguage = true;
+
+  private const BATCH_SIZE = {finder['batchSize']};{maker.subscribedEventsPartial(finderEvents, "  ")}
+
+  {maker.listenerSignature("onFinderAfterDelete", "$context, $table", [ "$context", "$table" ], "  ", ": void")}
+    if ($context === '{finder['component']}.{finder['view']}')
+    {{
+      $id = $table->{finder['keyColumn']};
+    }}
+    elseif ($context === 'com_finder.index')
+    {{
+      $id = $table->link_id;
+    }}
+    else
+    {{
+      return;
+    }}
+    $this->remove($id);
+  }}
+
+  {maker.listenerSignature("onFinderAfterSave", "$context, $row, $isNew", [ "$context", "$row" ], "  ", ": void")}
+    if ($context === '{finder['component']}.{finder['view']}')
+    {{
+      $this->reindex($row->{finder['keyColumn']});
+    }}
+  }}
+
+  public function onStartIndex()
+  {{
+    $this->removeDeletedItems();
+    $iState = Indexer::getState();{sinceStatePartial}
+    $iState->pluginState[$this->context]['lastKey'] = 0;
+    Indexer::setState($iState);
+    parent::onStartIndex();
+  }}
+
+  /**
+   * Adapter::onBuildIndex() with keyset batches, the last indexed key is kept in the indexer state between batches
+   */
+  public function onBuildIndex()
+  {{
+    $iState = Indexer::getState();
+    $aState = $iState->pluginState[$this->context];
+    if ($iState->batchOffset == $iState->batchSize || $aState['offset'] == $aState['total'])
+    {{
+      return true;
+    }}
+    $limit = (int) min(self::BATCH_SIZE, $iState->batchSize - $iState->batchOffset);
+    $items = $this->getKeysetItems((int) ($aState['lastKey'] ?? 0), $limit);
+    foreach ($items as $item)
+    {{
+      $this->index($item);
+      $aState['lastKey'] = (int) $item->id;
+      $aState['offset']++;
+      $iState->batchOffset++;
+      $iState->totalItems--;
+    }}
+    if (count($items) < $limit)
+    {{
+      // Rows deleted since the count, the table is done
+      $iState->totalItems -= $aState['total'] - $aState['offset'];
+      $aState['offset'] = $aState['total'];
+    }}
+    $iState->pluginState[$this->context] = $aState;
+    Indexer::setState($iState);
+    return true;
+  }}
+
+  protected function setup()
+  {{
+    return true;
+  }}
+
+  protected function index(Result $item)
+  {{
+    if (ComponentHelper::isEnabled($this->extension) === false)
+    {{
+      return;
+    }}
+    $item->setLanguage();
+    $item->url = $this->getUrl($item->id, $this->extension, $this->layout);
+    $item->route = $item->url;
+    $item->state = 1;
+    $item->access = 1;{bodyInstructionsPartial}
+    $item->addTaxonomy('Type', '{finder['typeTitle']}');
+    $this->indexer->index($item);
+  }}
+
+  protected function getListQuery($query = null)
+  {{
+    $db = $this->db;
+    $query = $query instanceof DatabaseQuery ? $query : $db->getQuery(true);
+    $query->select($db->quoteName('a.{finder['keyColumn']}', 'id'))
+      ->select($db->quoteName('a.{finder['titleColumn']}', 'title')){bodySelectPartial}{modifiedSelectPartial}
+      ->from($db->quoteName($this->table, 'a'));
+    return $query;
+  }}
+
+  protected function getContentCount()
+  {{
+    $query = $this->getListQuery()->clear('select')->select('COUNT(*)');{sinceFilterPartial}
+    return (int) $this->db->setQuery($query)->loadResult();
+  }}
+
+  protected function getItem($id)
+  {{
+    $id = (int) $id;
+    $query = $this->getListQuery()
+      ->where($this->db->quoteName('a.{finder['keyColumn']}') . ' = :id')
+      ->bind(':id', $id, ParameterType::INTEGER);
+    return $this->toResult((array) $this->db->setQuery($query)->loadAssoc());
+  }}
+
+  private function getKeysetItems($lastKey, $limit)
+  {{
+    $query = $this->getListQuery()
+      ->where($this->db->quoteName('a.{finder['keyColumn']}') . ' > :lastKey')
+      ->bind(':lastKey', $lastKey, ParameterType::INTEGER)
+      ->order($this->db->quoteName('a.{finder['keyColumn']}'))
+      ->setLimit($limit);{sinceFilterPartial}
+    return array_map([$this, 'toResult'], $this->db->setQuery($query)->loadAssocList());
+  }}
+
+  private function toResult(array $row)
+  {{
+    $item = ArrayHelper::toObject($row, Result::class);
+    $item->type_id = $this->type_id;
+    $item->mime = $this->mime;
+    $item->layout = $this->layout;
+    return $item;
+  }}
+{lastIndexDatePartial(maker)}
+  /**
+   * Removes the links of rows deleted without onFinderAfterDelete (bulk deletes, direct SQL), a chunk of links at a time
+   */
+  private function removeDeletedItems()
+  {{
+    $db = $this->db;
+    $typeId = (int) $this->type_id;
+    $lastLinkId = 0;
+    do
+    {{
+      $query = $db->getQuery(true)
+        ->select($db->quoteName(['link_id', 'url']))
+        ->from($db->quoteName('#__finder_links'))
+        ->where($db->quoteName('type_id') . ' = :typeId')
+        ->where($db->quoteName('link_id') . ' > :lastLinkId')
+        ->bind(':typeId', $typeId, ParameterType::INTEGER)
+        ->bind(':lastLinkId', $lastLinkId, ParameterType::INTEGER)
+        ->order($db->quoteName('link_id'))
+        ->setLimit(1000);
+      $links = $db->setQuery($query)->loadObjectList();
+      $linkIdsByKey = [];
+      foreach ($links as $link)
+      {{
+        $lastLinkId = (int) $link->link_id;
+        if (preg_match('/[?&]id=(\d+)/', $link->url, $match))
+        {{
+          $linkIdsByKey[(int) $match[1]] = $lastLinkId;
+        }}
+      }}
+      if (count($linkIdsByKey) > 0)
+      {{
+        $query = $db->getQuery(true)
+          ->select($db->quoteName('{finder['keyColumn']}'))
+          ->from($db->quoteName($this->table))
+          ->whereIn($db->quoteName('{finder['keyColumn']}'), array_keys($linkIdsByKey));
+        foreach (array_diff_key($linkIdsByKey, array_flip($db->setQuery($query)->loadColumn())) as $linkId)
+        {{
+          $this->indexer->remove($linkId);
+        }}
+      }}
+    }}
+    while (count($links) === 1000);
+  }}
+}}
+        """[9:]
+  return pluginPhpFileContents
+
+# lastIndexDate() of the plugin, only generated when the table has a modified column
+def lastIndexDatePartial(maker):
+  if ( maker.finderRules["modifiedColumn"] is None ):
+    return ""
+  return """
+  /**
+   * An hour before the newest index date of this content type, null when nothing is indexed yet (a full run). The overlap
+   * catches rows modified during the previous run after it read them, Indexer::index() skips the unchanged ones cheaply.
+   */
+  private function lastIndexDate()
+  {
+    $typeId = (int) $this->type_id;
+    $query = $this->db->getQuery(true)
+      ->select('MAX(' . $this->db->quoteName('indexdate') . ') - INTERVAL 1 HOUR')
+      ->from($this->db->quoteName('#__finder_links'))
+      ->where($this->db->quoteName('type_id') . ' = :typeId')
+      ->bind(':typeId', $typeId, ParameterType::INTEGER);
+    return $this->db->setQuery($query)->loadResult() ?: null;
+  }
+"""
@@ -0,0 +1,211 @@
+# Template pack of --plugin-type="system" --plugin-meta="page-cache", other system plugins get the stub, see pluginTemplatePacks.py.
+# It is only imported when that type is generated, renderPluginPhpFile() returns the plugin php file.
+
+def renderPluginPhpFile(maker, plgClassName):
+  if ( maker.plgMeta != "page-cache" ):
+    return None
+  # Subscribed plugins map the content events straight to onPageCachePurge(), legacy ones need a method per event
+  pageCacheEvents = { "onAfterRoute": "onAfterRoute", "onAfterRender": "onAfterRender", "onPageCachePurge": "onPageCachePurge",
+                      "onContentAfterSave": "onPageCachePurge", "onContentAfterDelete": "onPageCachePurge", "onContentChangeState": "onPageCachePurge" }
+  contentPurgeListenersPartial = ""
+  if ( not maker.plgSubscriber ):
+    contentPurgeListenersPartial = """
+
+  public function onContentAfterSave($context, $item, $isNew, $data = [])
+  {
+    $this->onPageCachePurge();
+  }
+
+  public function onContentAfterDelete($context, $item)
+  {
+    $this->onPageCachePurge();
+  }
+
+  public function onContentChangeState($context, $pks, $value)
+  {
+    $this->onPageCachePurge();
+  }"""
+  # The generated rules, single quoted for PHP, the params fall back to them until the plugin options are saved
+  phpLines = lambda lines: "[" + ", ".join("'" + line.replace("\\", "\\\\").replace("'", "\\'") + "'" for line in lines) + "]"
+  ruleDefaultsPartial = f"""
+    'include_patterns' => {phpLines(maker.pageCacheRules['include'])},
+    'exclude_patterns' => {phpLines(maker.pageCacheRules['exclude'])},
+    'menu_ttls' => {phpLines(f'{menuItemId}={seconds}' for menuItemId, seconds in maker.pageCacheRules['menuTtls'])},
+  """
+  pluginPhpFileContents = rf"""
+        <?php
+defined('_JEXEC') or die;
+
+use Joomla\CMS\Cache\CacheControllerFactoryInterface;
+use Joomla\CMS\Factory;
+use Joomla\CMS\Plugin\CMSPlugin;
+use Joomla\CMS\Uri\Uri;{maker.subscriberUsePartial(usesEvent = False)}
+
+/**
+ * Full page cache for guests. onAfterRoute answers a cached page before the component runs, onAfterRender stores
+ * pages that may be cached. Which pages are cached and for how long is set in the plugin params (include / exclude
+ * patterns, default TTL and per menu item TTLs), any content save or an onPageCachePurge event empties the cache.
+ */
+class {plgClassName} extends CMSPlugin{maker.subscriberImplementsPartial()}
+{{
+  protected $autoloadLanguage = true;{maker.subscribedEventsPartial(pageCacheEvents, "  ")}
+
+  /**
+   * The generated rules, one entry per line of the matching param, used until the plugin options are saved
+   */
+  private const RULE_DEFAULTS = [{ruleDefaultsPartial}];
+
+  /**
+   * @var  \Joomla\CMS\Application\CMSApplication
+   */
+  protected $app;
+
+  /**
+   * Cache id of the current page when onAfterRender may store it, null otherwise
+   *
+   * @var  string|null
+   */
+  private $pageCacheId = null;
+
+  /**
+   * @var  int
+   */
+  private $pageTtl = 0;
+
+  public function onAfterRoute()
+  {{
+    if (!$this->isCacheableRequest())
+    {{
+      return;
+    }}
+    $this->pageTtl = $this->ttlForMenuItem($this->app->input->getInt('Itemid'));
+    if ($this->pageTtl <= 0)
+    {{
+      return;
+    }}
+    $this->pageCacheId = md5(Uri::getInstance()->toString() . '|' . $this->app->getLanguage()->getTag());
+
+    $cachedPage = $this->pageCache()->get($this->pageCacheId);
+    if (!is_array($cachedPage) || $cachedPage['expires'] < time())
+    {{
+      return;
+    }}
+    $this->pageCacheId = null;
+    foreach ($cachedPage['headers'] as $header)
+    {{
+      $this->app->setHeader($header['name'], $header['value']);
+    }}
+    $this->app->setHeader('X-Page-Cache', 'HIT', true);
+    $this->app->setBody($cachedPage['body']);
+    echo $this->app->toString((bool) $this->app->get('gzip'));
+    $this->app->close();
+  }}
+
+  public function onAfterRender()
+  {{
+    if ($this->pageCacheId === null || count($this->app->getMessageQueue()) > 0 || http_response_code() !== 200)
+    {{
+      return;
+    }}
+    $headers = array_values(array_filter($this->app->getHeaders(), function ($header) {{
+      return !in_array(strtolower($header['name']), ['set-cookie', 'status', 'x-page-cache'], true);
+    }}));
+    $this->pageCache()->store(['expires' => time() + $this->pageTtl, 'headers' => $headers, 'body' => $this->app->getBody()], $this->pageCacheId);
+    $this->app->setHeader('X-Page-Cache', 'MISS', true);
+  }}
+
+  /**
+   * Empties the page cache, trigger it from any extension with $app->triggerEvent('onPageCachePurge')
+   *
+   * @return  void
+   */
+  public function onPageCachePurge()
+  {{
+    $this->pageCache()->clean();
+  }}{contentPurgeListenersPartial}
+
+  private function isCacheableRequest()
+  {{
+    if (!$this->app->isClient('site') || !in_array($this->app->input->getMethod(), ['GET', 'HEAD'], true) || !$this->app->getIdentity()->guest)
+    {{
+      return false;
+    }}
+    $page = Uri::getInstance()->toString(['path', 'query']);
+    foreach ($this->patterns('exclude_patterns') as $pattern)
+    {{
+      if (preg_match($pattern, $page))
+      {{
+        return false;
+      }}
+    }}
+    $includePatterns = $this->patterns('include_patterns');
+    if ($includePatterns === [])
+    {{
+      return true;
+    }}
+    foreach ($includePatterns as $pattern)
+    {{
+      if (preg_match($pattern, $page))
+      {{
+        return true;
+      }}
+    }}
+    return false;
+  }}
+
+  /**
+   * The non empty lines of a patterns param as delimited PCRE patterns
+   *
+   * @param   string  $paramName
+   * @return  string[]
+   */
+  private function patterns($paramName)
+  {{
+    $patterns = [];
+    foreach ($this->paramLines($paramName) as $line)
+    {{
+      if (trim($line) !== '')
+      {{
+        $patterns[] = '#' . str_replace('#', '\#', trim($line)) . '#';
+      }}
+    }}
+    return $patterns;
+  }}
+
+  /**
+   * The lines of a multi line param, an emptied param stays empty instead of falling back to the generated rules
+   *
+   * @param   string  $paramName
+   * @return  string[]
+   */
+  private function paramLines($paramName)
+  {{
+    if (!$this->params->exists($paramName))
+    {{
+      return self::RULE_DEFAULTS[$paramName];
+    }}
+    return preg_split('/\R/', (string) $this->params->get($paramName));
+  }}
+
+  private function ttlForMenuItem($itemId)
+  {{
+    foreach ($this->paramLines('menu_ttls') as $line)
+    {{
+      $menuTtl = array_map('trim', explode('=', $line, 2));
+      if (count($menuTtl) === 2 && (int) $menuTtl[0] === (int) $itemId)
+      {{
+        return (int) $menuTtl[1];
+      }}
+    }}
+    return (int) $this->params->get('ttl', {maker.pageCacheRules['ttl']});
+  }}
+
+  private function pageCache()
+  {{
+    // Pages carry their own expiry, the storage lifetime (in minutes) caps any TTL at one day
+    return Factory::getContainer()->get(CacheControllerFactoryInterface::class)
+      ->createCacheController('output', ['defaultgroup' => '{maker.plgManifestNameField}', 'caching' => true, 'lifetime' => 60 * 24]);
+  }}
+}}
+        """[9:]
+  return pluginPhpFileContents
@@ -0,0 +1,331 @@
+# Template pack of --plugin-type="task" (the write-behind queue consumer and the partition maintenance), see pluginTemplatePacks.py.
+# It is only imported when that type is generated, renderPluginPhpFile() returns the plugin php file.
+
+def renderPluginPhpFile(maker, plgClassName):
+  classDocBlocks = []
+  tasksMapEntries = ""
+  classConstants = ""
+  routineMethods = ""
+  if ( maker.taskQueueRules is not None ):
+    classDocBlocks.append(queueDocBlock(maker))
+    tasksMapEntries += queueTasksMapEntry(maker)
+    classConstants += queueConstants()
+    routineMethods += queueMethods(maker)
+  if ( maker.taskPartitionRules is not None ):
+    classDocBlocks.append(partitionDocBlock(maker))
+    tasksMapEntries += partitionTasksMapEntry(maker)
+    classConstants += partitionConstants(maker)
+    routineMethods += partitionMethods()
+  pluginPhpFileContents = rf"""
+        <?php
+defined('_JEXEC') or die;
+
+use Joomla\CMS\Factory;
+use Joomla\CMS\Plugin\CMSPlugin;
+use Joomla\Component\Scheduler\Administrator\Event\ExecuteTaskEvent;
+use Joomla\Component\Scheduler\Administrator\Task\Status as TaskStatus;
+use Joomla\Component\Scheduler\Administrator\Traits\TaskPluginTrait;
+use Joomla\Database\DatabaseInterface;
+{'use Joomla' + chr(92) + 'Database' + chr(92) + 'ParameterType;' + chr(10) if maker.taskQueueRules is not None else ''}use Joomla\Event\SubscriberInterface;
+
+/**
+{(chr(10) + ' *' + chr(10)).join(classDocBlocks)}
+ */
+class {plgClassName} extends CMSPlugin implements SubscriberInterface
+{{
+  use TaskPluginTrait;
+
+  protected const TASKS_MAP = [
+{tasksMapEntries}  ];
+{classConstants}
+  protected $autoloadLanguage = true;
+
+  public static function getSubscribedEvents(): array
+  {{
+    return [
+      'onTaskOptionsList'    => 'advertiseRoutines',
+      'onExecuteTask'        => 'standardRoutineHandler',
+      'onContentPrepareForm' => 'enhanceTaskItemForm',
+    ];
+  }}
+{routineMethods}}}
+        """[9:]
+  return pluginPhpFileContents
+
+def queueDocBlock(maker):
+  return f"""
+ * Scheduler task draining the write-behind queue of {maker.taskQueueRules['table']}, filled by ApiTools::enqueue().
+ * Each run claims batches of due jobs (or jobs whose lease ran out) with a claim token, calls every job's
+ * Class::method with its decoded payload and deletes it once done. A failing job is retried with an exponential
+ * backoff plus jitter, after max_attempts runs it is kept as failed (state 3) with its last error."""[1:]
+
+def queueTasksMapEntry(maker):
+  return f"""
+    '{maker.plgManifestNameField}.drain' => [
+      'langConstPrefix' => 'PLG_TASK_{maker.plgNameJoomla.upper()}_DRAIN',
+      'form'            => 'drain',
+      'method'          => 'drainQueue',
+    ],
+"""[1:]
+
+def queueConstants():
+  return """
+  private const STATE_PENDING = 0;
+  private const STATE_RUNNING = 1;
+  private const STATE_FAILED = 3;
+"""
+
+def queueMethods(maker):
+  return rf"""
+  private function drainQueue(ExecuteTaskEvent $event): int
+  {{
+    $params = $event->getArgument('params');
+    $batchSize = max(1, (int) ($params->batch_size ?? {maker.taskQueueRules['batchSize']}));
+    $maxAttempts = max(1, (int) ($params->max_attempts ?? {maker.taskQueueRules['maxAttempts']}));
+    $backoff = max(1, (int) ($params->backoff ?? {maker.taskQueueRules['backoff']}));
+    $timeLimit = max(1, (int) ($params->time_limit ?? {maker.taskQueueRules['timeLimit']}));
+    $deadline = microtime(true) + $timeLimit;
+    $db = Factory::getContainer()->get(DatabaseInterface::class);
+    $done = 0;
+    $failed = 0;
+    $released = 0;
+
+    while (microtime(true) < $deadline)
+    {{
+      $jobs = $this->claimBatch($db, $batchSize, $timeLimit + 60);
+      if (count($jobs) === 0)
+      {{
+        break;
+      }}
+      foreach ($jobs as $job)
+      {{
+        // The deadline is checked before every job, so only a job starting in time and running over the 60s margin can
+        // outlive the batch lease (time limit + 60s) and be run twice. The jobs not started yet go back to the queue.
+        if (microtime(true) >= $deadline)
+        {{
+          $released = $this->releaseJobs($db, $job->claim_token);
+          break 2;
+        }}
+        try
+        {{
+          if (!is_callable($job->job))
+          {{
+            throw new \RuntimeException('Job ' . $job->job . ' is not callable');
+          }}
+          call_user_func($job->job, (array) json_decode($job->payload, true, 512, JSON_THROW_ON_ERROR));
+          $this->deleteJob($db, $job);
+          $done++;
+        }}
+        catch (\Throwable $e)
+        {{
+          $this->failJob($db, $job, $e->getMessage(), $maxAttempts, $backoff);
+          $failed++;
+        }}
+      }}
+    }}
+
+    $this->logTask(sprintf('Queue {maker.taskQueueRules['table']}: %d jobs done, %d failed, %d put back', $done, $failed, $released), $failed > 0 ? 'warning' : 'info');
+    return TaskStatus::OK;
+  }}
+
+  /**
+   * Claims up to $batchSize due jobs in one UPDATE so concurrent runs never get the same job, then reads them back by token
+   */
+  private function claimBatch(DatabaseInterface $db, int $batchSize, int $leaseSeconds): array
+  {{
+    $claimToken = bin2hex(random_bytes(16));
+    $db->setQuery(
+      'UPDATE ' . $db->quoteName('{maker.taskQueueRules['table']}')
+      . ' SET ' . $db->quoteName('state') . ' = ' . self::STATE_RUNNING
+      . ', ' . $db->quoteName('claim_token') . ' = ' . $db->quote($claimToken)
+      . ', ' . $db->quoteName('locked_until') . ' = UTC_TIMESTAMP() + INTERVAL ' . $leaseSeconds . ' SECOND'
+      . ', ' . $db->quoteName('attempts') . ' = ' . $db->quoteName('attempts') . ' + 1'
+      . ' WHERE (' . $db->quoteName('state') . ' = ' . self::STATE_PENDING . ' AND ' . $db->quoteName('available_at') . ' <= UTC_TIMESTAMP())'
+      . ' OR (' . $db->quoteName('state') . ' = ' . self::STATE_RUNNING . ' AND ' . $db->quoteName('locked_until') . ' < UTC_TIMESTAMP())'
+      . ' ORDER BY ' . $db->quoteName('id') . ' LIMIT ' . $batchSize
+    )->execute();
+    if ($db->getAffectedRows() === 0)
+    {{
+      return [];
+    }}
+    $query = $db->getQuery(true)
+      ->select($db->quoteName(['id', 'job', 'payload', 'attempts', 'claim_token']))
+      ->from($db->quoteName('{maker.taskQueueRules['table']}'))
+      ->where($db->quoteName('claim_token') . ' = :claimToken')
+      ->order($db->quoteName('id'))
+      ->bind(':claimToken', $claimToken);
+    return $db->setQuery($query)->loadObjectList();
+  }}
+
+  /**
+   * Puts the jobs of a batch which were not started back to pending, as if they had never been claimed
+   */
+  private function releaseJobs(DatabaseInterface $db, string $claimToken): int
+  {{
+    $query = $db->getQuery(true)
+      ->update($db->quoteName('{maker.taskQueueRules['table']}'))
+      ->set($db->quoteName('state') . ' = ' . self::STATE_PENDING)
+      ->set($db->quoteName('claim_token') . ' = NULL')
+      ->set($db->quoteName('locked_until') . ' = NULL')
+      ->set($db->quoteName('attempts') . ' = ' . $db->quoteName('attempts') . ' - 1')
+      ->where($db->quoteName('claim_token') . ' = :claimToken')
+      ->bind(':claimToken', $claimToken);
+    $db->setQuery($query)->execute();
+    return $db->getAffectedRows();
+  }}
+
+  /**
+   * Deletes a done job, matching the claim token so a run whose lease ran out can't touch a job another run reclaimed
+   */
+  private function deleteJob(DatabaseInterface $db, object $job): void
+  {{
+    $id = (int) $job->id;
+    $query = $db->getQuery(true)
+      ->delete($db->quoteName('{maker.taskQueueRules['table']}'))
+      ->where($db->quoteName('id') . ' = :id')
+      ->where($db->quoteName('claim_token') . ' = :claimToken')
+      ->bind(':id', $id, ParameterType::INTEGER)
+      ->bind(':claimToken', $job->claim_token);
+    $db->setQuery($query)->execute();
+  }}
+
+  /**
+   * Pushes a failed job back by backoff * 2^(attempts - 1) seconds (capped at an hour, plus jitter so retries don't
+   * stampede the downstream system together), or marks it failed for good once it ran $maxAttempts times.
+   * Like deleteJob() it only touches the job while this run's claim token is on it.
+   */
+  private function failJob(DatabaseInterface $db, object $job, string $error, int $maxAttempts, int $backoff): void
+  {{
+    $id = (int) $job->id;
+    $error = mb_substr($error, 0, 4000);
+    $giveUp = (int) $job->attempts >= $maxAttempts;
+    $state = $giveUp ? self::STATE_FAILED : self::STATE_PENDING;
+    $delay = min($backoff * 2 ** max(0, (int) $job->attempts - 1), 3600) + random_int(0, $backoff);
+    $query = $db->getQuery(true)
+      ->update($db->quoteName('{maker.taskQueueRules['table']}'))
+      ->set($db->quoteName('state') . ' = :state')
+      ->set($db->quoteName('claim_token') . ' = NULL')
+      ->set($db->quoteName('locked_until') . ' = NULL')
+      ->set($db->quoteName('last_error') . ' = :lastError')
+      ->where($db->quoteName('id') . ' = :id')
+      ->where($db->quoteName('claim_token') . ' = :claimToken')
+      ->bind(':state', $state, ParameterType::INTEGER)
+      ->bind(':lastError', $error)
+      ->bind(':id', $id, ParameterType::INTEGER)
+      ->bind(':claimToken', $job->claim_token);
+    if (!$giveUp)
+    {{
+      $query->set($db->quoteName('available_at') . ' = UTC_TIMESTAMP() + INTERVAL ' . (int) $delay . ' SECOND');
+    }}
+    $db->setQuery($query)->execute();
+  }}
+"""
+
+def partitionDocBlock(maker):
+  return f"""
+ * Scheduler task maintaining the partitions of {', '.join(rules['table'] for rules in maker.taskPartitionRules)}.
+ * Each run splits the empty catch-all pmax partition into those of the coming periods (no rows move) and drops the
+ * partitions past their retention, which frees their space at once where a DELETE would scan and lock every row."""[1:]
+
+def partitionTasksMapEntry(maker):
+  return f"""
+    '{maker.plgManifestNameField}.partitions' => [
+      'langConstPrefix' => 'PLG_TASK_{maker.plgNameJoomla.upper()}_PARTITIONS',
+      'method'          => 'maintainPartitions',
+    ],
+"""[1:]
+
+def partitionConstants(maker):
+  partitionedTableLines = "".join(f"""
+    '{rules['table']}' => [ 'column' => '{rules['column']}', 'interval' => '{rules['interval']}', 'retention' => {rules['retention']}, 'future' => {rules['future']} ],""" for rules in maker.taskPartitionRules)
+  return f"""
+  // Table => its partitioning (from the table spec): one partition per interval, future ones kept ahead, retention ones kept in all
+  private const PARTITIONED_TABLES = [{partitionedTableLines}
+  ];
+"""
+
+def partitionMethods():
+  return r"""
+  private function maintainPartitions(ExecuteTaskEvent $event): int
+  {
+    $db = Factory::getContainer()->get(DatabaseInterface::class);
+    $now = new \DateTimeImmutable('now', new \DateTimeZone('UTC'));
+    $added = 0;
+    $dropped = 0;
+
+    foreach (self::PARTITIONED_TABLES as $table => $rules)
+    {
+      $tableName = $db->replacePrefix($table);
+      $boundaries = $this->partitionBoundaries($db, $tableName);
+      if (count($boundaries) === 0)
+      {
+        $this->logTask(sprintf('Table %s is not partitioned, skipped', $tableName), 'warning');
+        continue;
+      }
+      $step = new \DateInterval($rules['interval'] === 'day' ? 'P1D' : 'P1M');
+      $nameFormat = $rules['interval'] === 'day' ? 'Ymd' : 'Ym';
+      $periodStart = $rules['interval'] === 'day' ? $now->setTime(0, 0) : $now->modify('first day of this month')->setTime(0, 0);
+
+      // Partitions from the last boundary up to the end of the future periods, split off pmax while it is (still) empty
+      $horizon = $periodStart;
+      for ($i = 0; $i <= $rules['future']; $i++)
+      {
+        $horizon = $horizon->add($step);
+      }
+      $newPartitions = [];
+      for ($start = end($boundaries); $start < $horizon; $start = $start->add($step))
+      {
+        $newPartitions[] = 'PARTITION ' . $db->quoteName('p' . $start->format($nameFormat))
+          . ' VALUES LESS THAN (' . $db->quote($start->add($step)->format('Y-m-d')) . ')';
+      }
+      if (count($newPartitions) > 0)
+      {
+        $db->setQuery(
+          'ALTER TABLE ' . $db->quoteName($tableName) . ' REORGANIZE PARTITION ' . $db->quoteName('pmax') . ' INTO ('
+          . implode(', ', $newPartitions) . ', PARTITION ' . $db->quoteName('pmax') . ' VALUES LESS THAN (MAXVALUE))'
+        )->execute();
+        $added += count($newPartitions);
+      }
+
+      // Partitions whose rows all predate the oldest retained period, the current period is always kept
+      $keepFrom = $periodStart;
+      for ($i = 1; $i < $rules['retention']; $i++)
+      {
+        $keepFrom = $keepFrom->sub($step);
+      }
+      $expired = array_keys(array_filter($boundaries, fn ($boundary) => $boundary <= $keepFrom));
+      if (count($expired) > 0)
+      {
+        $db->setQuery('ALTER TABLE ' . $db->quoteName($tableName) . ' DROP PARTITION ' . implode(', ', $db->quoteName($expired)))->execute();
+        $dropped += count($expired);
+      }
+    }
+
+    $this->logTask(sprintf('Partitions: %d added, %d dropped', $added, $dropped), 'info');
+    return TaskStatus::OK;
+  }
+
+  /**
+   * The partitions of a table in order, name => the date its rows are before (VALUES LESS THAN), without pmax
+   */
+  private function partitionBoundaries(DatabaseInterface $db, string $tableName): array
+  {
+    $query = $db->getQuery(true)
+      ->select($db->quoteName(['PARTITION_NAME', 'PARTITION_DESCRIPTION']))
+      ->from($db->quoteName('INFORMATION_SCHEMA.PARTITIONS'))
+      ->where($db->quoteName('TABLE_SCHEMA') . ' = DATABASE()')
+      ->where($db->quoteName('TABLE_NAME') . ' = :tableName')
+      ->where($db->quoteName('PARTITION_NAME') . ' IS NOT NULL')
+      ->order($db->quoteName('PARTITION_ORDINAL_POSITION'))
+      ->bind(':tableName', $tableName);
+    $boundaries = [];
+    foreach ($db->setQuery($query)->loadObjectList() as $partition)
+    {
+      if ($partition->PARTITION_DESCRIPTION !== 'MAXVALUE')
+      {
+        $boundaries[$partition->PARTITION_NAME] = new \DateTimeImmutable(trim($partition->PARTITION_DESCRIPTION, "'"), new \DateTimeZone('UTC'));
+      }
+    }
+    return $boundaries;
+  }
+"""
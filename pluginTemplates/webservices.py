@@ -0,0 +1,287 @@
+# Template pack of --plugin-type="webservices", the CRUD routes or the --plugin-meta="webservices-granular" routes, see pluginTemplatePacks.py.
+# It is only imported when that type is generated, renderPluginPhpFile() returns the plugin php file.
+
+# --plugin-webservices-rate-limit, ( use lines, RATE_LIMITS const, the listener's first line, the limiter methods ) in the template's indent
+def rateLimitPartials(maker, indent):
+  if ( maker.rateLimitRules is None ):
+    return ( "", "", "", "" )
+  ruleLines = "".join(f"\n\t\t['{method}', '{prefix}', {capacity}, {period}]," for method, prefix, capacity, period in maker.rateLimitRules)
+  usePartial = """
+use Joomla\\CMS\\Factory;
+use Joomla\\CMS\\Uri\\Uri;"""
+  trustedProxiesPartial = ""
+  clientKeyDocPartial = ""
+  clientIpPartial = """
+\t\treturn 'ip:' . Factory::getApplication()->input->server->getString('REMOTE_ADDR', '');"""
+  if ( len(maker.rateLimitTrustedProxies) > 0 ):
+    usePartial += """
+use Joomla\\Utilities\\IpHelper;"""
+    trustedProxiesPartial = f"""
+
+\t/**
+\t * Reverse proxies (IPs or CIDR ranges) whose X-Forwarded-For names the client, any other REMOTE_ADDR is the client itself.
+\t */
+\tprivate const TRUSTED_PROXIES = [{', '.join(f"'{trustedProxy}'" for trustedProxy in maker.rateLimitTrustedProxies)}];"""
+    clientKeyDocPartial = """
+\t * Behind the TRUSTED_PROXIES it is read from X-Forwarded-For, the header is ignored when anyone else sends it."""
+    clientIpPartial = """
+\t\t$server = Factory::getApplication()->input->server;
+\t\t$clientIp = $server->getString('REMOTE_ADDR', '');
+
+\t\tif (!IpHelper::IPinList($clientIp, self::TRUSTED_PROXIES))
+\t\t{
+\t\t\treturn 'ip:' . $clientIp;
+\t\t}
+
+\t\t// Each proxy appends the address it got the request from, the right-most one no trusted proxy sent is the client
+\t\tforeach (array_reverse(array_map('trim', explode(',', $server->getString('HTTP_X_FORWARDED_FOR', '')))) as $forwardedIp)
+\t\t{
+\t\t\tif (filter_var($forwardedIp, FILTER_VALIDATE_IP) === false)
+\t\t\t{
+\t\t\t\tbreak;
+\t\t\t}
+
+\t\t\t$clientIp = $forwardedIp;
+
+\t\t\tif (!IpHelper::IPinList($clientIp, self::TRUSTED_PROXIES))
+\t\t\t{
+\t\t\t\tbreak;
+\t\t\t}
+\t\t}
+
+\t\treturn 'ip:' . $clientIp;"""
+  constPartial = f"""
+
+\t/**
+\t * Token bucket limits checked before any route runs, [ method or '*', path prefix after /api/index.php/, bucket size, seconds to refill it ].
+\t * The first matching limit applies, each with a bucket of its own per client IP.
+\t */
+\tprivate const RATE_LIMITS = [{ruleLines}
+\t];{trustedProxiesPartial}"""
+  callPartial = """
+\t\t$this->enforceRateLimit();
+"""
+  methodsPartial = rf"""
+
+	/**
+	 * Answers a 429 when the request's bucket is empty, before a controller or query runs.
+	 */
+	private function enforceRateLimit(): void
+	{{
+		$app = Factory::getApplication();
+		$method = strtoupper($app->input->getMethod());
+		$routePath = substr(Uri::getInstance()->getPath(), strlen(Uri::base(true)));
+		$routePath = preg_replace('#^/?(index\.php/?)?#', '', $routePath);
+
+		foreach (self::RATE_LIMITS as $ruleIndex => [$ruleMethod, $rulePrefix, $capacity, $period])
+		{{
+			if (($ruleMethod === '*' || $ruleMethod === $method) && strpos($routePath, $rulePrefix) === 0)
+			{{
+				$retryAfter = $this->takeToken($ruleIndex . '|' . $this->rateLimitClientKey(), $capacity, $capacity / $period);
+
+				if ($retryAfter > 0)
+				{{
+					$this->rejectRateLimited($retryAfter);
+				}}
+
+				return;
+			}}
+		}}
+	}}
+
+	/**
+	 * The client IP. The check runs before authentication, so the API token a request carries is not trusted to pick
+	 * its bucket: a client sending a new token every time would get a fresh bucket every time.{clientKeyDocPartial}
+	 */
+	private function rateLimitClientKey(): string
+	{{{clientIpPartial}
+	}}
+
+	/**
+	 * Takes a token from the bucket, returns 0 or the seconds until the next one refills.
+	 * Buckets live in APCu when it is enabled, its fetch and store are not one atomic step so racing requests may overdraw a bucket by a token or two.
+	 * Without APCu they are flock()ed files in the cache folder, an unwritable folder lets requests through rather than take the API down.
+	 * About one request in a hundred deletes the expired files.
+	 */
+	private function takeToken(string $bucketKey, int $capacity, float $refillRate): int
+	{{
+		$now = microtime(true);
+		$bucketHash = hash('sha256', $bucketKey);
+
+		if (function_exists('apcu_enabled') && apcu_enabled())
+		{{
+			$cacheKey = '{maker.plgManifestNameField}_ratelimit_' . $bucketHash;
+			[$bucket, $retryAfter] = $this->refillAndTake(apcu_fetch($cacheKey) ?: null, $capacity, $refillRate, $now);
+			apcu_store($cacheKey, $bucket, (int) ceil($capacity / $refillRate) + 1);
+
+			return $retryAfter;
+		}}
+
+		$bucketFolder = JPATH_CACHE . '/{maker.plgManifestNameField}_ratelimit';
+
+		if (!is_dir($bucketFolder) && !@mkdir($bucketFolder, 0755, true) && !is_dir($bucketFolder))
+		{{
+			return 0;
+		}}
+
+		$handle = @fopen($bucketFolder . '/' . $bucketHash . '.json', 'c+');
+
+		if ($handle === false)
+		{{
+			return 0;
+		}}
+
+		if (!flock($handle, LOCK_EX))
+		{{
+			fclose($handle);
+
+			return 0;
+		}}
+
+		[$bucket, $retryAfter] = $this->refillAndTake(json_decode(stream_get_contents($handle), true), $capacity, $refillRate, $now);
+		ftruncate($handle, 0);
+		rewind($handle);
+		fwrite($handle, json_encode($bucket));
+		fflush($handle);
+		flock($handle, LOCK_UN);
+		fclose($handle);
+
+		if (random_int(1, 100) === 1)
+		{{
+			$this->collectExpiredBuckets($bucketFolder);
+		}}
+
+		return $retryAfter;
+	}}
+
+	/**
+	 * Deletes the bucket files untouched for longer than the longest refill period, those buckets are full again anyway.
+	 * A request racing the delete at worst starts over with a full bucket.
+	 */
+	private function collectExpiredBuckets(string $bucketFolder): void
+	{{
+		$expiredBefore = time() - max(array_column(self::RATE_LIMITS, 3)) - 1;
+
+		foreach (glob($bucketFolder . '/*.json') ?: [] as $bucketFile)
+		{{
+			if (@filemtime($bucketFile) < $expiredBefore)
+			{{
+				@unlink($bucketFile);
+			}}
+		}}
+	}}
+
+	/**
+	 * A [ tokens, microtime ] bucket (null for a new one) -> [ the refilled bucket less the token taken, 0 or the seconds to wait when it was empty ]
+	 */
+	private function refillAndTake(?array $bucket, int $capacity, float $refillRate, float $now): array
+	{{
+		[$tokens, $refilledAt] = is_array($bucket) && count($bucket) === 2 ? $bucket : [$capacity, $now];
+		$tokens = min($capacity, $tokens + max(0, $now - $refilledAt) * $refillRate);
+
+		if ($tokens < 1)
+		{{
+			return [[$tokens, $now], (int) ceil((1 - $tokens) / $refillRate)];
+		}}
+
+		return [[$tokens - 1, $now], 0];
+	}}
+
+	/**
+	 * Sends the JSON:API 429 with its Retry-After and ends the request.
+	 */
+	private function rejectRateLimited(int $retryAfter): void
+	{{
+		$app = Factory::getApplication();
+		$app->setHeader('Status', '429', true);
+		$app->setHeader('Retry-After', (string) $retryAfter, true);
+		$app->setHeader('Content-Type', 'application/vnd.api+json; charset=utf-8', true);
+		$app->sendHeaders();
+		echo json_encode(['errors' => [['status' => '429', 'title' => 'Too Many Requests', 'detail' => 'Rate limit exceeded, retry after ' . $retryAfter . ' seconds.']]]);
+		$app->close();
+	}}"""
+  return ( usePartial, constPartial.replace("\t", indent), callPartial.replace("\t", indent), methodsPartial.replace("\t", indent) )
+
+def renderPluginPhpFile(maker, plgClassName):
+  if ( maker.plgMeta != "webservices-granular" ):
+    rateLimitUsePartial, rateLimitConstPartial, rateLimitCallPartial, rateLimitMethodsPartial = rateLimitPartials(maker, chr(9))
+    if ( rateLimitConstPartial and not maker.plgSubscriber ):
+      rateLimitConstPartial += "\n"
+    routeUsePartial = ""
+    extraRoutesPartial = ""
+    if ( maker.plgWebSvcBatchRoute or maker.plgWebSvcMetricsRoute ):
+      routeUsePartial = """
+use Joomla\Router\Route;"""
+    if ( maker.plgWebSvcBatchRoute ):
+      extraRoutesPartial = f"""
+		/* Many controller.method calls in one round trip, see dispatchBatch() in the component's BatchController */
+		$router->addRoute(
+			new Route(['POST'], 'v1/{maker.plgWebSvcComName.replace("com_", "", 1)}/batch', 'batch.dispatchBatch', [], ['public' => false, 'component' => '{maker.plgWebSvcComName}'])
+		);"""
+    if ( maker.plgWebSvcMetricsRoute ):
+      extraRoutesPartial += f"""
+		/* Per route request, error & latency counters in the Prometheus text format, see the component's MetricsController */
+		$router->addRoute(
+			new Route(['GET'], 'v1/{maker.plgWebSvcComName.replace("com_", "", 1)}/metrics', 'metrics.prometheus', [], ['public' => false, 'component' => '{maker.plgWebSvcComName}'])
+		);"""
+    pluginPhpFileContents = rf"""
+        <?php
+defined('_JEXEC') or die;
+
+use Joomla\CMS\Plugin\CMSPlugin;
+use Joomla\CMS\Router\ApiRouter;{rateLimitUsePartial}{routeUsePartial}{maker.subscriberUsePartial()}
+
+class {plgClassName} extends CMSPlugin{maker.subscriberImplementsPartial()}
+{{
+	protected $autoloadLanguage = true;{rateLimitConstPartial}{maker.subscribedEventsPartial({ "onBeforeApiRoute": "onBeforeApiRoute" }, chr(9), blankLineAfter = True)}
+	{maker.listenerSignature("onBeforeApiRoute", "&$router", [ "$router" ], chr(9))}{rateLimitCallPartial}
+		$router->createCRUDRoutes(
+			'v1/<endpointString>', /* An arbitrary route endpoint string */
+			'<ControllerName>', /* The controller file's <CONTROLLER_NAME> segment in <SITEROOT>/api/components/{maker.plgWebSvcComName}/src/controller/<CONTROLLER_NAME>Controller.php */
+			['component' => '{maker.plgWebSvcComName}']
+		);
+		$router->createCRUDRoutes(
+			'v1/<endpointString>/categories',
+			'categories',
+			['component' => 'com_categories', 'extension' => '{maker.plgWebSvcComName}']
+		);{extraRoutesPartial}
+	}}{rateLimitMethodsPartial}
+}}
+        """[9:]
+    return pluginPhpFileContents
+
+  else:
+    rateLimitUsePartial, rateLimitConstPartial, rateLimitCallPartial, rateLimitMethodsPartial = rateLimitPartials(maker, "  ")
+    webSvcRoutesPartial = maker.renderWebSvcGranularRoutes(maker.webSvcGranularRoutes())
+    pluginPhpFileContents = rf"""
+        <?php
+defined('_JEXEC') or die;
+use Joomla\CMS\Plugin\CMSPlugin;
+use Joomla\Router\Route;
+use Joomla\CMS\Log\Log;{rateLimitUsePartial}{maker.subscriberUsePartial()}
+
+class {plgClassName} extends CMSPlugin{maker.subscriberImplementsPartial()}
+{{
+  protected $autoloadLanguage = true;{rateLimitConstPartial}{maker.subscribedEventsPartial({ "onBeforeApiRoute": "onBeforeApiRoute" }, "  ")}
+
+  {maker.listenerSignature("onBeforeApiRoute", "&$router", [ "$router" ], "  ")}{rateLimitCallPartial}
+    // A nice granular way to do it.
+    // new Route(['HTTP_METHOD'],  'arbitrary/pattern/string',                     '<CONTROLLER_NAME>.<PUBLIC_METHOD_NAME>',               [], $defaults)
+    // Obviously substitute the COMPONENTNAME (lowercase no spaces), <CONTROLLER_NAME> as lowercase, & PUBLIC_METHOD_NAME as camelcase.
+    // controllers are to be placed in [site_root]/api/components/{maker.plgWebSvcComName}/src/Controllers/<CONTROLLER_NAME>Controller.php
+
+    // An 'Airport' component is assumed for the purposes of illustration, please modify this file to match your actual controller class names.
+    // So the 'hangars' controller below would in fact be located at:  [site_root]/api/components/{maker.plgWebSvcComName}/src/Controllers/HangarsController.php
+    // inside of it would be a public method called getHangarsByAirline() etc
+
+    // An obvious example for ease of comprehension
+    $defaults    = array_merge(['public' => false], ['component' => '{maker.plgWebSvcComName}']);
+    $routes = [
+{webSvcRoutesPartial}
+    ];
+    // Finally, register all specified routes with Joomla's webservices router.
+    $router->addRoutes($routes);
+  }}{rateLimitMethodsPartial}
+}}
+        """[9:]
+    return pluginPhpFileContents
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+# Update SQL generated from the diff of two versions of a joomla-tools table spec (see tableSpec.py).
+# The changes of a table are split into ALTER statements by the algorithm and lock MySQL can run them with, and every
+# statement names them: a statement MySQL cannot run that way is refused instead of silently copying the table under
+# a long metadata lock. Changes which do need a table copy or block writes are still generated, marked with a WARNING.
+# The online DDL rules followed are those of InnoDB on MySQL 5.7 / 8.0 with utf8mb4 tables (Joomla's default).
+#   ./schemaMigration.py previous.json current.json --table-prefix="#__generichelloworld_"
+import sys, argparse
+from tableSpec import TableSpec
+
+class SchemaMigration:
+  # Statement order within a table: drop indexes before their columns go, add indexes once their columns exist, remove
+  # partitioning before the primary key loses its column and partition once the key holds it
+  ( phaseRemovePartitioning, phaseDropIndexes, phaseOnlineColumns, phaseSharedColumns, phaseCopyColumns, phasePartitioning,
+    phaseTableOptions, phaseAddIndexes, phaseFulltextIndexes ) = range(9)
+  # MySQL takes a partitioning change or a FULLTEXT index only as the sole change of its ALTER
+  standalonePhases = ( phaseRemovePartitioning, phasePartitioning, phaseFulltextIndexes )
+
+  def __init__(self, previousSpec, currentSpec, tablePrefix):
+    self.previousSpec = previousSpec
+    self.currentSpec = currentSpec
+    self.tablePrefix = tablePrefix
+    self.statements = []
+    self.warnings = []
+    self.diffTables()
+
+  def warn(self, tableName, message):
+    warning = f"table {tableName}: {message}"
+    self.warnings.append(warning)
+    return warning
+
+  def diffTables(self):
+    previousTables = { table["name"]: table for table in self.previousSpec.tables }
+    currentTables = { table["name"]: table for table in self.currentSpec.tables }
+    for table in self.currentSpec.tables:
+      if ( table["name"] not in previousTables ):
+        self.statements.append({ "sql": self.currentSpec.renderCreateTable(table, f"{self.tablePrefix}{table['name']}", dropExisting = False).rstrip("\n"), "warnings": [] })
+      else:
+        self.diffTable(previousTables[table["name"]], table)
+    for table in self.previousSpec.tables:
+      if ( table["name"] not in currentTables ):
+        warning = self.warn(table["name"], "is no longer in the table spec, the update drops it with all of its rows.")
+        self.statements.append({ "sql": f"DROP TABLE IF EXISTS `{self.tablePrefix}{table['name']}`;", "warnings": [ warning ] })
+
+  # ( phase, algorithm, lock, clause, warnings ) per change, rendered into one ALTER per phase
+  def diffTable(self, previousTable, table):
+    tableName = table["name"]
+    changes = []
+    previousColumns = { column["name"]: column for column in previousTable["columns"] }
+    currentColumnNames = [ column["name"] for column in table["columns"] ]
+
+    for position, column in enumerate(table["columns"]):
+      columnDefinition = self.currentSpec.sqlColumnDefinition(column)
+      if ( column["name"] not in previousColumns ):
+        placement = f"AFTER `{currentColumnNames[position - 1]}`" if position > 0 else "FIRST"
+        if ( self.currentSpec.isAutoIncrementColumn(column) ):
+          changes.append(( self.phaseSharedColumns, "INPLACE", "SHARED", f"ADD COLUMN {columnDefinition} {placement}",
+                           [ self.warn(tableName, f"adds the auto-increment column {column['name']}, MySQL blocks writes while it rebuilds the table.") ] ))
+        else:
+          changes.append(( self.phaseOnlineColumns, "INPLACE", "NONE", f"ADD COLUMN {columnDefinition} {placement}", [] ))
+        continue
+      previousColumn = previousColumns[column["name"]]
+      columnWarnings = []
+      if ( not column["nullable"] and previousColumn["nullable"] ):
+        columnWarnings.append(self.warn(tableName, f"makes {column['name']} NOT NULL, the update fails while any row still holds NULL in it."))
+      if ( column["type"] != previousColumn["type"] and not self.isInplaceTypeChange(previousColumn["type"], column["type"]) ):
+        columnWarnings.append(self.warn(tableName, f"changes {column['name']} from {previousColumn['type']} to {column['type']}, MySQL copies the whole table and blocks writes meanwhile. On a large table run it with pt-online-schema-change or gh-ost instead."))
+        changes.append(( self.phaseCopyColumns, "COPY", "SHARED", f"MODIFY COLUMN {columnDefinition}", columnWarnings ))
+      elif ( column["type"] != previousColumn["type"] or column["nullable"] != previousColumn["nullable"] or column["comment"] != previousColumn["comment"] ):
+        changes.append(( self.phaseOnlineColumns, "INPLACE", "NONE", f"MODIFY COLUMN {columnDefinition}", columnWarnings ))
+      elif ( column["default"] != previousColumn["default"] ):
+        defaultClause = f"SET DEFAULT {self.currentSpec.sqlDefault(column)}" if column["default"] is not None else "DROP DEFAULT"
+        changes.append(( self.phaseOnlineColumns, "INPLACE", "NONE", f"ALTER COLUMN `{column['name']}` {defaultClause}", [] ))
+
+    droppedColumnNames = [ name for name in previousColumns if name not in currentColumnNames ]
+    addedColumnNames = [ name for name in currentColumnNames if name not in previousColumns ]
+    for columnName in droppedColumnNames:
+      renameHint = f" If it was renamed to {' or '.join(addedColumnNames)}, edit the update to RENAME COLUMN instead." if addedColumnNames else ""
+      changes.append(( self.phaseOnlineColumns, "INPLACE", "NONE", f"DROP COLUMN `{columnName}`",
+                       [ self.warn(tableName, f"drops the column {columnName} and its data.{renameHint}") ] ))
+
+    if ( table["primaryKey"] != previousTable["primaryKey"] ):
+      changes.append(( self.phaseOnlineColumns, "INPLACE", "NONE", f"DROP PRIMARY KEY, ADD PRIMARY KEY({self.currentSpec.sqlIndexColumns(table['primaryKey'])})",
+                       [ self.warn(tableName, f"changes its primary key to ({', '.join(table['primaryKey'])}), MySQL rebuilds the whole table (writes continue meanwhile).") ] ))
+
+    if ( table["partitioning"] is None and previousTable["partitioning"] is not None ):
+      changes.append(( self.phaseRemovePartitioning, "COPY", "SHARED", "REMOVE PARTITIONING",
+                       [ self.warn(tableName, "is no longer partitioned, MySQL copies the whole table and blocks writes meanwhile.") ] ))
+    elif ( table["partitioning"] is not None and ( previousTable["partitioning"] is None or table["partitioning"]["column"] != previousTable["partitioning"]["column"]
+                                                   or table["partitioning"]["interval"] != previousTable["partitioning"]["interval"] ) ):
+      changes.append(( self.phasePartitioning, "COPY", "SHARED", self.currentSpec.sqlPartitionClause(table).lstrip("\n"),
+                       [ self.warn(tableName, f"is (re)partitioned by {table['partitioning']['column']}, MySQL copies the whole table and blocks writes meanwhile. The partitions start at the generation date, older rows all land in the first one.") ] ))
+
+    tableOptions = []
+    if ( table["rowFormat"] != previousTable["rowFormat"] or table["keyBlockSize"] != previousTable["keyBlockSize"] ):
+      tableOptions.append(f"ROW_FORMAT={table['rowFormat'] or 'DEFAULT'} KEY_BLOCK_SIZE={table['keyBlockSize'] or 0}")
+    if ( table["compression"] != previousTable["compression"] ):
+      tableOptions.append(f"COMPRESSION='{table['compression'] or 'none'}'")
+    if ( len(tableOptions) > 0 ):
+      optionWarnings = []
+      if ( table["rowFormat"] != previousTable["rowFormat"] or table["keyBlockSize"] != previousTable["keyBlockSize"] ):
+        optionWarnings.append(self.warn(tableName, "changes its row format, MySQL rebuilds the whole table (writes continue meanwhile)."))
+      if ( table["compression"] != previousTable["compression"] ):
+        optionWarnings.append(self.warn(tableName, "changes its page compression, which only applies to pages written from now on. Run OPTIMIZE TABLE to (de)compress the existing ones."))
+      changes.append(( self.phaseTableOptions, "INPLACE", "NONE", " ".join(tableOptions), optionWarnings ))
+
+    previousIndexes = { index["name"]: index for index in previousTable["indexes"] + previousTable["plannedIndexes"] }
+    currentIndexes = { index["name"]: index for index in table["indexes"] + table["plannedIndexes"] }
+    for indexName, index in previousIndexes.items():
+      if ( currentIndexes.get(indexName) != index ):
+        changes.append(( self.phaseDropIndexes, "INPLACE", "NONE", f"DROP INDEX `{indexName}`", [] ))
+    for indexName, index in currentIndexes.items():
+      if ( previousIndexes.get(indexName) == index ):
+        continue
+      if ( index["type"] == "FULLTEXT" ):
+        changes.append(( self.phaseFulltextIndexes, "INPLACE", "SHARED", f"ADD {self.currentSpec.sqlIndexDefinition(index)}",
+                         [ self.warn(tableName, f"adds the FULLTEXT index {indexName}, MySQL blocks writes while building it (and rebuilds the table for the first FULLTEXT index).") ] ))
+      else:
+        changes.append(( self.phaseAddIndexes, "INPLACE", "NONE", f"ADD {self.currentSpec.sqlIndexDefinition(index)}", [] ))
+
+    self.statements += self.groupChanges(tableName, changes)
+
+  # One ALTER per phase (MySQL builds several indexes or column changes in a single pass), standalone changes one at a time
+  def groupChanges(self, tableName, changes):
+    statements = []
+    for phase in sorted(set(change[0] for change in changes)):
+      phaseChanges = [ change for change in changes if change[0] == phase ]
+      batches = [ [ change ] for change in phaseChanges ] if phase in self.standalonePhases else [ phaseChanges ]
+      for batch in batches:
+        algorithm, lock = batch[0][1], batch[0][2]
+        clauses = ",\n    ".join(change[3] for change in batch)
+        # Partition options must come last in an ALTER, after the ALGORITHM and LOCK clauses
+        if ( phase in ( self.phaseRemovePartitioning, self.phasePartitioning ) ):
+          sql = f"ALTER TABLE `{self.tablePrefix}{tableName}`\n    ALGORITHM={algorithm}, LOCK={lock}\n{clauses};"
+        else:
+          sql = f"ALTER TABLE `{self.tablePrefix}{tableName}`\n    {clauses},\n    ALGORITHM={algorithm}, LOCK={lock};"
+        statements.append({ "sql": sql,
+                            "warnings": [ warning for change in batch for warning in change[4] ] })
+    return statements
+
+  # Widening a VARCHAR is done in place as long as its length prefix stays 1 byte (up to 255 bytes) or was 2 bytes already
+  def isInplaceTypeChange(self, previousType, currentType):
+    previousLength = self.varcharLength(previousType)
+    currentLength = self.varcharLength(currentType)
+    if ( previousLength is None or currentLength is None or currentLength < previousLength ):
+      return False
+    return ( previousLength * 4 <= 255 ) == ( currentLength * 4 <= 255 )
+
+  def varcharLength(self, columnType):
+    typeName, bracket, typeArgs = columnType.partition("(")
+    if ( typeName.strip() != "VARCHAR" or not bracket or typeArgs.split(")")[1].strip() != "" ):
+      return None
+    return int(typeArgs.split(")")[0])
+
+  def renderUpdateSql(self, title):
+    if ( len(self.statements) == 0 ):
+      return f"/* {title}: no schema changes since the previous table spec. */\n"
+    renderedStatements = []
+    for statement in self.statements:
+      warningLines = "".join(f"/* WARNING: {warning} */\n" for warning in statement["warnings"])
+      renderedStatements.append(f"{warningLines}{statement['sql']}\n")
+    return f"""/* {title}, generated from the table spec diff.
+ * Every ALTER names the ALGORITHM and LOCK it needs, MySQL refuses it rather than copy the table under a metadata lock.
+ * Statements marked with a WARNING do copy or block writes, schedule them (or an online schema change tool) accordingly. */
+
+""" + "\n".join(renderedStatements)
+
+  def printWarnings(self):
+    for warning in self.warnings:
+      print(f"WARNING (schema migration): {warning}")
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description='Print the update SQL migrating a joomla-tools table spec to its next version.', allow_abbrev=False)
+  parser.add_argument('previous', help="""Path to the previous version's table spec JSON file""")
+  parser.add_argument('current', help="""Path to the current version's table spec JSON file""")
+  parser.add_argument('--table-prefix', required=True, metavar='e.g. --table-prefix="#__generichelloworld_"', help="""The prefix put before every spec table name""")
+  args = parser.parse_args()
+  migration = SchemaMigration(TableSpec.fromFile(args.previous), TableSpec.fromFile(args.current), args.table_prefix)
+  for warning in migration.warnings:
+    print(f"WARNING (schema migration): {warning}", file = sys.stderr)
+  print(migration.renderUpdateSql(f"Update from {args.previous} to {args.current}"), end = "")
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+
+# Bulk seed data generation for the tables of a joomla-tools table spec (see tableSpec.py)
+# Rows are streamed from a CSV file or a synthetic generator into batched multi-row INSERT statements,
+# each statement kept under max_allowed_packet and the lot wrapped in periodic transactions.
+# Nothing but the statement being assembled is held in memory, so tens of millions of rows are fine.
+#
+# Synthetic values follow the optional "seed" distribution of each spec column, e.g.
+#   { "name": "age",     "type": "TINYINT", "seed": { "kind": "int", "min": 18, "max": 90 } }
+#   { "name": "state",   "type": "VARCHAR(2)", "seed": { "kind": "choice", "values": [ "CA", "NY", "TX" ], "weights": [ 5, 3, 2 ] } }
+#   { "name": "created", "type": "DATETIME", "seed": { "kind": "datetime", "start": "2020-01-01", "end": "2024-12-31" } }
+#   { "name": "city",    "type": "VARCHAR(128)", "seed": { "kind": "text", "minLength": 4, "maxLength": 16, "nullRatio": 0.1 } }
+# Other kinds are "sequence" (start, step), "float" (min, max, decimals) and "skip". Columns without a "seed" get a
+# distribution derived from their type, auto-increment columns are left to the database.
+# The load runs with unique_checks off, so every unique key (the primary key and each UNIQUE index) must come out unique:
+# keys holding an auto-increment column already do, for the others the generator makes one "sequence", "int", "text"
+# or "datetime" column unique by the row number. Keys it can't vouch for (CSV rows included) keep unique_checks on.
+import csv, random, argparse
+from datetime import datetime, timedelta
+from tableSpec import TableSpec
+
+class SeedDataWriter:
+  # Headroom kept under max_allowed_packet for the statement framing and the server's own packet header
+  packetHeadroom = 1024
+
+  def __init__(self, tableSpec, table, fullTableName, maxAllowedPacket = 4194304, rowsPerTransaction = 100000, deferIndexes = False,
+               packetFlagName = "--max-allowed-packet"):
+    self.tableSpec = tableSpec
+    self.table = table
+    self.fullTableName = fullTableName
+    self.maxStatementBytes = maxAllowedPacket - self.packetHeadroom
+    self.rowsPerTransaction = rowsPerTransaction
+    self.deferIndexes = deferIndexes
+    self.packetFlagName = packetFlagName
+    # Unique keys whose values the rows may repeat, the load keeps unique_checks (and their indexes) on for them
+    self.uncheckedUniqueKeys = []
+    if ( self.maxStatementBytes < 4096 ):
+      raise Exception(f"max_allowed_packet of {maxAllowedPacket} bytes is too small to seed with, MySQL's own minimum is 1024 bytes and a useful batch needs at least a few KB.")
+
+  def secondaryIndexes(self):
+    return self.table["indexes"] + self.table["plannedIndexes"]
+
+  # The primary key and every UNIQUE index, as lists of index columns (which may carry a prefix length)
+  def uniqueKeys(self):
+    return [ self.table["primaryKey"] ] + [ index["columns"] for index in self.table["indexes"] if index["type"] == "UNIQUE" ]
+
+  # A key holding an auto-increment column is unique whatever the other columns hold
+  def isDatabaseUniqueKey(self, uniqueKey):
+    return any(self.tableSpec.isAutoIncrementColumn(self.tableSpec.column(self.table, self.tableSpec.bareColumn(c))) for c in uniqueKey)
+
+  # Drops the secondary indexes before loading and rebuilds them in one ALTER afterwards, a single sorted build
+  # is much cheaper than maintaining every index row by row during the load.
+  def deferredIndexStatements(self):
+    secondaryIndexes = self.secondaryIndexes()
+    if ( len(self.uncheckedUniqueKeys) > 0 ):
+      # The UNIQUE indexes stay in place to check the rows as they load
+      secondaryIndexes = [ index for index in secondaryIndexes if index["type"] != "UNIQUE" ]
+    if ( not self.deferIndexes or len(secondaryIndexes) == 0 ):
+      return ( "", "" )
+    dropStatement = f"ALTER TABLE `{self.fullTableName}` " + ", ".join(f"DROP INDEX `{index['name']}`" for index in secondaryIndexes) + ";\n"
+    addStatement = f"ALTER TABLE `{self.fullTableName}` " + ", ".join(f"ADD {self.tableSpec.sqlIndexDefinition(index)}" for index in secondaryIndexes) + ";\n"
+    return ( dropStatement, addStatement )
+
+  # Writes all rows (dicts keyed by column name) to outPath, returns the number of rows written
+  def write(self, rows, columnNames, outPath):
+    insertPrefix = f"INSERT INTO `{self.fullTableName}` ({', '.join(f'`{c}`' for c in columnNames)}) VALUES\n"
+    insertPrefixBytes = len(insertPrefix.encode("utf-8"))
+    dropIndexes, addIndexes = self.deferredIndexStatements()
+    rowCount = 0
+    rowsInTransaction = 0
+    with open(outPath, "wt", encoding = "utf-8") as seedHandle:
+      seedHandle.write(f"/* Seed data for {self.fullTableName}, generated by seedData.py */\n")
+      seedHandle.write("SET @seed_unique_checks = @@unique_checks, @seed_foreign_key_checks = @@foreign_key_checks;\n")
+      if ( len(self.uncheckedUniqueKeys) > 0 ):
+        uncheckedKeyNames = "; ".join(", ".join(uniqueKey) for uniqueKey in self.uncheckedUniqueKeys)
+        seedHandle.write(f"/* unique_checks stay on, the rows may repeat values of the unique key(s) {uncheckedKeyNames} */\n")
+        seedHandle.write("SET autocommit = 0, foreign_key_checks = 0;\n")
+      else:
+        seedHandle.write("SET autocommit = 0, unique_checks = 0, foreign_key_checks = 0;\n")
+      seedHandle.write(dropIndexes)
+      seedHandle.write("START TRANSACTION;\n")
+      statementTuples = []
+      statementBytes = insertPrefixBytes
+      for row in rows:
+        rowTuple = "(" + ", ".join(self.sqlCell(columnName, row.get(columnName)) for columnName in columnNames) + ")"
+        rowTupleBytes = len(rowTuple.encode("utf-8")) + 2
+        if ( insertPrefixBytes + rowTupleBytes > self.maxStatementBytes ):
+          raise Exception(f"Row {rowCount + 1} alone is {rowTupleBytes} bytes, larger than max_allowed_packet allows, please raise {self.packetFlagName}.")
+        if ( statementBytes + rowTupleBytes > self.maxStatementBytes ):
+          seedHandle.write(insertPrefix + ",\n".join(statementTuples) + ";\n")
+          statementTuples = []
+          statementBytes = insertPrefixBytes
+        statementTuples.append(rowTuple)
+        statementBytes += rowTupleBytes
+        rowCount += 1
+        rowsInTransaction += 1
+        if ( rowsInTransaction >= self.rowsPerTransaction ):
+          seedHandle.write(insertPrefix + ",\n".join(statementTuples) + ";\n")
+          seedHandle.write("COMMIT;\nSTART TRANSACTION;\n")
+          statementTuples = []
+          statementBytes = insertPrefixBytes
+          rowsInTransaction = 0
+      if ( len(statementTuples) > 0 ):
+        seedHandle.write(insertPrefix + ",\n".join(statementTuples) + ";\n")
+      seedHandle.write("COMMIT;\n")
+      seedHandle.write(addIndexes)
+      seedHandle.write("SET unique_checks = @seed_unique_checks, foreign_key_checks = @seed_foreign_key_checks, autocommit = 1;\n")
+    return rowCount
+
+  def sqlCell(self, columnName, value):
+    column = self.tableSpec.column(self.table, columnName)
+    if ( value is None or (value == "" and column["nullable"]) ):
+      return "NULL"
+    if ( self.tableSpec.isIntegerColumn(column) and str(value).lstrip("-").isdigit() ):
+      return str(int(value))
+    return self.tableSpec.sqlValue(value)
+
+  # Auto-increment columns are assigned by the database
+  def seededColumnNames(self):
+    return [ column["name"] for column in self.table["columns"]
+             if not self.tableSpec.isAutoIncrementColumn(column) and (column["seed"] or {}).get("kind") != "skip" ]
+
+##########################################################################################################
+############################################## Row sources ###############################################
+##########################################################################################################
+
+# Streams rows from a CSV file whose header row names the columns, returns ( rowIterator, columnNames )
+def csvRows(csvPath, tableSpec, table):
+  csvHandle = open(csvPath, "rt", newline = "", encoding = "utf-8")
+  csvReader = csv.DictReader(csvHandle)
+  columnNames = csvReader.fieldnames or []
+  tableColumnNames = [ column["name"] for column in table["columns"] ]
+  for columnName in columnNames:
+    if ( columnName not in tableColumnNames ):
+      csvHandle.close()
+      raise Exception(f"""The CSV column "{columnName}" of {csvPath} is not a column of table "{table['name']}".""")
+  def rowIterator():
+    with csvHandle:
+      for row in csvReader:
+        yield row
+  return ( rowIterator(), columnNames )
+
+def defaultDistribution(tableSpec, column):
+  baseType = column["type"].split("(")[0].split()[0]
+  if ( tableSpec.isIntegerColumn(column) ):
+    upperBounds = { "TINYINT": 127, "SMALLINT": 32767, "MEDIUMINT": 8388607 }
+    return { "kind": "int", "min": 0, "max": upperBounds.get(baseType, 2147483647) }
+  if ( baseType in ( "DECIMAL", "NUMERIC", "FLOAT", "DOUBLE", "REAL" ) ):
+    return { "kind": "float", "min": 0, "max": 10000, "decimals": 2 }
+  if ( baseType in ( "DATETIME", "TIMESTAMP", "DATE" ) ):
+    return { "kind": "datetime", "start": "2020-01-01", "end": "2025-01-01", "dateOnly": baseType == "DATE" }
+  if ( baseType in ( "CHAR", "VARCHAR" ) and "(" in column["type"] ):
+    maxLength = int(column["type"].split("(")[1].split(")")[0])
+    return { "kind": "text", "minLength": min(4, maxLength), "maxLength": min(32, maxLength) }
+  if ( baseType == "JSON" ):
+    return { "kind": "choice", "values": [ "{}" ] }
+  return { "kind": "text", "minLength": 16, "maxLength": 200 }
+
+def columnDistributions(tableSpec, table, columnNames):
+  distributions = {}
+  for columnName in columnNames:
+    column = tableSpec.column(table, columnName)
+    distributions[columnName] = column["seed"] if column["seed"] else defaultDistribution(tableSpec, column)
+  return distributions
+
+# Kinds a column can be made unique in by the row number, in order of preference ("sequence" already is)
+uniqueKinds = ( "sequence", "int", "text", "datetime" )
+
+# Picks the column the generator makes unique for each unique key the database doesn't number itself.
+# Returns ( the columns to make unique, the keys none of whose columns can be )
+def planUniqueColumns(seedWriter, columnNames, distributions):
+  uniqueColumnNames = []
+  uncheckedUniqueKeys = []
+  for uniqueKey in seedWriter.uniqueKeys():
+    if ( seedWriter.isDatabaseUniqueKey(uniqueKey) or any(c in uniqueColumnNames for c in uniqueKey) ):
+      continue
+    # A prefix indexed column is only unique in its prefix, the row number may not fit in it
+    candidates = [ c for c in uniqueKey if c in columnNames and distributions[c].get("kind") in uniqueKinds
+                   and (distributions[c].get("kind") != "sequence" or distributions[c].get("step", 1) != 0) ]
+    if ( len(candidates) == 0 ):
+      uncheckedUniqueKeys.append(uniqueKey)
+      continue
+    uniqueColumnNames.append(min(candidates, key = lambda c: uniqueKinds.index(distributions[c].get("kind"))))
+  return ( uniqueColumnNames, uncheckedUniqueKeys )
+
+# Generates rowCount synthetic rows, the uniqueColumnNames hold a different value in every row. Returns ( rowIterator, columnNames )
+def syntheticRows(rowCount, tableSpec, table, columnNames, randomSeed = None, uniqueColumnNames = ()):
+  rng = random.Random(randomSeed)
+  alphabet = "abcdefghijklmnopqrstuvwxyz"
+  distributions = columnDistributions(tableSpec, table, columnNames)
+
+  # The row number makes the value unique: counted up from "min" / "start", or the digits ending a text
+  # (the rest of which is letters, so no two row numbers give the same text)
+  def uniqueValue(columnName, distribution, rowNumber):
+    kind = distribution.get("kind")
+    if ( kind == "int" ):
+      if ( distribution.get("min", 0) + rowCount - 1 > distribution.get("max", 2147483647) ):
+        raise Exception(f"""The seed range of the unique column "{columnName}" holds fewer than {rowCount} values, please widen its "min" / "max" or seed fewer rows.""")
+      return distribution.get("min", 0) + rowNumber
+    if ( kind == "text" ):
+      rowDigits = str(rowNumber)
+      if ( len(str(rowCount - 1)) > distribution.get("maxLength", 16) ):
+        raise Exception(f"""The unique column "{columnName}" can't hold {rowCount} different seed texts of at most {distribution.get('maxLength', 16)} characters, please raise its "maxLength" or seed fewer rows.""")
+      textLength = max(rng.randint(distribution.get("minLength", 4), distribution.get("maxLength", 16)), len(rowDigits))
+      return "".join(rng.choice(alphabet) for _ in range(textLength - len(rowDigits))) + rowDigits
+    if ( kind == "datetime" ):
+      # One second (or day) apart from "start" on
+      start = datetime.fromisoformat(distribution.get("start", "2020-01-01"))
+      if ( distribution.get("dateOnly") ):
+        return (start + timedelta(days = rowNumber)).strftime("%Y-%m-%d")
+      return (start + timedelta(seconds = rowNumber)).strftime("%Y-%m-%d %H:%M:%S")
+    return None
+
+  def sampleValue(columnName, distribution, rowNumber):
+    if ( rng.random() < distribution.get("nullRatio", 0) ):
+      return None
+    kind = distribution.get("kind")
+    if ( columnName in uniqueColumnNames and kind != "sequence" ):
+      return uniqueValue(columnName, distribution, rowNumber)
+    if ( kind == "sequence" ):
+      return distribution.get("start", 1) + rowNumber * distribution.get("step", 1)
+    if ( kind == "int" ):
+      return rng.randint(distribution.get("min", 0), distribution.get("max", 2147483647))
+    if ( kind == "float" ):
+      return round(rng.uniform(distribution.get("min", 0), distribution.get("max", 1)), distribution.get("decimals", 2))
+    if ( kind == "choice" ):
+      return rng.choices(distribution["values"], weights = distribution.get("weights"))[0]
+    if ( kind == "datetime" ):
+      start = datetime.fromisoformat(distribution.get("start", "2020-01-01")).timestamp()
+      end = datetime.fromisoformat(distribution.get("end", "2025-01-01")).timestamp()
+      sampled = datetime.fromtimestamp(rng.uniform(start, end))
+      return sampled.strftime("%Y-%m-%d" if distribution.get("dateOnly") else "%Y-%m-%d %H:%M:%S")
+    if ( kind == "text" ):
+      return "".join(rng.choice(alphabet) for _ in range(rng.randint(distribution.get("minLength", 4), distribution.get("maxLength", 16))))
+    raise Exception(f"""Unknown seed distribution kind "{kind}", please use one of: sequence, int, float, choice, datetime, text, skip.""")
+
+  def rowIterator():
+    for rowNumber in range(rowCount):
+      yield { columnName: sampleValue(columnName, distributions[columnName], rowNumber) for columnName in columnNames }
+  return ( rowIterator(), columnNames )
+
+# Shared entry point of the CLI below and of componentMaker.py/pluginMaker.py, returns the number of rows written
+# packetFlagName is the caller's name of the max_allowed_packet option, for the error message of an oversized row
+def writeSeedFile(tableSpec, tableName, fullTableName, outPath, rowCount = None, csvPath = None, maxAllowedPacket = 4194304,
+                  rowsPerTransaction = 100000, deferIndexes = False, randomSeed = None, packetFlagName = "--max-allowed-packet"):
+  matchingTables = [ table for table in tableSpec.tables if table["name"] == tableName ]
+  if ( len(matchingTables) == 0 ):
+    raise Exception(f"""The table "{tableName}" is not declared in the table spec {tableSpec.source}.""")
+  table = matchingTables[0]
+  seedWriter = SeedDataWriter(tableSpec, table, fullTableName, maxAllowedPacket, rowsPerTransaction, deferIndexes, packetFlagName)
+  if ( csvPath is not None ):
+    rows, columnNames = csvRows(csvPath, tableSpec, table)
+    seedWriter.uncheckedUniqueKeys = [ uniqueKey for uniqueKey in seedWriter.uniqueKeys() if not seedWriter.isDatabaseUniqueKey(uniqueKey) ]
+  else:
+    columnNames = seedWriter.seededColumnNames()
+    uniqueColumnNames, seedWriter.uncheckedUniqueKeys = planUniqueColumns(seedWriter, columnNames, columnDistributions(tableSpec, table, columnNames))
+    rows, columnNames = syntheticRows(rowCount, tableSpec, table, columnNames, randomSeed, uniqueColumnNames)
+  return seedWriter.write(rows, columnNames, outPath)
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description='Write a bulk seed SQL file for a table of a joomla-tools table spec.', allow_abbrev=False)
+  parser.add_argument('--table-spec',         required=False, metavar='e.g. --table-spec="./tables.json"',
+                      help="""OPTIONAL: Path to the table spec JSON file, defaults to the illustrative storage_table_1""")
+  parser.add_argument('--table',              required=False, metavar='e.g. --table="storage_table_1"',
+                      help="""OPTIONAL: The spec table to seed, defaults to the first table of the spec""")
+  parser.add_argument('--table-prefix',       required=True,  metavar='e.g. --table-prefix="jos_generichelloworld_"',
+                      help="""The prefix put before the spec table name, use your site's real database prefix when loading with the mysql client""")
+  parser.add_argument('--out',                required=True,  metavar='e.g. --out="./seed.sql"', help="""The seed SQL file to write""")
+  rowSourceGroup = parser.add_mutually_exclusive_group(required=True)
+  rowSourceGroup.add_argument('--rows',       type=int,       metavar='e.g. --rows=10000000', help="""Number of synthetic rows to generate""")
+  rowSourceGroup.add_argument('--csv',                        metavar='e.g. --csv="./rows.csv"', help="""CSV file (with a header row naming the columns) to stream rows from""")
+  parser.add_argument('--max-allowed-packet', type=int,       default=4194304, help="""OPTIONAL: The server's max_allowed_packet in bytes, no INSERT will exceed it. Defaults to 4194304 (4MB)""")
+  parser.add_argument('--rows-per-transaction', type=int,     default=100000, help="""OPTIONAL: Rows committed per transaction. Defaults to 100000""")
+  parser.add_argument('--defer-indexes',      default=False,  action='store_true', help="""OPTIONAL: Drop the secondary indexes before loading and rebuild them once afterwards""")
+  parser.add_argument('--random-seed',        type=int,       help="""OPTIONAL: Makes synthetic data reproducible""")
+  args = parser.parse_args()
+  spec = TableSpec.fromFile(args.table_spec) if args.table_spec is not None else TableSpec.default()
+  seedTableName = args.table if args.table is not None else spec.tables[0]["name"]
+  writtenRows = writeSeedFile(spec, seedTableName, f"{args.table_prefix}{seedTableName}", args.out, rowCount = args.rows, csvPath = args.csv,
+                              maxAllowedPacket = args.max_allowed_packet, rowsPerTransaction = args.rows_per_transaction,
+                              deferIndexes = args.defer_indexes, randomSeed = args.random_seed)
+  print(f"Wrote {writtenRows} seed rows for {args.table_prefix}{seedTableName} to {args.out}")
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+
+# Declarative table schema spec shared by componentMaker.py and pluginMaker.py
+# A spec is a JSON file of the following form (only "name" and "columns" are required per table):
+#
+# {
+#   "tables": [
+#     {
+#       "name": "storage_table_1",
+#       "controller": "users",
+#       "columns": [
+#         { "name": "id",    "type": "SERIAL",       "nullable": false, "comment": "The auto-increment pk" },
+#         { "name": "name",  "type": "VARCHAR(255)", "nullable": false },
+#         { "name": "city",  "type": "VARCHAR(128)" },
+#         { "name": "state", "type": "VARCHAR(128)" }
+#       ],
+#       "primaryKey": [ "id" ],
+#       "indexes": [ { "name": "idx_name", "columns": [ "name" ], "type": "UNIQUE" } ],
+#       "autoIndexes": true,
+#       "queries": [
+#         { "name": "byStateAndCity", "equality": [ "state", "city" ], "orderBy": [ "name" ], "select": [ "id", "name" ] },
+#         { "name": "byIdRange", "range": "id" }
+#       ],
+#       "seedRows": [ { "name": "Example.com" } ],
+#       "apiFields": [ "name", "city", "state" ]
+#     }
+#   ]
+# }
+#
+# Append-heavy tables (events, logs) may also declare their storage, e.g.
+#   "partitioning": { "column": "created", "interval": "month", "retention": 12, "future": 3 },
+#   "rowFormat": "COMPRESSED", "keyBlockSize": 8
+# "partitioning" creates the table RANGE partitioned by the DATE / DATETIME column, one partition per day or month
+# plus an empty catch-all pmax. The scheduler task of pluginMaker.py --task-partition-spec keeps "future" partitions
+# ahead and drops those older than "retention" periods. "rowFormat" / "keyBlockSize" set InnoDB table compression,
+# "compression" ("zlib" or "lz4") transparent page compression instead (which needs hole punching support).
+#
+# Every declared query is a lookup the generated code performs: equality columns, at most one range column,
+# and an ordering. When "autoIndexes" is on (the default) a matching composite index is planned for each query,
+# extended to a covering index when the query declares its "select" list. The lint reports declared queries
+# that no index (primary key, explicit or planned) supports.
+# "apiFields" whitelists the columns the generated APIs read and serialize (sparse fieldsets pick among them), the
+# primary key is always included. It defaults to every column.
+import sys, json, argparse, datetime
+
+class TableSpec:
+  # MySQL refuses identifiers longer than this
+  maxIdentifierLength = 64
+  # Column types which can only be indexed with a prefix length, so they are never put into planned indexes
+  unindexableTypes = ( "TEXT", "TINYTEXT", "MEDIUMTEXT", "LONGTEXT", "BLOB", "TINYBLOB", "MEDIUMBLOB", "LONGBLOB", "JSON" )
+
+  def __init__(self, specDict, source = "<built-in>"):
+    self.source = source
+    if ( type(specDict) is not dict or type(specDict.get("tables")) is not list or len(specDict["tables"]) == 0 ):
+      raise Exception(f"""The table spec {source} must be a JSON object holding a non empty "tables" list.""")
+    self.tables = [ self.normalizeTable(table) for table in specDict["tables"] ]
+    for table in self.tables:
+      table["plannedIndexes"] = self.planIndexes(table) if table["autoIndexes"] else []
+
+  @classmethod
+  def fromFile(cls, specPath):
+    with open(specPath, "rt") as specHandle:
+      return cls(json.load(specHandle), source = specPath)
+
+  # The spec equivalent of the illustrative table both makers always generated: no queries, no secondary indexes.
+  @classmethod
+  def default(cls, tableName = "storage_table_1"):
+    return cls({ "tables": [ {
+      "name": tableName,
+      "columns": [
+        { "name": "id",           "type": "SERIAL",       "nullable": False, "comment": f"The auto-increment pk of this i.e. {tableName} table" },
+        { "name": "name",         "type": "VARCHAR(255)", "nullable": False, "comment": "Required (can't be null) name field" },
+        { "name": "address",      "type": "VARCHAR(255)", "comment": f"Example 'Address' field of {tableName} if no value provided, will be NULL" },
+        { "name": "city",         "type": "VARCHAR(128)", "comment": f"Example 'City' field of {tableName} if no value provided, will be NULL" },
+        { "name": "state",        "type": "VARCHAR(128)", "comment": f"Example 'State' field of {tableName} if no value provided, will be NULL" },
+        { "name": "zip_postcode", "type": "MEDIUMINT",    "comment": f"Example 'Postal code' field of {tableName} if no value provided, will be NULL" },
+      ],
+      "primaryKey": [ "id" ],
+      "seedRows": [ { "name": "Example.com" }, { "name": "Foo Bar Bat" } ],
+    } ] })
+
+  def normalizeTable(self, table):
+    if ( type(table) is not dict or not table.get("name") or type(table.get("columns")) is not list or len(table["columns"]) == 0 ):
+      raise Exception(f"""Every table in {self.source} needs a "name" and a non empty "columns" list.""")
+    tableName = table["name"]
+    columns = []
+    for column in table["columns"]:
+      if ( type(column) is not dict or not column.get("name") or not column.get("type") ):
+        raise Exception(f"""Table "{tableName}" in {self.source}: every column needs a "name" and a "type".""")
+      columns.append({
+        "name": column["name"],
+        "type": column["type"].upper(),
+        # SERIAL is BIGINT UNSIGNED NOT NULL AUTO_INCREMENT UNIQUE, it can never be NULL
+        "nullable": column.get("nullable", True) and column["type"].upper() != "SERIAL",
+        "default": column.get("default"),
+        "comment": column.get("comment"),
+        "seed": column.get("seed"),
+      })
+    columnNames = [ column["name"] for column in columns ]
+
+    primaryKey = table.get("primaryKey", [ columnNames[0] ])
+    indexes = []
+    for idx, index in enumerate(table.get("indexes", [])):
+      indexType = index.get("type", "INDEX").upper()
+      if ( indexType not in ( "INDEX", "UNIQUE", "FULLTEXT" ) ):
+        raise Exception(f"""Table "{tableName}" in {self.source}: index type "{indexType}" must be one of INDEX, UNIQUE or FULLTEXT.""")
+      indexes.append({ "name": index.get("name", self.indexName([ self.bareColumn(c) for c in index["columns"] ])), "columns": list(index["columns"]), "type": indexType })
+
+    queries = []
+    for query in table.get("queries", []):
+      rangeColumn = query.get("range")
+      queries.append({
+        "name": query["name"],
+        "equality": list(query.get("equality", [])),
+        "range": rangeColumn,
+        "orderBy": [ self.parseOrderBy(order) for order in query.get("orderBy", []) ],
+        "select": list(query.get("select", [])),
+      })
+
+    apiFields = list(table.get("apiFields", columnNames))
+
+    # Every column a key, index or query refers to must exist
+    for referencedColumn in ( primaryKey + apiFields
+                              + [ self.bareColumn(c) for index in indexes for c in index["columns"] ]
+                              + [ c for query in queries for c in query["equality"] + query["select"] + ([ query["range"] ] if query["range"] else []) ]
+                              + [ order[0] for query in queries for order in query["orderBy"] ] ):
+      if ( referencedColumn not in columnNames ):
+        raise Exception(f"""Table "{tableName}" in {self.source} refers to the unknown column "{referencedColumn}".""")
+
+    partitioning = self.normalizePartitioning(table, columns, primaryKey, indexes)
+    rowFormat = table.get("rowFormat", "").upper() or None
+    if ( rowFormat not in ( None, "DYNAMIC", "COMPACT", "REDUNDANT", "COMPRESSED" ) ):
+      raise Exception(f"""Table "{tableName}" in {self.source}: "rowFormat" must be one of DYNAMIC, COMPACT, REDUNDANT or COMPRESSED.""")
+    keyBlockSize = table.get("keyBlockSize")
+    if ( keyBlockSize is not None and ( rowFormat != "COMPRESSED" or keyBlockSize not in ( 1, 2, 4, 8, 16 ) ) ):
+      raise Exception(f"""Table "{tableName}" in {self.source}: "keyBlockSize" (1, 2, 4, 8 or 16 KB) only applies with "rowFormat": "COMPRESSED".""")
+    compression = table.get("compression", "").lower() or None
+    if ( compression not in ( None, "zlib", "lz4", "none" ) ):
+      raise Exception(f"""Table "{tableName}" in {self.source}: "compression" must be one of zlib, lz4 or none.""")
+    if ( compression is not None and rowFormat == "COMPRESSED" ):
+      raise Exception(f"""Table "{tableName}" in {self.source}: page "compression" can't be combined with "rowFormat": "COMPRESSED", please pick one.""")
+
+    return {
+      "name": tableName,
+      "controller": table.get("controller"),
+      "columns": columns,
+      "primaryKey": primaryKey,
+      "indexes": indexes,
+      "autoIndexes": table.get("autoIndexes", True),
+      "queries": queries,
+      "seedRows": table.get("seedRows", []),
+      "apiFields": apiFields,
+      "partitioning": partitioning,
+      "rowFormat": rowFormat,
+      "keyBlockSize": keyBlockSize,
+      "compression": compression,
+    }
+
+  # MySQL only partitions a table when every unique key holds the partition column, and never one with a FULLTEXT index
+  def normalizePartitioning(self, table, columns, primaryKey, indexes):
+    partitioning = table.get("partitioning")
+    if ( partitioning is None ):
+      return None
+    where = f"""Table "{table['name']}" in {self.source}"""
+    columnName = partitioning.get("column") if type(partitioning) is dict else None
+    partitionColumn = next((column for column in columns if column["name"] == columnName), None)
+    if ( partitionColumn is None ):
+      raise Exception(f"""{where}: "partitioning" needs the "column" holding each row's date, one of the table's columns.""")
+    if ( partitionColumn["type"].split("(")[0] not in ( "DATE", "DATETIME" ) or partitionColumn["nullable"] ):
+      raise Exception(f"""{where}: the partition column "{columnName}" must be a NOT NULL DATE or DATETIME column.""")
+    interval = partitioning.get("interval", "month")
+    if ( interval not in ( "day", "month" ) ):
+      raise Exception(f"""{where}: the partitioning "interval" must be "day" or "month".""")
+    for countName, countDefault in ( ( "retention", 12 ), ( "future", 3 ) ):
+      if ( type(partitioning.get(countName, countDefault)) is not int or partitioning.get(countName, countDefault) < 1 ):
+        raise Exception(f"""{where}: the partitioning "{countName}" must be a number of {interval}s, 1 or more.""")
+    if ( columnName not in primaryKey or any(columnName not in [ self.bareColumn(c) for c in index["columns"] ] for index in indexes if index["type"] == "UNIQUE") ):
+      raise Exception(f"""{where}: the primary key and every UNIQUE index must include the partition column "{columnName}", e.g. "primaryKey": [ "id", "{columnName}" ].""")
+    if ( any(column["type"] == "SERIAL" for column in columns) ):
+      raise Exception(f"""{where}: SERIAL implies a UNIQUE key without the partition column, please use "BIGINT UNSIGNED AUTO_INCREMENT" with a primary key including "{columnName}".""")
+    if ( any(index["type"] == "FULLTEXT" for index in indexes) ):
+      raise Exception(f"""{where}: partitioned tables can't have FULLTEXT indexes.""")
+    return { "column": columnName, "interval": interval, "retention": partitioning.get("retention", 12), "future": partitioning.get("future", 3) }
+
+  # "name", "name DESC" -> ( "name", "ASC" | "DESC" )
+  def parseOrderBy(self, order):
+    orderParts = order.split()
+    direction = orderParts[1].upper() if len(orderParts) > 1 else "ASC"
+    if ( direction not in ( "ASC", "DESC" ) ):
+      raise Exception(f"""The ordering "{order}" in {self.source} must be "<column>", "<column> ASC" or "<column> DESC".""")
+    return ( orderParts[0], direction )
+
+  # Explicit indexes may carry a prefix length e.g. "address(32)"
+  def bareColumn(self, indexColumn):
+    return indexColumn.split("(")[0]
+
+  def indexName(self, columnNames):
+    return f"idx_{'_'.join(columnNames)}"[:self.maxIdentifierLength]
+
+  def column(self, table, columnName):
+    return next(column for column in table["columns"] if column["name"] == columnName)
+
+  def isIntegerColumn(self, column):
+    return column["type"].split("(")[0].split()[0] in ( "SERIAL", "TINYINT", "SMALLINT", "MEDIUMINT", "INT", "INTEGER", "BIGINT" )
+
+  def isAutoIncrementColumn(self, column):
+    return column["type"] == "SERIAL" or "AUTO_INCREMENT" in column["type"]
+
+  # How generated code validates a value for the column: "int", "float" or "string"
+  def columnValueKind(self, column):
+    if ( self.isIntegerColumn(column) ):
+      return "int"
+    if ( column["type"].split("(")[0].split()[0] in ( "FLOAT", "DOUBLE", "REAL", "DECIMAL", "NUMERIC" ) ):
+      return "float"
+    return "string"
+
+  # The declared length of CHAR(n) / VARCHAR(n) columns, None for every other type
+  def columnMaxLength(self, column):
+    typeName, bracket, typeArgs = column["type"].partition("(")
+    if ( typeName.strip() in ( "CHAR", "VARCHAR" ) and bracket ):
+      return int(typeArgs.split(")")[0])
+    return None
+
+  # Columns an insert must supply: NOT NULL, no default and not assigned by the database
+  def isRequiredColumn(self, column):
+    return not column["nullable"] and column["default"] is None and not self.isAutoIncrementColumn(column)
+
+  def isIndexable(self, table, columnName):
+    return self.column(table, columnName)["type"].split("(")[0] not in self.unindexableTypes
+
+  # The key columns an index needs, in order, for a query to be answered by an index range scan without a filesort:
+  # equality columns first, then the range column, otherwise the ordering columns.
+  def queryKeyColumns(self, query):
+    keyColumns = list(query["equality"])
+    if ( query["range"] ):
+      keyColumns.append(query["range"])
+    else:
+      keyColumns += [ order[0] for order in query["orderBy"] if order[0] not in keyColumns ]
+    return keyColumns
+
+  def planIndexes(self, table):
+    plannedIndexes = []
+    for query in table["queries"]:
+      keyColumns = self.queryKeyColumns(query)
+      if ( len(keyColumns) == 0 ):
+        continue
+      unindexable = [ c for c in keyColumns if not self.isIndexable(table, c) ]
+      if ( len(unindexable) > 0 ):
+        raise Exception(f"""Table "{table['name']}" query "{query['name']}" looks up {', '.join(unindexable)}, which need a prefix length. Please declare an explicit index for it under "indexes" and set "autoIndexes": false.""")
+      # InnoDB secondary indexes carry the primary key already, so it never needs appending for coverage
+      coveringColumns = [ c for c in query["select"] if c not in keyColumns and c not in table["primaryKey"] ]
+      if ( len(coveringColumns) > 0 and all(self.isIndexable(table, c) for c in coveringColumns) ):
+        keyColumns = keyColumns + coveringColumns
+      plannedIndexes.append({ "name": self.indexName(keyColumns), "columns": keyColumns, "type": "INDEX" })
+
+    # Drop planned indexes which are a left prefix of another index (or of the primary key), they add write cost and nothing else
+    existingKeys = [ table["primaryKey"] ] + [ [ self.bareColumn(c) for c in index["columns"] ] for index in table["indexes"] if index["type"] != "FULLTEXT" ]
+    keptIndexes = []
+    for index in plannedIndexes:
+      otherKeys = existingKeys + [ other["columns"] for other in plannedIndexes if other is not index ]
+      isRedundant = any(len(other) >= len(index["columns"]) and other[:len(index["columns"])] == index["columns"] and other != index["columns"] for other in otherKeys)
+      isDuplicate = any(kept["columns"] == index["columns"] for kept in keptIndexes) or index["columns"] in existingKeys
+      if ( not isRedundant and not isDuplicate ):
+        keptIndexes.append(index)
+    return keptIndexes
+
+  # Columns an index can seek on (or read in order) on their own, i.e. the first column of every non FULLTEXT index
+  def leadingIndexColumns(self, table):
+    leadingColumns = []
+    for index in self.allIndexes(table):
+      leadingColumn = self.bareColumn(index["columns"][0])
+      if ( index["type"] != "FULLTEXT" and leadingColumn not in leadingColumns ):
+        leadingColumns.append(leadingColumn)
+    return leadingColumns
+
+  def allIndexes(self, table):
+    return [ { "name": "PRIMARY", "columns": table["primaryKey"], "type": "PRIMARY" } ] + table["indexes"] + table["plannedIndexes"]
+
+  # Does this index let the query seek straight to its rows (and read them in order)?
+  def indexSupportsQuery(self, index, query):
+    indexColumns = [ self.bareColumn(c) for c in index["columns"] ]
+    equalityCount = len(query["equality"])
+    if ( index["type"] == "FULLTEXT" or set(indexColumns[:equalityCount]) != set(query["equality"]) ):
+      return False
+    remainingColumns = indexColumns[equalityCount:]
+    if ( query["range"] ):
+      return len(remainingColumns) > 0 and remainingColumns[0] == query["range"]
+    orderColumns = [ order[0] for order in query["orderBy"] if order[0] not in query["equality"] ]
+    return remainingColumns[:len(orderColumns)] == orderColumns
+
+  def supportingIndex(self, table, query):
+    return next((index for index in self.allIndexes(table) if self.indexSupportsQuery(index, query)), None)
+
+  # Returns a list of human readable warnings, an empty list means every declared query is index supported
+  def lint(self):
+    warnings = []
+    for table in self.tables:
+      for query in table["queries"]:
+        where = f"""table "{table['name']}" query "{query['name']}\""""
+        if ( len(self.queryKeyColumns(query)) == 0 ):
+          warnings.append(f"{where} declares no equality, range or ordering columns, it will scan the whole table.")
+          continue
+        if ( self.supportingIndex(table, query) is None ):
+          warnings.append(f"{where} has no supporting index, it needs an index starting with ({', '.join(self.queryKeyColumns(query))}).")
+        if ( query["range"] and any(order[0] != query["range"] for order in query["orderBy"]) ):
+          warnings.append(f"{where} orders by columns other than its range column \"{query['range']}\", MySQL will have to filesort the matching rows.")
+        if ( table["partitioning"] and table["partitioning"]["column"] not in query["equality"] + [ query["range"] ] ):
+          warnings.append(f"{where} does not filter on the partition column \"{table['partitioning']['column']}\", it reads every partition.")
+        if ( len(set(order[1] for order in query["orderBy"])) > 1 ):
+          warnings.append(f"{where} mixes ASC and DESC ordering, an index can only serve that on MySQL 8+ with matching descending index columns.")
+    return warnings
+
+  def printLintWarnings(self):
+    for warning in self.lint():
+      print(f"WARNING (table spec lint): {warning}")
+
+  ##########################################################################################################
+  ############################################ START SQL Render ############################################
+  ##########################################################################################################
+
+  def sqlString(self, value):
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+  def sqlValue(self, value):
+    if ( value is None ):
+      return "NULL"
+    if ( type(value) is bool ):
+      return "1" if value else "0"
+    if ( type(value) in ( int, float ) ):
+      return str(value)
+    return self.sqlString(value)
+
+  def sqlIndexColumns(self, indexColumns):
+    quotedColumns = []
+    for indexColumn in indexColumns:
+      columnName, bracket, prefixLength = indexColumn.partition("(")
+      quotedColumns.append(f"`{columnName}`" + (f"({prefixLength}" if bracket else ""))
+    return ", ".join(quotedColumns)
+
+  def sqlColumnDefinition(self, column):
+    definition = f"`{column['name']}` {column['type']} {'NULL' if column['nullable'] else 'NOT NULL'}"
+    if ( column["default"] is not None ):
+      definition += f" DEFAULT {self.sqlDefault(column)}"
+    if ( column["comment"] ):
+      definition += f" COMMENT {self.sqlString(column['comment'])}"
+    return definition
+
+  def sqlDefault(self, column):
+    return column['default'] if str(column['default']).upper() in ( 'CURRENT_TIMESTAMP', 'NULL' ) else self.sqlValue(column['default'])
+
+  def sqlIndexDefinition(self, index):
+    indexKeyword = { "INDEX": "INDEX", "UNIQUE": "UNIQUE INDEX", "FULLTEXT": "FULLTEXT INDEX" }[index["type"]]
+    return f"{indexKeyword} `{index['name']}` ({self.sqlIndexColumns(index['columns'])})"
+
+  # ROW_FORMAT / KEY_BLOCK_SIZE / COMPRESSION after ENGINE = InnoDB, empty for tables without storage options
+  def sqlTableOptions(self, table):
+    tableOptions = ""
+    if ( table["rowFormat"] ):
+      tableOptions += f" ROW_FORMAT={table['rowFormat']}"
+    if ( table["keyBlockSize"] ):
+      tableOptions += f" KEY_BLOCK_SIZE={table['keyBlockSize']}"
+    if ( table["compression"] ):
+      tableOptions += f" COMPRESSION='{table['compression']}'"
+    return tableOptions
+
+  # ( partition name, first day of the next period ) from the period holding startDate on, "future" periods ahead.
+  # A partition is named after the period it holds, e.g. p202610 holds October 2026 (and, the first one, anything older).
+  def partitionPeriods(self, partitioning, startDate):
+    periodStart = startDate if partitioning["interval"] == "day" else startDate.replace(day = 1)
+    periods = []
+    for _ in range(partitioning["future"] + 1):
+      if ( partitioning["interval"] == "day" ):
+        nextStart = periodStart + datetime.timedelta(days = 1)
+        periods.append(( f"p{periodStart.strftime('%Y%m%d')}", nextStart ))
+      else:
+        nextStart = ( periodStart + datetime.timedelta(days = 31) ).replace(day = 1)
+        periods.append(( f"p{periodStart.strftime('%Y%m')}", nextStart ))
+      periodStart = nextStart
+    return periods
+
+  # The PARTITION BY clause of a partitioned table as of today (UTC), empty for tables without partitioning
+  def sqlPartitionClause(self, table):
+    if ( table["partitioning"] is None ):
+      return ""
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    partitionLines = [ f"PARTITION `{name}` VALUES LESS THAN ('{nextStart.isoformat()}')" for name, nextStart in self.partitionPeriods(table["partitioning"], today) ]
+    partitionLines.append("PARTITION `pmax` VALUES LESS THAN (MAXVALUE)")
+    partitionBody = ",\n    ".join(partitionLines)
+    return f"""
+PARTITION BY RANGE COLUMNS(`{table['partitioning']['column']}`) (
+    {partitionBody}
+)"""
+
+  # fullTableName is the prefixed name e.g. #__generichelloworld_storage_table_1, update files keep an existing table (dropExisting = False)
+  def renderCreateTable(self, table, fullTableName, dropExisting = True):
+    tableLines = [ self.sqlColumnDefinition(column) for column in table["columns"] ]
+    tableLines.append(f"PRIMARY KEY({self.sqlIndexColumns(table['primaryKey'])})")
+    tableLines += [ self.sqlIndexDefinition(index) for index in table["indexes"] + table["plannedIndexes"] ]
+    tableBody = ",\n    ".join(tableLines)
+    if ( not dropExisting ):
+      return f"""CREATE TABLE IF NOT EXISTS `{fullTableName}`(
+    {tableBody}
+) ENGINE = InnoDB{self.sqlTableOptions(table)}{self.sqlPartitionClause(table)};
+"""
+    return f"""DROP TABLE IF EXISTS `{fullTableName}`;
+
+CREATE TABLE `{fullTableName}`(
+    {tableBody}
+) ENGINE = InnoDB{self.sqlTableOptions(table)}{self.sqlPartitionClause(table)};
+"""
+
+  def renderSeedInsert(self, table, fullTableName):
+    if ( len(table["seedRows"]) == 0 ):
+      return ""
+    seedColumns = []
+    for seedRow in table["seedRows"]:
+      seedColumns += [ columnName for columnName in seedRow if columnName not in seedColumns ]
+    seedValues = ",\n    ".join("(" + ", ".join(self.sqlValue(seedRow.get(columnName)) for columnName in seedColumns) + ")" for seedRow in table["seedRows"])
+    return f"""
+/* Testing insertion into our newly created table */
+INSERT INTO `{fullTableName}` ({', '.join(f'`{c}`' for c in seedColumns)}) VALUES
+    {seedValues};
+"""
+
+  # tablePrefix is prepended to every spec table name e.g. "#__generichelloworld_"
+  def renderInstallSql(self, tablePrefix):
+    return "\n".join(self.renderCreateTable(table, f"{tablePrefix}{table['name']}") + self.renderSeedInsert(table, f"{tablePrefix}{table['name']}") for table in self.tables)
+
+  def renderUninstallSql(self, tablePrefix):
+    return "".join(f"DROP TABLE IF EXISTS `{tablePrefix}{table['name']}`;\n" for table in self.tables) + "\n"
+
+  ##########################################################################################################
+  ############################################# END SQL Render #############################################
+  ##########################################################################################################
+
+  def tableForController(self, controllerName):
+    mappedTables = [ table for table in self.tables if (table["controller"] or "").lower() == controllerName.lower() ]
+    return mappedTables[0] if len(mappedTables) > 0 else self.tables[0]
+
+  # StorageTable1 style class name segment for a table
+  def tableClassName(self, table):
+    return "".join(part.capitalize() for part in table["name"].replace("-", "_").split("_"))
+
+  def partitionedTables(self):
+    return [ table for table in self.tables if table["partitioning"] is not None ]
+
+  # The columns an API may read and serialize: the primary key and the "apiFields", in column order
+  def apiFieldNames(self, table):
+    return [ column["name"] for column in table["columns"] if column["name"] in table["primaryKey"] or column["name"] in table["apiFields"] ]
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description='Lint or render a joomla-tools table schema spec.', allow_abbrev=False)
+  parser.add_argument('spec', help="""Path to the table spec JSON file""")
+  parser.add_argument('--render-install-sql', required=False, metavar='e.g. --render-install-sql="#__generichelloworld_"',
+                      help="""OPTIONAL: Print the install SQL using the given table name prefix instead of linting""")
+  args = parser.parse_args()
+  spec = TableSpec.fromFile(args.spec)
+  if ( args.render_install_sql is not None ):
+    print(spec.renderInstallSql(args.render_install_sql))
+  else:
+    warnings = spec.lint()
+    for warning in warnings:
+      print(f"WARNING (table spec lint): {warning}")
+    print(f"{len(warnings)} warning(s) in {args.spec}")
+    sys.exit(1 if len(warnings) > 0 else 0)
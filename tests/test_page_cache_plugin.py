@@ -0,0 +1,60 @@
+# Generator tests of --plugin-type="system" --plugin-meta="page-cache", run them with "python -m pytest -q" from the repo root.
+# The exit code of pluginMaker.py is not checked, its last step lists the package with tree which may not be installed.
+
+import subprocess, sys
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+
+PLUGIN_MAKER = Path(__file__).resolve().parent.parent / "pluginMaker.py"
+
+def makePageCachePlugin(outFolder, *ruleArgs):
+  generation = subprocess.run([ sys.executable, str(PLUGIN_MAKER), "--plugin-name=Page Cache Test", "--plugin-desc=Page cache test",
+                                "--vendor-name=Test", "--author-name=Test", "--author-url=https://example.org", "--copyright-holder=Test",
+                                "--creation-month=April", "--creation-year=2022", "--plugin-version=0.0.1",
+                                "--plugin-type=system", "--plugin-meta=page-cache", *ruleArgs ],
+                              cwd = outFolder, capture_output = True, text = True)
+  pluginFolder = outFolder / "pagecachetest"
+  return generation.stdout, ( pluginFolder / "pagecachetest.xml" ), ( pluginFolder / "pagecachetest.php" )
+
+def configDefaults(manifestPath):
+  fields = ElementTree.parse(manifestPath).getroot().findall("./config/fields/fieldset/field")
+  return { field.get("name"): field.get("default") for field in fields }
+
+def test_rules_render_in_the_manifest_config(tmp_path):
+  _, manifestPath, _ = makePageCachePlugin(tmp_path, "--page-cache-include=^/blog/", "--page-cache-include=^/news",
+                                           "--page-cache-exclude=^/cart", "--page-cache-menu-ttl=101=3600",
+                                           "--page-cache-menu-ttl=102=0", "--page-cache-ttl=120")
+  defaults = configDefaults(manifestPath)
+  assert defaults["include_patterns"] == "^/blog/\n^/news"
+  assert defaults["exclude_patterns"] == "^/cart"
+  assert defaults["menu_ttls"] == "101=3600\n102=0"
+  assert defaults["ttl"] == "120"
+
+def test_rules_render_in_the_plugin_class(tmp_path):
+  _, _, classPath = makePageCachePlugin(tmp_path, "--page-cache-include=^/blog/", "--page-cache-include=^/news",
+                                        "--page-cache-exclude=^/cart", "--page-cache-menu-ttl=101=3600",
+                                        "--page-cache-menu-ttl=102=0", "--page-cache-ttl=120")
+  classContents = classPath.read_text()
+  assert "'include_patterns' => ['^/blog/', '^/news']," in classContents
+  assert "'exclude_patterns' => ['^/cart']," in classContents
+  assert "'menu_ttls' => ['101=3600', '102=0']," in classContents
+  assert "$this->params->get('ttl', 120)" in classContents
+
+def test_patterns_are_escaped(tmp_path):
+  _, manifestPath, classPath = makePageCachePlugin(tmp_path, "--page-cache-include=^/it's\\d+<b>&")
+  assert configDefaults(manifestPath)["include_patterns"] == "^/it's\\d+<b>&"
+  assert "'include_patterns' => ['^/it\\'s\\\\d+<b>&']," in classPath.read_text()
+
+def test_no_rules_render_empty_defaults(tmp_path):
+  _, manifestPath, classPath = makePageCachePlugin(tmp_path)
+  defaults = configDefaults(manifestPath)
+  assert defaults["include_patterns"] == defaults["exclude_patterns"] == defaults["menu_ttls"] == ""
+  classContents = classPath.read_text()
+  assert "'include_patterns' => []," in classContents
+  assert "'menu_ttls' => []," in classContents
+
+def test_invalid_pattern_warns(tmp_path):
+  stdout, manifestPath, _ = makePageCachePlugin(tmp_path, "--page-cache-include=^/blog/", "--page-cache-exclude=^/(cart")
+  assert "WARNING: the page cache pattern '^/(cart' does not compile as a regular expression" in stdout
+  assert "^/blog/" not in stdout
+  assert configDefaults(manifestPath)["exclude_patterns"] == "^/(cart"